@@ -0,0 +1 @@
+"""Benchmarks reproducibles del punto de venta (ver benchmarks/ejecutar.py)"""
@@ -0,0 +1,246 @@
+"""Prueba de carga: N cajeros simulados cobrando a la vez contra el mismo servidor
+
+Uso, desde la raíz del repositorio:
+
+    python -m benchmarks.carga                                  # 1, 4, 16 y 64 cajas, 10 s cada una
+    python -m benchmarks.carga --sesiones 8,32 --duracion 30 --pausa 1.5
+    python -m benchmarks.carga --pausa 0 --stock 50             # saturación y mucha competencia por stock
+
+Un servidor de Streamlit atiende cada sesión en un hilo y comparte entre ellas los objetos
+de st.cache_resource. Aquí cada cajero es un hilo que usa esos mismos objetos (libro,
+Caja e índice de búsqueda) con su propio carrito: busca, agrega, corrige cantidades y
+cobra, con pausas exponenciales entre acciones. No incluye el dibujo de las páginas, que
+mide benchmarks/ejecutar.py.
+
+Cada nivel de concurrencia corre sobre una base nueva. Al final se cuadra el libro contra
+lo que los cajeros vieron confirmado: ventas perdidas o fantasma, stock negativo, stock
+que no coincide con lo vendido y acumulados descuadrados.
+"""
+import argparse
+import datetime
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks.ejecutar import DIRECTORIO_RESULTADOS, _commit, _consultas, resumir
+from benchmarks.generador import catalogo_sintetico
+from busqueda import IndiceBusqueda
+from caja import Caja, ErrorCaja, METODOS_PAGO
+from libro_ventas import LibroVentas, StockInsuficiente
+
+ACCIONES = ("buscar", "agregar", "editar_cantidad", "finalizar_venta")
+
+
+class Cajero(threading.Thread):
+    """Una sesión de caja: arma ventas de 1 a 6 productos hasta que vence el plazo"""
+
+    def __init__(self, numero, caja, indice, consultas, plazo, pausa, semilla):
+        super().__init__(name=f"cajero-{numero}", daemon=True)
+        self.caja = caja
+        self.indice = indice
+        self.consultas = consultas
+        self.plazo = plazo
+        self.pausa = pausa
+        self.rng = random.Random(semilla * 1000 + numero)
+        self.tiempos = {accion: [] for accion in ACCIONES}
+        self.confirmadas = {}   # id de venta -> {sku: cantidad} según la respuesta del cobro
+        self.rechazos_stock = 0
+        self.rechazos_caja = 0
+        self.error = None
+
+    def _pensar(self):
+        if self.pausa:
+            time.sleep(self.rng.expovariate(1 / self.pausa))
+
+    def _medir(self, accion, funcion, *args):
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args)
+        finally:
+            self.tiempos[accion].append((time.perf_counter() - inicio) * 1000)
+
+    def _armar_y_cobrar(self):
+        carrito = {}
+        for _ in range(self.rng.randint(1, 6)):
+            self._pensar()
+            encontrados = self._medir("buscar", self.indice.buscar, self.rng.choice(self.consultas))
+            if not encontrados:
+                continue
+            self._pensar()
+            sku = encontrados[0] if self.rng.random() < 0.7 else self.rng.choice(encontrados)
+            try:
+                self._medir("agregar", self.caja.agregar, carrito, sku, self.rng.randint(1, 3))
+            except ErrorCaja:
+                self.rechazos_caja += 1
+
+        # Corrección de cantidad en el carrito: la app relee el catálogo para acotar el selector
+        if carrito and self.rng.random() < 0.3:
+            self._pensar()
+            sku = self.rng.choice(list(carrito))
+
+            def editar():
+                catalogo = self.caja.libro.catalogo()
+                item = carrito[sku]
+                item["cantidad"] = max(1, min(item["cantidad"] + self.rng.choice((-1, 1, 2)),
+                                              int(catalogo.stock[catalogo.posicion(sku)])))
+                item["subtotal"] = item["cantidad"] * item["precio"]
+            self._medir("editar_cantidad", editar)
+
+        if not carrito:
+            return
+        self._pensar()
+        lineas = {sku: item["cantidad"] for sku, item in carrito.items()}
+        try:
+            venta = self._medir("finalizar_venta", self.caja.cobrar, carrito, "Consumidor Final",
+                                self.rng.choice(METODOS_PAGO))
+        except StockInsuficiente:
+            self.rechazos_stock += 1   # otra caja se llevó el stock: no se registra nada
+            return
+        self.confirmadas[venta.id] = lineas
+
+    def run(self):
+        try:
+            while time.monotonic() < self.plazo:
+                self._armar_y_cobrar()
+        except Exception as e:   # se informa en el resultado del nivel
+            self.error = repr(e)
+
+
+def _cuadrar(libro, stock_inicial, confirmadas):
+    """Anomalías del libro frente a las ventas que los cajeros vieron confirmadas"""
+    con = libro._conexion()
+    en_libro = {}
+    for venta_id, sku, cantidad in con.execute("SELECT venta_id, producto_id, cantidad FROM venta_lineas"):
+        lineas = en_libro.setdefault(venta_id, {})
+        lineas[sku] = lineas.get(sku, 0) + cantidad
+
+    vendidas = {}
+    for lineas in en_libro.values():
+        for sku, cantidad in lineas.items():
+            vendidas[sku] = vendidas.get(sku, 0) + cantidad
+    stock_final = dict(con.execute("SELECT id, stock FROM productos").fetchall())
+    total_ventas = con.execute("SELECT COALESCE(SUM(total), 0) FROM ventas").fetchone()[0]
+    total_cubo = con.execute(
+        "SELECT COALESCE(SUM(total), 0) FROM rollup_ventas WHERE granularidad = 'dia' AND dimension = 'total'"
+    ).fetchone()[0]
+    total_resumen = con.execute("SELECT COALESCE(SUM(total), 0) FROM resumen_metodo_dia").fetchone()[0]
+
+    return {
+        "ventas_perdidas": sum(1 for i in confirmadas if i not in en_libro),
+        "ventas_fantasma": sum(1 for i in en_libro if i not in confirmadas),
+        "lineas_distintas": sum(1 for i, lineas in confirmadas.items() if i in en_libro and en_libro[i] != lineas),
+        "stock_negativo": sum(1 for s in stock_final.values() if s < 0),
+        "stock_descuadrado": sum(1 for sku, inicial in stock_inicial.items()
+                                 if inicial - vendidas.get(sku, 0) != stock_final.get(sku)),
+        "acumulados_descuadrados": int(abs(total_cubo - total_ventas) > 0.01
+                                       or abs(total_resumen - total_ventas) > 0.01),
+    }
+
+
+def correr_nivel(sesiones, duracion, pausa, productos, stock, semilla=0):
+    """Un nivel de concurrencia sobre una base nueva; devuelve latencias, rendimiento y anomalías"""
+    directorio = tempfile.mkdtemp(prefix="carga_ventas_")
+    try:
+        libro = LibroVentas(os.path.join(directorio, "ventas.db"))
+        libro.sembrar_productos(catalogo_sintetico(productos, semilla, stock))
+        catalogo = libro.catalogo()
+        stock_inicial = dict(zip(catalogo.sku.tolist(), catalogo.stock.tolist()))
+        # Compartidos como en st.cache_resource
+        caja = Caja(libro)
+        indice = IndiceBusqueda(zip(catalogo.sku.tolist(), catalogo.nombre))
+
+        # Las consultas siguen la popularidad tipo Zipf de los productos
+        rng = np.random.default_rng(semilla)
+        peso = 1.0 / np.arange(1, len(catalogo) + 1) ** 0.8
+        populares = rng.permutation(len(catalogo))[rng.choice(len(catalogo), 2000, p=peso / peso.sum())]
+        consultas = _consultas(catalogo.nombre[populares].tolist(), 2000, random.Random(semilla))
+
+        plazo = time.monotonic() + duracion
+        cajeros = [Cajero(i, caja, indice, consultas, plazo, pausa, semilla) for i in range(sesiones)]
+        inicio = time.perf_counter()
+        for cajero in cajeros:
+            cajero.start()
+        for cajero in cajeros:
+            cajero.join()
+        transcurrido = time.perf_counter() - inicio
+
+        confirmadas = {}
+        for cajero in cajeros:
+            confirmadas.update(cajero.confirmadas)
+        tiempos = {}
+        for accion in ACCIONES:
+            serie = [t for c in cajeros for t in c.tiempos[accion]]
+            if serie:
+                tiempos[accion] = resumir(serie)
+        return {
+            "sesiones": sesiones,
+            "duracion_s": round(transcurrido, 2),
+            "ventas": len(confirmadas),
+            "ventas_por_s": round(len(confirmadas) / transcurrido, 2),
+            "rechazos_stock": sum(c.rechazos_stock for c in cajeros),
+            "rechazos_caja": sum(c.rechazos_caja for c in cajeros),
+            "errores": [c.error for c in cajeros if c.error],
+            "tiempos": tiempos,
+            "anomalias": _cuadrar(libro, stock_inicial, confirmadas)
+        }
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga con cajeros simulados")
+    parser.add_argument("--sesiones", default="1,4,16,64", help="niveles de concurrencia separados por comas")
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos por nivel")
+    parser.add_argument("--pausa", type=float, default=0.5,
+                        help="pausa media entre acciones de un cajero, en segundos (0 = sin pausas)")
+    parser.add_argument("--productos", type=int, default=500)
+    parser.add_argument("--stock", type=int, default=1000, help="stock inicial de cada producto")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    args = parser.parse_args(argumentos)
+
+    resultados = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "duracion_s": args.duracion,
+        "pausa_s": args.pausa,
+        "productos": args.productos,
+        "stock": args.stock,
+        "semilla": args.semilla,
+        "niveles": []
+    }
+    print(f"{'cajas':>5} {'ventas/s':>9} {'rechazos':>9}  " + "  ".join(f"{a + ' p50/p95 ms':>26}" for a in ACCIONES)
+          + "  anomalías")
+    anomalias = 0
+    for sesiones in (int(n) for n in args.sesiones.split(",")):
+        nivel = correr_nivel(sesiones, args.duracion, args.pausa, args.productos, args.stock, args.semilla)
+        resultados["niveles"].append(nivel)
+        columnas = "  ".join(
+            f"{nivel['tiempos'][a]['mediana_ms']:>12.2f} /{nivel['tiempos'][a]['p95_ms']:>11.2f}"
+            if a in nivel["tiempos"] else f"{'-':>26}" for a in ACCIONES
+        )
+        problemas = {k: v for k, v in nivel["anomalias"].items() if v}
+        anomalias += bool(problemas) + len(nivel["errores"])
+        print(f"{sesiones:>5} {nivel['ventas_por_s']:>9.1f} {nivel['rechazos_stock']:>9}  {columnas}  "
+              f"{problemas or 'ninguna'}{' errores: ' + str(nivel['errores']) if nivel['errores'] else ''}",
+              flush=True)
+
+    salida = args.salida or os.path.join(
+        DIRECTORIO_RESULTADOS, f"carga_{datetime.datetime.now():%Y%m%d_%H%M%S}_{resultados['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+    print(f"Resultados en {salida}")
+    return 1 if anomalias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Compara dos resultados de benchmarks/ejecutar.py y marca las regresiones
+
+    python -m benchmarks.comparar anterior.json nuevo.json [--umbral 1.2]
+
+Sale con código 1 si alguna mediana empeoró más que el umbral (útil en CI).
+"""
+import argparse
+import json
+import sys
+
+
+def _por_escenario(resultados):
+    return {(e["productos"], e["lineas"]): e["tiempos"] for e in resultados["escenarios"]}
+
+
+def comparar(anterior, nuevo, umbral=1.2):
+    """Filas (escenario, medición, mediana anterior, mediana nueva, razón) de los escenarios en común"""
+    base, actual = _por_escenario(anterior), _por_escenario(nuevo)
+    filas = []
+    for escenario in sorted(base.keys() & actual.keys()):
+        for nombre in sorted(base[escenario].keys() & actual[escenario].keys()):
+            antes = base[escenario][nombre]["mediana_ms"]
+            despues = actual[escenario][nombre]["mediana_ms"]
+            razon = despues / antes if antes else float("inf")
+            filas.append((escenario, nombre, antes, despues, razon, razon > umbral))
+    return filas
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Compara dos resultados de benchmarks")
+    parser.add_argument("anterior")
+    parser.add_argument("nuevo")
+    parser.add_argument("--umbral", type=float, default=1.2, help="razón nuevo/anterior que cuenta como regresión")
+    args = parser.parse_args(argumentos)
+
+    with open(args.anterior, encoding="utf-8") as a, open(args.nuevo, encoding="utf-8") as b:
+        anterior, nuevo = json.load(a), json.load(b)
+    print(f"{anterior.get('commit')} -> {nuevo.get('commit')}")
+
+    regresiones = 0
+    for (productos, lineas), nombre, antes, despues, razon, peor in comparar(anterior, nuevo, args.umbral):
+        marca = "  <-- regresión" if peor else ""
+        print(f"{productos:>6}x{lineas:<9} {nombre:36} {antes:>10.2f} -> {despues:>10.2f} ms  x{razon:.2f}{marca}")
+        regresiones += peor
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
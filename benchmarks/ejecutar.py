@@ -0,0 +1,261 @@
+"""Benchmarks del punto de venta sobre catálogos e historiales sintéticos
+
+Uso, desde la raíz del repositorio:
+
+    python -m benchmarks.ejecutar                         # escenarios rápidos
+    python -m benchmarks.ejecutar --completo              # de 60 a 50k SKUs, de 1k a 5M líneas
+    python -m benchmarks.ejecutar --escenario 5000x100000 --repeticiones 50
+    python -m benchmarks.comparar anterior.json nuevo.json
+
+Cada escenario corre en un proceso nuevo sobre una base temporal (la app lee VENTAS_DB al
+importarse y guarda el libro en cache_resource). Las funciones se llaman directamente con la
+app importada sin servidor; las páginas se recorren con AppTest. La réplica a Firestore queda
+desactivada. Los resultados se guardan como JSON en benchmarks/resultados/.
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUTA_APP = os.path.join(RAIZ, "ventasmarques.py")
+DIRECTORIO_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# (SKUs, líneas de venta)
+ESCENARIOS_RAPIDOS = [(60, 1_000), (5_000, 100_000)]
+ESCENARIOS_COMPLETOS = [(60, 1_000), (5_000, 100_000), (50_000, 1_000_000), (50_000, 5_000_000)]
+
+# opción del menú -> nombre de la medición
+PAGINAS = {
+    "Gestión de Inventario": "inventario",
+    "Historial de Ventas": "historial",
+    "Estadísticas": "estadisticas",
+    "Reportes Diarios": "reportes"
+}
+
+
+# --- MEDICIÓN ---
+def resumir(tiempos_ms):
+    """Mediana, p95, mínimo y máximo de una serie de tiempos en milisegundos"""
+    t = np.asarray(tiempos_ms, dtype=np.float64)
+    return {
+        "n": len(t),
+        "mediana_ms": round(float(np.median(t)), 3),
+        "p95_ms": round(float(np.percentile(t, 95)), 3),
+        "min_ms": round(float(t.min()), 3),
+        "max_ms": round(float(t.max()), 3)
+    }
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """Ejecuta `funcion(*preparar(i))` `repeticiones` veces; la preparación no se cronometra"""
+    tiempos = []
+    for i in range(repeticiones):
+        argumentos = preparar(i) if preparar else ()
+        inicio = time.perf_counter()
+        funcion(*argumentos)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return resumir(tiempos)
+
+
+def _consultas(nombres, cantidad, rng):
+    """Consultas variadas como las de la caja: prefijo, dos palabras o con un error de tipeo"""
+    consultas = []
+    for i in range(cantidad):
+        palabras = rng.choice(nombres).split()
+        if i % 3 == 0:
+            consultas.append(f"{palabras[0][:3 + i % 3]} {i}")
+        elif i % 3 == 1:
+            consultas.append(f"{palabras[0]} {palabras[1][:4]}")
+        else:
+            p = palabras[1]
+            consultas.append(f"{p[1]}{p[0]}{p[2:]} {palabras[-1]}" if len(p) > 2 else p)
+    return consultas
+
+
+# --- FUNCIONES DE LA APP (sin servidor) ---
+def _medir_funciones(repeticiones, semilla):
+    import ventasmarques as app   # sin servidor, st.session_state se comporta como un dict
+    from facturas import generar_factura
+
+    rng = random.Random(semilla)
+    libro = app.obtener_libro()
+    catalogo = app.obtener_catalogo()
+    skus = catalogo.sku.tolist()
+    hoy = datetime.date.today()
+    tiempos = {}
+
+    consultas = _consultas(list(catalogo.nombre), repeticiones + 1, rng)
+    tiempos["buscar_productos_primera"] = medir(app.buscar_productos, 1, lambda i: (consultas[-1],))
+    tiempos["buscar_productos"] = medir(app.buscar_productos, repeticiones, lambda i: (consultas[i],))
+
+    def vaciar(i):
+        app.st.session_state.carrito = {}
+        return rng.choice(skus), 1
+    tiempos["agregar_al_carrito"] = medir(app.agregar_al_carrito, repeticiones, vaciar)
+
+    def llenar(i):
+        app.st.session_state.carrito = {}
+        for sku in rng.sample(skus, 3):
+            app.agregar_al_carrito(sku, 1)
+        return "Consumidor Final", "Efectivo $"
+    tiempos["finalizar_venta"] = medir(app.finalizar_venta, repeticiones, llenar)
+
+    categoria = catalogo.categorias[0]
+    tiempos["historial_dia"] = medir(libro.ventas_entre, repeticiones, lambda i: (hoy, hoy))
+    tiempos["historial_30_dias_categoria"] = medir(
+        libro.ventas_entre, max(3, repeticiones // 4),
+        lambda i: (hoy - datetime.timedelta(days=29), hoy, categoria)
+    )
+
+    nombres_clientes = [c["Cliente"] for c in libro.mejores_clientes(200)]
+    if nombres_clientes:
+        consultas_clientes = [nombre[:3 + i % 6] for i, nombre in
+                              enumerate(rng.choice(nombres_clientes) for _ in range(repeticiones))]
+        tiempos["sugerir_clientes"] = medir(app.obtener_clientes().sugerir, repeticiones,
+                                            lambda i: (consultas_clientes[i],))
+        tiempos["compras_de_cliente"] = medir(
+            libro.compras_de_cliente, repeticiones, lambda i: (libro.cliente(rng.choice(nombres_clientes))["id"],)
+        )
+
+    estadisticas = app.obtener_estadisticas()
+    tiempos["estadisticas_frio"] = medir(estadisticas.obtener, 1)
+    tiempos["estadisticas_tibio"] = medir(estadisticas.obtener, repeticiones)
+
+    ultima = libro.ultima_venta_id()
+    tiempos["generar_factura"] = medir(
+        generar_factura, repeticiones, lambda i: (libro.obtener_venta(rng.randint(1, ultima)),)
+    )
+    tiempos["generar_reporte_diario"] = medir(app.generar_reporte_diario, max(3, repeticiones // 4))
+    return tiempos
+
+
+# --- PÁGINAS (AppTest) ---
+def _medir_paginas(repeticiones):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(RUTA_APP, default_timeout=600)
+    at.secrets["benchmark"] = True   # reemplaza .streamlit/secrets.toml: sin credenciales de Firebase
+    tiempos = {}
+
+    def accion(nombre, ejecutar, veces=1):
+        serie = []
+        for _ in range(veces):
+            inicio = time.perf_counter()
+            ejecutar()
+            serie.append((time.perf_counter() - inicio) * 1000)
+            if at.exception:
+                raise RuntimeError(f"{nombre}: {at.exception[0].message}")
+        tiempos[nombre] = resumir(serie)
+
+    accion("pagina_inicial", at.run)
+    accion("pagina_punto_de_venta", at.run, repeticiones)
+    accion("abrir_categoria", lambda: at.toggle[0].set_value(True).run())
+    accion("clic_agregar", lambda: next(b for b in at.button if b.label.startswith("➕")).click().run())
+    accion("clic_finalizar_venta", lambda: next(b for b in at.button if "Finalizar" in b.label).click().run())
+    for pagina, nombre in PAGINAS.items():
+        accion(f"pagina_{nombre}_entrada", lambda: at.sidebar.radio[0].set_value(pagina).run())
+        accion(f"pagina_{nombre}", at.run, max(3, repeticiones // 4))
+    return tiempos
+
+
+# --- ESCENARIOS ---
+def correr_escenario(productos, lineas, repeticiones=20, semilla=0, paginas=True):
+    """Genera el escenario en una base temporal y mide; pensado para correr en un proceso nuevo"""
+    directorio = tempfile.mkdtemp(prefix="bench_ventas_")
+    ruta = os.path.join(directorio, "ventas.db")
+    os.environ["VENTAS_DB"] = ruta
+    for variable in ("FIREBASE_CREDENCIALES", "FIRESTORE_EMULATOR_HOST"):
+        os.environ.pop(variable, None)
+    sys.path.insert(0, RAIZ)
+
+    from benchmarks.generador import catalogo_sintetico, historial_sintetico
+    from libro_ventas import LibroVentas
+
+    try:
+        inicio = time.perf_counter()
+        libro = LibroVentas(ruta)
+        libro.sembrar_productos(catalogo_sintetico(productos, semilla))
+        ventas = historial_sintetico(libro, lineas, semilla=semilla)
+        generacion = time.perf_counter() - inicio
+
+        tiempos = _medir_funciones(repeticiones, semilla)
+        if paginas:
+            tiempos.update(_medir_paginas(repeticiones))
+        return {
+            "productos": productos,
+            "lineas": lineas,
+            "ventas": ventas,
+            "generacion_s": round(generacion, 2),
+            "tiempos": tiempos
+        }
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _escenario(texto):
+    productos, lineas = texto.lower().split("x")
+    return int(productos), int(lineas)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del punto de venta")
+    parser.add_argument("--completo", action="store_true", help="incluye 50k SKUs con 1M y 5M líneas")
+    parser.add_argument("--escenario", type=_escenario, action="append",
+                        help="SKUSxLINEAS, por ejemplo 5000x100000 (se puede repetir)")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sin-paginas", action="store_true", help="omite el recorrido con AppTest")
+    parser.add_argument("--salida", help="archivo JSON de resultados")
+    args = parser.parse_args(argumentos)
+
+    escenarios = args.escenario or (ESCENARIOS_COMPLETOS if args.completo else ESCENARIOS_RAPIDOS)
+    resultados = {
+        "fecha": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticiones": args.repeticiones,
+        "semilla": args.semilla,
+        "escenarios": []
+    }
+    contexto = multiprocessing.get_context("spawn")
+    for productos, lineas in escenarios:
+        print(f"Escenario {productos} SKUs x {lineas} líneas...", flush=True)
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as pool:
+            escenario = pool.submit(correr_escenario, productos, lineas, args.repeticiones, args.semilla,
+                                    not args.sin_paginas).result()
+        resultados["escenarios"].append(escenario)
+        for nombre, t in escenario["tiempos"].items():
+            print(f"  {nombre:36} mediana {t['mediana_ms']:>10.2f} ms   p95 {t['p95_ms']:>10.2f} ms")
+
+    salida = args.salida or os.path.join(
+        DIRECTORIO_RESULTADOS, f"{datetime.datetime.now():%Y%m%d_%H%M%S}_{resultados['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(salida)), exist_ok=True)
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(resultados, archivo, ensure_ascii=False, indent=2)
+    print(f"Resultados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
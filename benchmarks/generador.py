@@ -0,0 +1,144 @@
+"""Catálogos e historiales de ventas sintéticos y reproducibles (misma semilla, mismos datos)"""
+import datetime
+import sqlite3
+
+import numpy as np
+
+from libro_ventas import CONSUMIDOR_FINAL, PUNTOS_POR_DOLAR, clave_cliente
+
+CATEGORIAS = ("Pastelería", "Hojaldre", "Bebidas", "Galletería", "Panadería", "Postres Fríos")
+METODOS_PAGO = ("Efectivo Bs", "Efectivo $", "Tarjeta Débito", "Tarjeta Crédito", "Pago Móvil", "Zelle")
+_BASES = ("Torta", "Croissant", "Jugo", "Galleta", "Pan", "Mousse", "Tartaleta", "Café", "Pastelito", "Brownie")
+_SABORES = ("Chocolate", "Vainilla", "Fresa", "Limón", "Naranja", "Coco", "Arequipe", "Café", "Almendra",
+            "Frambuesa", "Parchita", "Guayaba", "Queso", "Jamón", "Canela", "Nutella")
+_NOMBRES = ("Ana", "Luis", "María", "José", "Carmen", "Pedro", "Rosa", "Jesús", "Andreína", "Carlos",
+            "Gabriela", "Miguel", "Daniela", "Rafael", "Valentina", "Óscar", "Isabel", "Héctor", "Lucía", "Ramón")
+_APELLIDOS = ("Pérez", "González", "Rodríguez", "Hernández", "Martínez", "García", "López", "Díaz", "Sánchez",
+              "Ramírez", "Torres", "Rojas", "Núñez", "Medina", "Castillo", "Suárez", "Blanco", "Méndez",
+              "Acosta", "Peña")
+
+STOCK_SINTETICO = 1_000_000   # alcanza para cualquier número de ventas de prueba
+
+
+def catalogo_sintetico(productos, semilla=0, stock=STOCK_SINTETICO):
+    """Inventario {categoría: {producto: datos}} con `productos` artículos, igual que INVENTARIO_INICIAL"""
+    rng = np.random.default_rng(semilla)
+    categorias = rng.integers(0, len(CATEGORIAS), productos)
+    precios = np.round(rng.uniform(1, 25, productos), 2)
+    costos = np.round(precios * rng.uniform(0.3, 0.7, productos), 2)
+
+    inventario = {}
+    for i in range(productos):
+        nombre = f"{_BASES[i % len(_BASES)]} {_SABORES[(i // len(_BASES)) % len(_SABORES)]} {i + 1}"
+        inventario.setdefault(CATEGORIAS[categorias[i]], {})[nombre] = {
+            "precio": float(precios[i]),
+            "costo": float(costos[i]),
+            "stock": stock
+        }
+    return inventario
+
+
+def nombres_clientes(cantidad):
+    """`cantidad` nombres distintos de clientes (nombre y dos apellidos)"""
+    n, a = len(_NOMBRES), len(_APELLIDOS)
+    return [f"{_NOMBRES[i % n]} {_APELLIDOS[(i // n) % a]} {_APELLIDOS[(i // n + i // (n * a) + 1) % a]}"
+            for i in range(min(cantidad, n * a * a))]
+
+
+def historial_sintetico(libro, lineas, dias=365, semilla=0, ventas_por_lote=100_000, clientes=500,
+                        con_cliente=0.3):
+    """Carga `lineas` líneas de venta repartidas en los últimos `dias` días (hasta hoy, de 7 a 21 h)
+
+    Las ventas y líneas se insertan por lotes con una conexión propia y al final se
+    recalculan los acumulados; no pasa por registrar_venta ni descuenta stock.
+    Una fracción `con_cliente` de las ventas es de uno de `clientes` clientes registrados (unos
+    pocos compran a menudo), con sus contadores de compras y puntos; el resto, de Consumidor Final.
+    Devuelve el número de ventas creadas.
+    """
+    rng = np.random.default_rng(semilla)
+    con = sqlite3.connect(libro.ruta, isolation_level=None)
+    con.execute("PRAGMA synchronous=OFF")
+
+    productos = con.execute("SELECT id, categoria, nombre, precio, costo FROM productos ORDER BY id").fetchall()
+    sku, categoria, nombre, precio, costo = (np.asarray(c) for c in zip(*productos))
+    precio, costo = precio.astype(np.float64), costo.astype(np.float64)
+
+    # Cada línea cae en una venta al azar (unas 3 líneas por venta); las ventas vacías se descartan
+    _, venta_de_linea = np.unique(np.sort(rng.integers(0, max(1, lineas // 3), lineas)), return_inverse=True)
+    n_ventas = int(venta_de_linea[-1]) + 1 if lineas else 0
+
+    # Popularidad tipo Zipf: pocos productos concentran la mayoría de las ventas
+    peso = 1.0 / np.arange(1, len(sku) + 1) ** 0.8
+    producto = rng.permutation(len(sku))[rng.choice(len(sku), lineas, p=peso / peso.sum())]
+    cantidad = rng.integers(1, 4, lineas)
+    subtotal = cantidad * precio[producto]
+    costo_linea = cantidad * costo[producto]
+    total_venta = np.bincount(venta_de_linea, weights=subtotal, minlength=n_ventas)
+    costo_venta = np.bincount(venta_de_linea, weights=costo_linea, minlength=n_ventas)
+
+    inicio = np.datetime64(datetime.date.today() - datetime.timedelta(days=dias - 1), "us")
+    segundos = np.sort(rng.integers(0, dias, n_ventas) * 86400 + rng.uniform(7 * 3600, 21 * 3600, n_ventas))
+    fechas = np.char.replace((inicio + (segundos * 1e6).astype("timedelta64[us]")).astype(str), "T", " ")
+    metodos = np.asarray(METODOS_PAGO)[rng.integers(0, len(METODOS_PAGO), n_ventas)]
+
+    # Cliente de cada venta (-1: Consumidor Final), también con popularidad tipo Zipf
+    nombres = nombres_clientes(clientes)
+    cliente = np.full(n_ventas, -1)
+    if nombres:
+        peso = 1.0 / np.arange(1, len(nombres) + 1) ** 0.8
+        registradas = rng.random(n_ventas) < con_cliente
+        cliente[registradas] = rng.choice(len(nombres), int(registradas.sum()), p=peso / peso.sum())
+    nombre_cliente = np.asarray([CONSUMIDOR_FINAL] + nombres, dtype=object)[cliente + 1]
+
+    primer_id = con.execute("SELECT COALESCE(MAX(id), 0) FROM ventas").fetchone()[0] + 1
+    ids = np.arange(primer_id, primer_id + n_ventas)
+    limites_lineas = np.searchsorted(venta_de_linea, np.arange(0, n_ventas + ventas_por_lote, ventas_por_lote))
+
+    con.execute("BEGIN")
+    # Los clientes se dan de alta (o se les suman las compras) con los mismos contadores que registrar_venta
+    compras_cliente = np.bincount(cliente[cliente >= 0], minlength=len(nombres))
+    total_cliente = np.bincount(cliente[cliente >= 0], weights=total_venta[cliente >= 0], minlength=len(nombres))
+    puntos_cliente = np.bincount(cliente[cliente >= 0], minlength=len(nombres),
+                                 weights=np.floor(total_venta[cliente >= 0] * PUNTOS_POR_DOLAR))
+    # Las ventas están en orden de fecha: primera y última aparición de cada cliente
+    _, primera = np.unique(cliente, return_index=True)
+    presentes, ultima = np.unique(cliente[::-1], return_index=True)
+    primera_cliente = dict(zip(presentes.tolist(), fechas[primera].tolist()))
+    ultima_cliente = dict(zip(presentes.tolist(), fechas[n_ventas - 1 - ultima].tolist()))
+    id_cliente = np.full(len(nombres) + 1, -1)
+    for i, persona in enumerate(nombres):
+        if not compras_cliente[i]:
+            continue
+        id_cliente[i + 1] = con.execute(
+            "INSERT INTO clientes (nombre, clave, creado, compras, total_comprado, puntos, ultima_compra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (clave) DO UPDATE SET compras = compras + excluded.compras, "
+            "total_comprado = total_comprado + excluded.total_comprado, puntos = puntos + excluded.puntos, "
+            "ultima_compra = MAX(COALESCE(ultima_compra, ''), excluded.ultima_compra) RETURNING id",
+            (persona, clave_cliente(persona), primera_cliente[i], int(compras_cliente[i]), float(total_cliente[i]),
+             int(puntos_cliente[i]), ultima_cliente[i])
+        ).fetchone()[0]
+    cliente_id = [None if c < 0 else c for c in id_cliente[cliente + 1].tolist()]
+
+    for a in range(0, n_ventas, ventas_por_lote):
+        b = min(a + ventas_por_lote, n_ventas)
+        con.executemany(
+            "INSERT INTO ventas (id, fecha, cliente, metodo_pago, total, costo, ganancia, cliente_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            zip(ids[a:b].tolist(), fechas[a:b].tolist(), nombre_cliente[a:b].tolist(), metodos[a:b].tolist(),
+                total_venta[a:b].tolist(), costo_venta[a:b].tolist(), (total_venta[a:b] - costo_venta[a:b]).tolist(),
+                cliente_id[a:b])
+        )
+        i, j = limites_lineas[a // ventas_por_lote], limites_lineas[a // ventas_por_lote + 1]
+        p = producto[i:j]
+        con.executemany(
+            "INSERT INTO venta_lineas (venta_id, producto_id, producto, categoria, cantidad, precio, costo, subtotal) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            zip(ids[venta_de_linea[i:j]].tolist(), sku[p].tolist(), nombre[p].tolist(), categoria[p].tolist(),
+                cantidad[i:j].tolist(), precio[p].tolist(), costo[p].tolist(), subtotal[i:j].tolist())
+        )
+    con.execute("COMMIT")
+    con.close()
+
+    libro.reconstruir_acumulados()
+    return n_ventas
@@ -0,0 +1,138 @@
+"""Índice de búsqueda de productos: sin acentos, por prefijo, trigramas y tolerante a errores"""
+import heapq
+import re
+import threading
+import unicodedata
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+
+# Puntajes de coincidencia por término; se suman y ordenan los resultados
+_PUNTAJE_PREFIJO = 3.0
+_PUNTAJE_SUBCADENA = 2.0
+_PUNTAJE_APROXIMADO = 1.0
+
+# Consultas recordadas por índice: cada tecla vuelve a ejecutar la misma búsqueda
+_MAX_CONSULTAS_EN_CACHE = 256
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos ni signos: 'Ópera (porción)' -> 'opera porcion'"""
+    descompuesto = unicodedata.normalize("NFKD", texto.lower())
+    sin_acentos = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(" ", sin_acentos).strip()
+
+
+def _trigramas(palabra):
+    """Trigramas de una palabra con bordes marcados"""
+    relleno = f"  {palabra} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def _distancia(a, b, limite):
+    """Distancia de Levenshtein acotada; devuelve limite + 1 si la supera"""
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        actual = [i]
+        for j, cb in enumerate(b, start=1):
+            actual.append(min(anterior[j] + 1, actual[j - 1] + 1, anterior[j - 1] + (ca != cb)))
+        if min(actual) > limite:
+            return limite + 1
+        anterior = actual
+    return anterior[-1]
+
+
+class IndiceBusqueda:
+    """Índice invertido del catálogo; se construye una vez por versión del inventario"""
+
+    def __init__(self, productos):
+        """`productos` es un iterable de (sku, nombre)"""
+        self.productos = []      # posición -> sku
+        self._prefijos = {}      # prefijo normalizado -> {posición}
+        self._palabras = {}      # palabra normalizada -> {posición}
+        self._trigramas = {}     # trigrama -> {palabra}
+        self._cache = {}         # (consulta, limite) -> resultados
+        self._lock_cache = threading.Lock()   # el índice lo comparten todas las sesiones
+
+        self._nombres = []       # posición -> nombre normalizado (desempate del orden)
+        for sku, nombre in productos:
+            self.agregar(sku, nombre)
+
+    def agregar(self, sku, nombre):
+        """Indexa una entrada más sin reconstruir el índice; olvida las consultas recordadas"""
+        posicion = len(self.productos)
+        self.productos.append(sku)
+        self._nombres.append(normalizar(nombre))
+        for palabra in self._nombres[-1].split():
+            self._palabras.setdefault(palabra, set()).add(posicion)
+            for n in range(1, len(palabra) + 1):
+                self._prefijos.setdefault(palabra[:n], set()).add(posicion)
+            for trigrama in _trigramas(palabra):
+                self._trigramas.setdefault(trigrama, set()).add(palabra)
+        with self._lock_cache:
+            self._cache.clear()
+
+    def _coincidencias(self, termino):
+        """Posiciones que coinciden con un término de la consulta y su puntaje"""
+        puntajes = dict.fromkeys(self._prefijos.get(termino, ()), _PUNTAJE_PREFIJO)
+        if len(termino) < 3:
+            return puntajes
+
+        # Palabras candidatas: las que comparten trigramas con el término
+        conteo = {}
+        for trigrama in _trigramas(termino):
+            for palabra in self._trigramas.get(trigrama, ()):
+                conteo[palabra] = conteo.get(palabra, 0) + 1
+        limite = 1 if len(termino) < 6 else 2
+        minimo = max(1, len(termino) - 2 * limite)
+        for palabra, compartidos in conteo.items():
+            if compartidos < minimo:
+                continue
+            if termino in palabra:
+                puntaje = _PUNTAJE_SUBCADENA
+            elif min(_distancia(termino, palabra, limite),
+                     _distancia(termino, palabra[:len(termino)], limite)) <= limite:
+                puntaje = _PUNTAJE_APROXIMADO
+            else:
+                continue
+            for posicion in self._palabras[palabra]:
+                if puntajes.get(posicion, 0) < puntaje:
+                    puntajes[posicion] = puntaje
+        return puntajes
+
+    def buscar(self, consulta, limite=None):
+        """SKUs que coinciden con todos los términos, por relevancia"""
+        clave_cache = (consulta, limite)
+        with self._lock_cache:
+            resultados = self._cache.get(clave_cache)
+        if resultados is not None:
+            return resultados
+        resultados = self._buscar(consulta, limite)
+        with self._lock_cache:
+            if len(self._cache) >= _MAX_CONSULTAS_EN_CACHE:
+                self._cache.pop(next(iter(self._cache)), None)
+            self._cache[clave_cache] = resultados
+        return resultados
+
+    def _buscar(self, consulta, limite):
+        terminos = normalizar(consulta).split()
+        if not terminos:
+            return []
+
+        total = None
+        for termino in terminos:
+            puntajes = self._coincidencias(termino)
+            if total is None:
+                total = puntajes
+            else:
+                total = {p: total[p] + puntajes[p] for p in total.keys() & puntajes.keys()}
+            if not total:
+                return []
+
+        clave = lambda p: (-total[p], self._nombres[p])
+        if limite is not None and limite < len(total):
+            orden = heapq.nsmallest(limite, total, key=clave)
+        else:
+            orden = sorted(total, key=clave)
+        return [self.productos[p] for p in orden]
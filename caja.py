@@ -0,0 +1,115 @@
+"""Carrito y cobro sin dependencias de la interfaz; los usan la app de Streamlit y el servicio HTTP
+
+Un carrito es un diccionario {sku: {"cantidad", "precio", "subtotal"}}: la app lo guarda en
+st.session_state y el servicio en memoria por terminal. Las reglas (stock disponible,
+cantidades válidas, carrito vacío) viven solo aquí.
+"""
+METODOS_PAGO = ["Efectivo Bs", "Efectivo $", "Tarjeta Débito", "Tarjeta Crédito", "Pago Móvil", "Zelle"]
+MAXIMO_POR_ESCANEO = 999   # un código leído por error como cantidad no pasa
+
+
+class ErrorCaja(Exception):
+    """Operación rechazada por una regla de la caja; el mensaje es apto para el cajero"""
+
+
+def interpretar_escaneo(texto):
+    """Separa la lectura del escáner en (código, cantidad): '7591234' -> 1 unidad, '3*7591234' -> 3"""
+    cantidad, separador, codigo = texto.strip().rpartition("*")
+    codigo = codigo.strip()
+    if not codigo:
+        raise ErrorCaja("Falta el código del producto")
+    if not separador:
+        return codigo, 1
+    cantidad = cantidad.strip()
+    if not cantidad.isdecimal() or not 0 < int(cantidad) <= MAXIMO_POR_ESCANEO:
+        raise ErrorCaja(f"Cantidad inválida: '{cantidad}' (de 1 a {MAXIMO_POR_ESCANEO})")
+    return codigo, int(cantidad)
+
+
+class Caja:
+    """Reglas del carrito y del cobro sobre el libro de ventas compartido"""
+
+    def __init__(self, libro):
+        self.libro = libro
+
+    def _producto(self, sku):
+        producto = self.libro.producto(sku)
+        if producto is None:
+            raise ErrorCaja(f"No existe el producto {sku}")
+        return producto
+
+    def agregar(self, carrito, sku, cantidad):
+        """Suma `cantidad` unidades del producto al carrito validando contra el stock compartido
+
+        Devuelve el producto agregado.
+        """
+        if not isinstance(cantidad, int) or isinstance(cantidad, bool) or cantidad <= 0:
+            raise ErrorCaja("La cantidad debe ser un entero positivo")
+        producto = self._producto(sku)
+        stock_disponible, nombre = producto["stock"], producto["nombre"]
+
+        en_carrito = carrito[sku]["cantidad"] if sku in carrito else 0
+        if en_carrito + cantidad > stock_disponible:
+            if stock_disponible <= 0:
+                raise ErrorCaja(f"No hay stock disponible de {nombre}")
+            if en_carrito:
+                raise ErrorCaja(f"No puedes agregar {cantidad} más. "
+                                f"Máximo disponible: {stock_disponible - en_carrito}")
+            raise ErrorCaja(f"Solo hay {stock_disponible} unidades disponibles de {nombre}")
+
+        if en_carrito:
+            item = carrito[sku]
+            item["cantidad"] = en_carrito + cantidad
+            item["subtotal"] = item["cantidad"] * item["precio"]
+        else:
+            carrito[sku] = {
+                "cantidad": cantidad,
+                "precio": producto["precio"],
+                "subtotal": cantidad * producto["precio"]
+            }
+        return producto
+
+    def escanear(self, carrito, texto):
+        """Agrega por código de barras o SKU, con prefijo de cantidad opcional ('3*codigo')
+
+        Devuelve (producto, cantidad).
+        """
+        codigo, cantidad = interpretar_escaneo(texto)
+        sku = self.libro.sku_por_codigo(codigo)
+        if sku is None:
+            raise ErrorCaja(f"Código no encontrado: {codigo}")
+        return self.agregar(carrito, sku, cantidad), cantidad
+
+    @staticmethod
+    def quitar(carrito, sku):
+        carrito.pop(sku, None)
+
+    @staticmethod
+    def total(carrito):
+        return sum(item["subtotal"] for item in carrito.values())
+
+    def cobrar(self, carrito, cliente, metodo_pago):
+        """Registra la venta del carrito y lo vacía; devuelve la Venta
+
+        Si otra caja vendió antes el stock, el libro lanza StockInsuficiente, no se
+        registra nada y el carrito queda como estaba.
+        """
+        if not carrito:
+            raise ErrorCaja("El carrito está vacío")
+        if metodo_pago not in METODOS_PAGO:
+            raise ErrorCaja(f"Método de pago desconocido: {metodo_pago}")
+        lineas = [
+            {"sku": sku, "cantidad": item["cantidad"], "precio": item["precio"]}
+            for sku, item in carrito.items()
+        ]
+        venta = self.libro.registrar_venta(cliente or "Consumidor Final", metodo_pago, lineas)
+        carrito.clear()
+        return venta
+
+    def vender(self, cliente, metodo_pago, lineas):
+        """Cobro en un paso: `lineas` son pares (sku, cantidad); valida como si se escanearan en orden"""
+        carrito = {}
+        for sku, cantidad in lineas:
+            self.agregar(carrito, sku, cantidad)
+        return self.cobrar(carrito, cliente, metodo_pago)
+
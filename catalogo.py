@@ -0,0 +1,109 @@
+"""Catálogo columnar: una posición por producto y columnas NumPy para precio, costo y stock"""
+import numpy as np
+
+
+def _codificar(valores):
+    """Códigos enteros por valor, numerados en orden de primera aparición"""
+    unicos, primeras, codigos = np.unique(np.asarray(valores, dtype=object), return_index=True,
+                                          return_inverse=True)
+    orden = np.argsort(primeras)
+    renumerar = np.empty_like(orden)
+    renumerar[orden] = np.arange(len(orden))
+    return unicos[orden].tolist(), renumerar[codigos].astype(np.int16)
+
+
+class Catalogo:
+    """Productos indexados por SKU (el id estable de la tabla productos)"""
+
+    def __init__(self, sku, categoria, nombre, precio, costo, stock, codigo_barras=None):
+        self.sku = np.asarray(sku, dtype=np.int64)
+        if len(self.sku):
+            self.categorias, self.codigo_categoria = _codificar(categoria)
+        else:
+            self.categorias, self.codigo_categoria = [], np.empty(0, dtype=np.int16)
+        self.nombre = np.asarray(nombre, dtype=object)
+        self.precio = np.asarray(precio, dtype=np.float64)
+        self.costo = np.asarray(costo, dtype=np.float64)
+        self.stock = np.asarray(stock, dtype=np.int64)
+        self.codigo_barras = np.asarray(codigo_barras if codigo_barras is not None else [None] * len(self.sku),
+                                        dtype=object)
+        self._posicion = dict(zip(self.sku.tolist(), range(len(self.sku))))
+        self._por_codigo = {c: s for c, s in zip(self.codigo_barras.tolist(), self.sku.tolist()) if c}
+        self._por_categoria = [np.flatnonzero(self.codigo_categoria == i) for i in range(len(self.categorias))]
+
+    @classmethod
+    def desde_filas(cls, filas):
+        """Construye el catálogo a partir de filas (sku, categoria, nombre, precio, costo, stock[, codigo_barras])"""
+        columnas = list(zip(*filas)) or [()] * 6
+        return cls(*columnas)
+
+    def con_stock(self, stock):
+        """Copia ligera que comparte las columnas fijas y usa otro vector de stock"""
+        copia = object.__new__(Catalogo)
+        copia.__dict__.update(self.__dict__)
+        copia.stock = stock
+        return copia
+
+    # --- ACCESO POR SKU ---
+    def __len__(self):
+        return len(self.sku)
+
+    def __contains__(self, sku):
+        return sku in self._posicion
+
+    def posicion(self, sku):
+        return self._posicion[sku]
+
+    def sku_de_codigo(self, codigo):
+        """SKU de un código de barras, o del SKU tecleado; None si no es de ningún producto"""
+        sku = self._por_codigo.get(codigo)
+        if sku is None and codigo.isdecimal() and int(codigo) in self._posicion:
+            sku = int(codigo)
+        return sku
+
+    def categoria_de(self, sku):
+        return self.categorias[self.codigo_categoria[self._posicion[sku]]]
+
+    def producto(self, sku):
+        """Datos de un producto como diccionario"""
+        i = self._posicion[sku]
+        return {
+            "sku": sku,
+            "nombre": self.nombre[i],
+            "categoria": self.categorias[self.codigo_categoria[i]],
+            "precio": float(self.precio[i]),
+            "costo": float(self.costo[i]),
+            "stock": int(self.stock[i])
+        }
+
+    def skus_de_categoria(self, categoria):
+        """SKUs de una categoría en el orden del catálogo"""
+        return self.sku[self._por_categoria[self.categorias.index(categoria)]]
+
+    # --- VISTAS VECTORIZADAS ---
+    def margen(self):
+        """Margen sobre costo en %; NaN donde el costo es 0"""
+        margen = np.full(len(self), np.nan)
+        np.divide(self.precio - self.costo, self.costo, out=margen, where=self.costo > 0)
+        return margen * 100
+
+    def valorizacion(self):
+        """Valor del stock a costo y a precio de venta"""
+        return {
+            "costo": float(self.stock @ self.costo),
+            "venta": float(self.stock @ self.precio)
+        }
+
+    def como_dataframe(self):
+        """Tabla de inventario para mostrar (pandas se importa solo aquí)"""
+        import pandas as pd
+        return pd.DataFrame({
+            "SKU": self.sku,
+            "Código de barras": self.codigo_barras,
+            "Categoría": pd.Categorical.from_codes(self.codigo_categoria, self.categorias),
+            "Producto": self.nombre,
+            "Precio": self.precio,
+            "Costo": self.costo,
+            "Stock": self.stock,
+            "Margen": self.margen()
+        })
@@ -0,0 +1,31 @@
+"""Autocompletado de clientes registrados para el campo de cliente del cobro"""
+import threading
+
+from busqueda import IndiceBusqueda
+
+
+class IndiceClientes:
+    """Índice por prefijo de cada palabra del nombre (y tolerante a errores) sobre el registro de clientes
+
+    Se construye una vez; en cada consulta solo lee los clientes dados de alta desde la
+    anterior (cualquier caja o el servicio de la caja pueden registrar uno al cobrar).
+    """
+
+    def __init__(self, libro):
+        self._libro = libro
+        self._indice = IndiceBusqueda(())
+        self._nombres = {}   # id -> nombre
+        self._ultimo_id = 0
+        self._lock = threading.Lock()
+
+    def _ponerse_al_dia(self):
+        for cliente_id, nombre in self._libro.clientes_desde(self._ultimo_id):
+            self._indice.agregar(cliente_id, nombre)
+            self._nombres[cliente_id] = nombre
+            self._ultimo_id = cliente_id
+
+    def sugerir(self, texto, limite=5):
+        """Nombres de clientes que coinciden con lo escrito, por relevancia"""
+        with self._lock:
+            self._ponerse_al_dia()
+            return [self._nombres[i] for i in self._indice.buscar(texto, limite)]
@@ -0,0 +1,85 @@
+"""Reporte consolidado de la cadena: cada sucursal se agrega en su propio proceso y se suman los parciales
+
+Cada sucursal vende sobre su propio libro (ver libro_ventas.sucursales()). La tarea de una
+sucursal lee solo el cubo de acumulados de su archivo, ya sumado en SQLite por método de
+pago, categoría, producto y día; los parciales son pocos diccionarios y se suman aquí.
+Sumar una sucursal suma una tarea independiente: nunca se releen ventas crudas.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from libro_ventas import DIMENSIONES, LibroVentas
+
+MEDIDAS = ("total", "ganancia", "unidades", "transacciones")
+TOTALES_VACIOS = (0.0, 0.0, 0, 0)
+
+
+def parcial_sucursal(ruta, desde, hasta):
+    """Tarea de un proceso: {dimensión: {valor: medidas}} de una sucursal, más "dia" con los totales diarios
+
+    El libro de la sucursal se abre en solo lectura: leerlo nunca lo migra ni lo modifica.
+    """
+    libro = LibroVentas(ruta, solo_lectura=True)
+    parcial = {dimension: libro.acumulado_por(dimension, desde, hasta) for dimension in DIMENSIONES}
+    parcial["dia"] = {
+        celda["periodo"]: tuple(celda[m] for m in MEDIDAS)
+        for celda in libro.rollup("dia", "total", desde, hasta)
+    }
+    return parcial
+
+
+def sumar_parciales(parciales):
+    """Suma medida a medida los parciales de varias sucursales"""
+    suma = {}
+    for parcial in parciales:
+        for dimension, valores in parcial.items():
+            destino = suma.setdefault(dimension, {})
+            for valor, medidas in valores.items():
+                previas = destino.get(valor)
+                destino[valor] = medidas if previas is None else tuple(a + b for a, b in zip(previas, medidas))
+    return suma
+
+
+def consolidar(rutas, desde, hasta, procesos=None):
+    """Consolida el período para las sucursales de `rutas` ({sucursal: ruta del libro})
+
+    Devuelve {"cadena": parcial sumado, "sucursales": {sucursal: parcial}}. Con más de una
+    sucursal y de un núcleo cada libro se lee en un proceso ('spawn', como los reportes por día);
+    si no, en este mismo, que arrancar el pool cuesta más que leer un libro.
+    """
+    nombres = list(rutas)
+    procesos = min(procesos or os.cpu_count() or 1, len(nombres))
+    if procesos <= 1:
+        parciales = [parcial_sucursal(rutas[s], desde, hasta) for s in nombres]
+    else:
+        contexto = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+            parciales = list(pool.map(parcial_sucursal, [rutas[s] for s in nombres],
+                                      [desde] * len(nombres), [hasta] * len(nombres)))
+    return {"cadena": sumar_parciales(parciales), "sucursales": dict(zip(nombres, parciales))}
+
+
+def totales(parcial):
+    """(total, ganancia, unidades, transacciones) de un parcial"""
+    return parcial.get("total", {}).get("", TOTALES_VACIOS)
+
+
+def filas(parcial, dimension, etiqueta):
+    """Filas de una dimensión de mayor a menor total, con `etiqueta` como nombre de la primera columna"""
+    return [
+        {etiqueta: valor, "Total": total, "Ganancia": ganancia, "Unidades": unidades, "Transacciones": transacciones}
+        for valor, (total, ganancia, unidades, transacciones)
+        in sorted(parcial.get(dimension, {}).items(), key=lambda item: -item[1][0])
+    ]
+
+
+def comparativo(consolidado):
+    """Una fila por sucursal con sus totales y su participación en la cadena"""
+    total_cadena = totales(consolidado["cadena"])[0]
+    return [
+        {"Sucursal": sucursal, "Total": total, "Ganancia": ganancia, "Unidades": unidades,
+         "Transacciones": transacciones, "% de la cadena": 100 * total / total_cadena if total_cadena else 0.0}
+        for sucursal, (total, ganancia, unidades, transacciones)
+        in ((s, totales(p)) for s, p in consolidado["sucursales"].items())
+    ]
@@ -0,0 +1,55 @@
+"""Tablas derivadas de la pestaña de estadísticas, guardadas por versión del libro"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+
+def _diarias(filas):
+    return pd.DataFrame(filas, columns=["dia", "total", "ganancia"]).set_index("dia")
+
+
+def _cantidades(filas):
+    return pd.DataFrame(filas, columns=["Producto", "Cantidad"]).set_index("Producto")["Cantidad"]
+
+
+class CacheEstadisticas:
+    """Ventas por día y unidades por producto, una entrada por versión (id de la última venta)
+
+    Volver a mirar sin ventas nuevas no consulta nada. Cuando hay ventas nuevas se
+    agregan solo las posteriores a la versión guardada más reciente y se suman a ella.
+    """
+
+    def __init__(self, libro, max_versiones=4):
+        self._libro = libro
+        self._max_versiones = max_versiones
+        self._versiones = OrderedDict()   # versión -> (ventas por día, unidades por producto)
+        self._lock = threading.Lock()
+
+    def obtener(self):
+        """Devuelve (ventas_diarias, cantidades) de la versión vigente"""
+        version = self._libro.ultima_venta_id()
+        with self._lock:
+            marcos = self._versiones.get(version)
+            if marcos is not None:
+                self._versiones.move_to_end(version)
+                return marcos
+            base = max((v for v in self._versiones if v < version), default=None)
+            marcos_base = self._versiones.get(base)
+
+        if base is None:
+            diarias = _diarias(self._libro.totales_por_dia(0, version))
+            cantidades = _cantidades(self._libro.cantidades_por_producto(0, version))
+        else:
+            diarias_base, cantidades_base = marcos_base
+            diarias = diarias_base.add(_diarias(self._libro.totales_por_dia(base, version)), fill_value=0)
+            cantidades = cantidades_base.add(
+                _cantidades(self._libro.cantidades_por_producto(base, version)), fill_value=0
+            ).astype("int64")
+        marcos = (diarias, cantidades)
+
+        with self._lock:
+            self._versiones[version] = marcos
+            while len(self._versiones) > self._max_versiones:
+                self._versiones.popitem(last=False)
+        return marcos
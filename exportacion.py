@@ -0,0 +1,75 @@
+"""Exportación del historial por lotes a CSV (opcionalmente gzip) y Parquet, con memoria constante"""
+import csv
+import gzip
+import io
+import tempfile
+
+COLUMNAS = ("Fecha", "Cliente", "Producto", "Categoría", "Cantidad", "Precio Unitario",
+            "Subtotal", "Método Pago", "Total Venta", "Ganancia")
+
+
+def exportar_csv(lotes, destino, comprimir=False):
+    """Escribe los lotes de filas en `destino` (archivo binario) y devuelve cuántas filas escribió"""
+    salida = gzip.GzipFile(fileobj=destino, mode="wb") if comprimir else destino
+    texto = io.TextIOWrapper(salida, encoding="utf-8", newline="")
+    escritor = csv.writer(texto)
+    escritor.writerow(COLUMNAS)
+    filas = 0
+    for lote in lotes:
+        escritor.writerows(lote)
+        filas += len(lote)
+    texto.flush()
+    texto.detach()   # no cierra `destino`
+    if comprimir:
+        salida.close()
+    return filas
+
+
+def exportar_csv_gzip(lotes, destino):
+    return exportar_csv(lotes, destino, comprimir=True)
+
+
+def exportar_parquet(lotes, destino):
+    """Escribe los lotes como grupos de filas de un Parquet comprimido (pyarrow se importa solo aquí)"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    esquema = pa.schema([
+        ("Fecha", pa.timestamp("us")),
+        ("Cliente", pa.string()),
+        ("Producto", pa.string()),
+        ("Categoría", pa.string()),
+        ("Cantidad", pa.int64()),
+        ("Precio Unitario", pa.float64()),
+        ("Subtotal", pa.float64()),
+        ("Método Pago", pa.string()),
+        ("Total Venta", pa.float64()),
+        ("Ganancia", pa.float64()),
+    ])
+    filas = 0
+    with pq.ParquetWriter(destino, esquema, compression="zstd") as escritor:
+        for lote in lotes:
+            fechas, *columnas = zip(*lote)
+            escritor.write_table(pa.Table.from_arrays(
+                [pa.array(fechas, type=pa.string()).cast(pa.timestamp("us"))]
+                + [pa.array(c, type=campo.type) for c, campo in zip(columnas, list(esquema)[1:])],
+                schema=esquema
+            ))
+            filas += len(lote)
+    return filas
+
+
+# nombre visible -> (función, tipo MIME, extensión)
+FORMATOS = {
+    "CSV": (exportar_csv, "text/csv", "csv"),
+    "CSV comprimido (gzip)": (exportar_csv_gzip, "application/gzip", "csv.gz"),
+    "Parquet": (exportar_parquet, "application/vnd.apache.parquet", "parquet"),
+}
+
+
+def exportar(lotes, formato):
+    """Genera la exportación en un archivo temporal en disco y lo devuelve abierto desde el inicio"""
+    archivo = tempfile.TemporaryFile()
+    FORMATOS[formato][0](lotes, archivo)
+    archivo.seek(0)
+    return archivo
@@ -0,0 +1,113 @@
+"""Facturas en PDF generadas fuera del clic de cobro y guardadas por número de venta
+
+reportlab se importa con la primera factura (en el hilo que la genera), no al abrir la app.
+"""
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+
+from metricas import cronometrar
+
+ANCHO, ALTO = 612.0, 792.0   # carta en puntos (reportlab.lib.pagesizes.letter), sin cargar reportlab
+
+
+@lru_cache(maxsize=1)
+def membrete():
+    """Capa fija de la factura (encabezado, títulos de columnas y pie); se arma una sola vez"""
+    from reportlab.graphics.shapes import Drawing, String
+    dibujo = Drawing(ANCHO, ALTO)
+    dibujo.add(String(ANCHO/2, ALTO-50, "SweetBakery", fontName="Helvetica-Bold", fontSize=18, textAnchor="middle"))
+    dibujo.add(String(ANCHO/2, ALTO-70, "Av. Principal 123 - Tel: 555-1234",
+                      fontName="Helvetica", fontSize=10, textAnchor="middle"))
+    dibujo.add(String(100, ALTO-130, "Cliente:", fontName="Helvetica-Bold", fontSize=12))
+    for x, titulo in ((100, "Producto"), (300, "Cant."), (350, "P.Unit"), (450, "Subtotal")):
+        dibujo.add(String(x, ALTO-160, titulo, fontName="Helvetica-Bold", fontSize=12))
+    dibujo.add(String(ANCHO/2, 50, "¡Gracias por su compra! Vuelva pronto",
+                      fontName="Helvetica-Oblique", fontSize=8, textAnchor="middle"))
+    return dibujo
+
+
+@cronometrar
+def generar_factura(venta):
+    """Genera un PDF con la factura de la venta; el número de factura es el id de la venta en el libro"""
+    from reportlab.graphics import renderPDF
+    from reportlab.pdfgen import canvas
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(ANCHO, ALTO))
+
+    # Capa fija como XObject del documento
+    c.beginForm("membrete")
+    renderPDF.draw(membrete(), c, 0, 0)
+    c.endForm()
+    c.doForm("membrete")
+
+    # Encabezado variable
+    c.setFont("Helvetica", 10)
+    c.drawCentredString(ANCHO/2, ALTO-85, f"Factura #{venta.id}")
+    c.drawCentredString(ANCHO/2, ALTO-100, f"Fecha: {venta.fecha.strftime('%Y-%m-%d %H:%M')}")
+
+    # Información del cliente
+    c.setFont("Helvetica", 12)
+    c.drawString(170, ALTO-130, venta.cliente)
+
+    # Tabla de productos
+    y_position = ALTO-180
+    c.setFont("Helvetica", 10)
+    for linea in venta.lineas:
+        c.drawString(100, y_position, linea.producto)
+        c.drawString(300, y_position, str(linea.cantidad))
+        c.drawString(350, y_position, f"${linea.precio}")
+        c.drawString(450, y_position, f"${linea.subtotal}")
+        y_position -= 20
+
+    # Totales
+    c.line(100, y_position-20, ANCHO-100, y_position-20)
+    c.setFont("Helvetica-Bold", 14)
+    c.drawString(350, y_position-40, "TOTAL:")
+    c.drawString(450, y_position-40, f"${venta.total}")
+
+    # Método de pago
+    c.setFont("Helvetica", 10)
+    c.drawString(100, y_position-70, f"Método de pago: {venta.metodo_pago}")
+
+    c.save()
+    buffer.seek(0)
+    return buffer
+
+
+class ServicioFacturas:
+    """Cola de generación de facturas en hilos, con caché acotada de PDFs por id de venta"""
+
+    def __init__(self, hilos=2, max_facturas=256):
+        self._pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix="facturas")
+        self._max_facturas = max_facturas
+        self._facturas = OrderedDict()   # id de venta -> Future con los bytes del PDF
+        self._lock = threading.Lock()
+
+    def solicitar(self, venta):
+        """Encola la factura (si no está ya en caché) y devuelve su Future sin esperar
+
+        Si la factura salió de la caché se vuelve a generar; un intento fallido queda
+        guardado (con su excepción) hasta que se pida reintentar().
+        """
+        with self._lock:
+            futuro = self._facturas.get(venta.id)
+            if futuro is None:
+                futuro = self._pool.submit(lambda: generar_factura(venta).getvalue())
+                self._facturas[venta.id] = futuro
+                if len(self._facturas) > self._max_facturas:
+                    self._facturas.popitem(last=False)
+            else:
+                self._facturas.move_to_end(venta.id)
+            return futuro
+
+    def reintentar(self, venta):
+        """Descarta un intento fallido de la factura y la vuelve a encolar"""
+        with self._lock:
+            futuro = self._facturas.get(venta.id)
+            if futuro is not None and futuro.done() and futuro.exception():
+                del self._facturas[venta.id]
+        return self.solicitar(venta)
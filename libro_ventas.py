@@ -0,0 +1,1027 @@
+"""Libro de ventas persistente en SQLite (modo WAL)"""
+import datetime
+import json
+import os
+import re
+import sqlite3
+import threading
+import urllib.request
+from contextlib import contextmanager
+
+import numpy as np
+
+from busqueda import normalizar
+from catalogo import Catalogo
+from registros import LineaVenta, Venta
+
+# --- SUCURSALES ---
+# Cada sucursal tiene su propio libro: un archivo <sucursal>.db en DIRECTORIO_SUCURSALES.
+# VENTAS_SUCURSAL elige el de esta instalación; sin ella se usa el libro único de siempre.
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos")
+DIRECTORIO_SUCURSALES = os.environ.get("VENTAS_SUCURSALES", os.path.join(DIRECTORIO_DATOS, "sucursales"))
+SUCURSAL = os.environ.get("VENTAS_SUCURSAL") or None
+_ID_SUCURSAL = re.compile(r"[A-Za-z0-9_-]+")
+
+
+def ruta_sucursal(sucursal, directorio=DIRECTORIO_SUCURSALES):
+    """Ruta del libro de una sucursal; el id solo admite letras, números, '-' y '_'"""
+    if not _ID_SUCURSAL.fullmatch(sucursal or ""):
+        raise ValueError(f"Identificador de sucursal inválido: {sucursal!r}")
+    return os.path.join(directorio, f"{sucursal}.db")
+
+
+def sucursales(directorio=DIRECTORIO_SUCURSALES):
+    """{sucursal: ruta} de los libros que hay en el directorio de sucursales, ordenado por id"""
+    if not os.path.isdir(directorio):
+        return {}
+    return {
+        nombre[:-3]: os.path.join(directorio, nombre)
+        for nombre in sorted(os.listdir(directorio))
+        if nombre.endswith(".db") and _ID_SUCURSAL.fullmatch(nombre[:-3])
+    }
+
+
+RUTA_POR_DEFECTO = os.environ.get(
+    "VENTAS_DB",
+    ruta_sucursal(SUCURSAL) if SUCURSAL else os.path.join(DIRECTORIO_DATOS, "ventas.db")
+)
+
+# --- CUBO DE AGREGADOS ---
+# Cada venta suma en un bucket por granularidad (hora, día, semana que empieza el lunes,
+# mes) para el total y para cada método de pago, categoría y producto que contiene.
+GRANULARIDADES = ("hora", "dia", "semana", "mes")
+DIMENSIONES = ("total", "metodo_pago", "categoria", "producto")
+
+# Misma clave de periodo que _periodo(), calculada en SQL a partir del bucket horario r.periodo.
+# Cada venta cae en una sola hora, así que sumar las horas (incluso las transacciones) da
+# el mismo resultado que agrupar las ventas por día, semana o mes.
+_PERIODO_SQL = (
+    "CASE g.granularidad WHEN 'dia' THEN substr(r.periodo, 1, 10) "
+    "WHEN 'semana' THEN date(substr(r.periodo, 1, 10), 'weekday 0', '-6 days') "
+    "ELSE substr(r.periodo, 1, 7) END"
+)
+
+
+def _periodo(granularidad, fecha):
+    """Clave del bucket de `fecha` ('2025-06-15 13', '2025-06-15', lunes de la semana, '2025-06')"""
+    if granularidad == "hora":
+        return fecha.strftime("%Y-%m-%d %H")
+    if granularidad == "dia":
+        return fecha.strftime("%Y-%m-%d")
+    if granularidad == "semana":
+        return (fecha.date() - datetime.timedelta(days=fecha.weekday())).isoformat()
+    return fecha.strftime("%Y-%m")
+
+
+def _filas_rollup(fecha, metodo_pago, lineas):
+    """Celdas del cubo que toca una venta: (granularidad, dimensión, periodo, valor, medidas...)"""
+    celdas = {}
+    for l in lineas:
+        subtotal = l["cantidad"] * l["precio"]
+        ganancia = subtotal - l["cantidad"] * l["costo"]
+        for clave in (("total", ""), ("metodo_pago", metodo_pago),
+                      ("categoria", l["categoria"]), ("producto", l["producto"])):
+            celda = celdas.setdefault(clave, [0.0, 0.0, 0, 1])
+            celda[0] += subtotal
+            celda[1] += ganancia
+            celda[2] += l["cantidad"]
+    return [(g, dimension, _periodo(g, fecha), valor, *medidas)
+            for g in GRANULARIDADES for (dimension, valor), medidas in celdas.items()]
+
+
+# Relleno de las tablas de acumulados a partir de ventas y líneas; lo usan las migraciones
+# que las crean y LibroVentas.reconstruir_acumulados()
+_ACUMULAR_RESUMENES = """
+    INSERT INTO resumen_metodo_dia (dia, metodo_pago, total, transacciones)
+    SELECT substr(fecha, 1, 10), metodo_pago, SUM(total), COUNT(*)
+    FROM ventas GROUP BY substr(fecha, 1, 10), metodo_pago;
+
+    INSERT INTO resumen_producto_dia (dia, categoria, producto, cantidad, total)
+    SELECT substr(v.fecha, 1, 10), l.categoria, l.producto, SUM(l.cantidad), SUM(l.subtotal)
+    FROM ventas v JOIN venta_lineas l ON l.venta_id = v.id
+    GROUP BY substr(v.fecha, 1, 10), l.categoria, l.producto;
+"""
+
+_ACUMULAR_ROLLUP = f"""
+    WITH u AS (SELECT venta_id, SUM(cantidad) AS unidades FROM venta_lineas GROUP BY venta_id)
+    INSERT INTO rollup_ventas
+    SELECT 'hora', 'total', substr(v.fecha, 1, 13), '', SUM(v.total), SUM(v.ganancia),
+           SUM(COALESCE(u.unidades, 0)), COUNT(*)
+    FROM ventas v LEFT JOIN u ON u.venta_id = v.id
+    GROUP BY 3;
+
+    WITH u AS (SELECT venta_id, SUM(cantidad) AS unidades FROM venta_lineas GROUP BY venta_id)
+    INSERT INTO rollup_ventas
+    SELECT 'hora', 'metodo_pago', substr(v.fecha, 1, 13), v.metodo_pago, SUM(v.total), SUM(v.ganancia),
+           SUM(COALESCE(u.unidades, 0)), COUNT(*)
+    FROM ventas v LEFT JOIN u ON u.venta_id = v.id
+    GROUP BY 3, 4;
+
+    INSERT INTO rollup_ventas
+    SELECT 'hora', 'categoria', substr(v.fecha, 1, 13), l.categoria, SUM(l.subtotal),
+           SUM(l.subtotal - l.cantidad * l.costo), SUM(l.cantidad), COUNT(DISTINCT v.id)
+    FROM ventas v JOIN venta_lineas l ON l.venta_id = v.id
+    GROUP BY 3, 4;
+
+    INSERT INTO rollup_ventas
+    SELECT 'hora', 'producto', substr(v.fecha, 1, 13), l.producto, SUM(l.subtotal),
+           SUM(l.subtotal - l.cantidad * l.costo), SUM(l.cantidad), COUNT(DISTINCT v.id)
+    FROM ventas v JOIN venta_lineas l ON l.venta_id = v.id
+    GROUP BY 3, 4;
+
+    WITH g(granularidad) AS (VALUES ('dia'), ('semana'), ('mes'))
+    INSERT INTO rollup_ventas
+    SELECT g.granularidad, r.dimension, {_PERIODO_SQL}, r.valor,
+           SUM(r.total), SUM(r.ganancia), SUM(r.unidades), SUM(r.transacciones)
+    FROM rollup_ventas r CROSS JOIN g
+    WHERE r.granularidad = 'hora'
+    GROUP BY 1, 2, 3, 4;
+"""
+
+# Cada migración se aplica una sola vez; PRAGMA user_version guarda la última aplicada
+_MIGRACIONES = [
+    """
+    CREATE TABLE ventas (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fecha TEXT NOT NULL,
+        cliente TEXT NOT NULL,
+        metodo_pago TEXT NOT NULL,
+        total REAL NOT NULL,
+        costo REAL NOT NULL,
+        ganancia REAL NOT NULL
+    );
+    CREATE INDEX idx_ventas_fecha ON ventas(fecha);
+
+    CREATE TABLE venta_lineas (
+        venta_id INTEGER NOT NULL REFERENCES ventas(id),
+        producto TEXT NOT NULL,
+        categoria TEXT NOT NULL,
+        cantidad INTEGER NOT NULL,
+        precio REAL NOT NULL,
+        costo REAL NOT NULL,
+        subtotal REAL NOT NULL
+    );
+    CREATE INDEX idx_lineas_venta ON venta_lineas(venta_id);
+    CREATE INDEX idx_lineas_producto ON venta_lineas(producto);
+
+    CREATE TABLE movimientos_stock (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fecha TEXT NOT NULL,
+        producto TEXT NOT NULL,
+        categoria TEXT NOT NULL,
+        cantidad INTEGER NOT NULL,
+        motivo TEXT NOT NULL,
+        venta_id INTEGER REFERENCES ventas(id)
+    );
+    CREATE INDEX idx_movimientos_producto ON movimientos_stock(categoria, producto, fecha);
+    """,
+    """
+    CREATE TABLE productos (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        categoria TEXT NOT NULL,
+        nombre TEXT NOT NULL,
+        precio REAL NOT NULL,
+        costo REAL NOT NULL,
+        stock INTEGER NOT NULL CHECK (stock >= 0),
+        UNIQUE (categoria, nombre)
+    );
+    """,
+    """
+    CREATE TABLE resumen_metodo_dia (
+        dia TEXT NOT NULL,
+        metodo_pago TEXT NOT NULL,
+        total REAL NOT NULL,
+        transacciones INTEGER NOT NULL,
+        PRIMARY KEY (dia, metodo_pago)
+    ) WITHOUT ROWID;
+
+    CREATE TABLE resumen_producto_dia (
+        dia TEXT NOT NULL,
+        categoria TEXT NOT NULL,
+        producto TEXT NOT NULL,
+        cantidad INTEGER NOT NULL,
+        total REAL NOT NULL,
+        PRIMARY KEY (dia, categoria, producto)
+    ) WITHOUT ROWID;
+    """ + _ACUMULAR_RESUMENES,
+    """
+    CREATE TABLE pendientes_sync (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        coleccion TEXT NOT NULL,
+        documento TEXT NOT NULL,
+        datos TEXT NOT NULL,
+        creado TEXT NOT NULL
+    );
+    """,
+    """
+    ALTER TABLE venta_lineas ADD COLUMN producto_id INTEGER REFERENCES productos(id);
+
+    UPDATE venta_lineas SET producto_id = (
+        SELECT p.id FROM productos p
+        WHERE p.categoria = venta_lineas.categoria AND p.nombre = venta_lineas.producto
+    );
+
+    CREATE INDEX idx_lineas_producto_id ON venta_lineas(producto_id);
+    """,
+    """
+    CREATE INDEX idx_ventas_metodo_fecha ON ventas(metodo_pago, fecha);
+    CREATE INDEX idx_lineas_categoria ON venta_lineas(categoria, venta_id);
+    """,
+    """
+    CREATE TABLE rollup_ventas (
+        granularidad TEXT NOT NULL,
+        dimension TEXT NOT NULL,
+        periodo TEXT NOT NULL,
+        valor TEXT NOT NULL,
+        total REAL NOT NULL,
+        ganancia REAL NOT NULL,
+        unidades INTEGER NOT NULL,
+        transacciones INTEGER NOT NULL,
+        PRIMARY KEY (granularidad, dimension, periodo, valor)
+    ) WITHOUT ROWID;
+
+    """ + _ACUMULAR_ROLLUP,
+    """
+    ALTER TABLE productos ADD COLUMN codigo_barras TEXT;
+    CREATE UNIQUE INDEX idx_productos_codigo_barras ON productos(codigo_barras);
+    """,
+    """
+    CREATE TABLE demanda_insatisfecha (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        fecha TEXT NOT NULL,
+        producto_id INTEGER NOT NULL REFERENCES productos(id),
+        cantidad INTEGER NOT NULL
+    );
+    CREATE INDEX idx_demanda_fecha ON demanda_insatisfecha(fecha);
+    """,
+    """
+    CREATE TABLE clientes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        nombre TEXT NOT NULL,
+        clave TEXT NOT NULL UNIQUE,
+        creado TEXT NOT NULL,
+        compras INTEGER NOT NULL DEFAULT 0,
+        total_comprado REAL NOT NULL DEFAULT 0,
+        puntos INTEGER NOT NULL DEFAULT 0,
+        ultima_compra TEXT
+    );
+    CREATE INDEX idx_clientes_total ON clientes(total_comprado);
+
+    ALTER TABLE ventas ADD COLUMN cliente_id INTEGER REFERENCES clientes(id);
+    CREATE INDEX idx_ventas_cliente ON ventas(cliente_id, fecha);
+    """,
+    # Los nombres se normalizan en Python: los clientes de las ventas previas se dan de alta aquí
+    lambda con: _registrar_clientes_existentes(con),
+    """
+    CREATE TABLE version_catalogo (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    );
+    INSERT INTO version_catalogo (id, version) VALUES (1, 0);
+    """,
+]
+
+
+# --- CLIENTES ---
+CONSUMIDOR_FINAL = "Consumidor Final"
+PUNTOS_POR_DOLAR = 1   # puntos de fidelidad por cada dólar entero de la compra
+
+
+def clave_cliente(nombre):
+    """Nombre normalizado que identifica al cliente; None para ventas anónimas"""
+    clave = normalizar(nombre or "")
+    return None if not clave or clave == normalizar(CONSUMIDOR_FINAL) else clave
+
+
+def _registrar_clientes_existentes(con):
+    """Da de alta a los clientes de las ventas ya registradas y les asigna sus ventas y acumulados"""
+    ahora = datetime.datetime.now().isoformat(sep=" ")
+    con.execute("CREATE TEMP TABLE nombres_cliente (nombre TEXT PRIMARY KEY, cliente_id INTEGER NOT NULL)")
+    for (nombre,) in con.execute("SELECT DISTINCT cliente FROM ventas").fetchall():
+        clave = clave_cliente(nombre)
+        if clave is None:
+            continue
+        con.execute("INSERT INTO clientes (nombre, clave, creado) VALUES (?, ?, ?) ON CONFLICT (clave) DO NOTHING",
+                    (nombre, clave, ahora))
+        con.execute("INSERT INTO nombres_cliente SELECT ?, id FROM clientes WHERE clave = ?", (nombre, clave))
+    con.execute("UPDATE ventas SET cliente_id = (SELECT cliente_id FROM nombres_cliente n WHERE n.nombre = ventas.cliente)")
+    con.execute(f"""
+        UPDATE clientes SET (compras, total_comprado, puntos, ultima_compra) = (
+            SELECT COUNT(*), SUM(total), SUM(CAST(total * {PUNTOS_POR_DOLAR} AS INTEGER)), MAX(fecha)
+            FROM ventas WHERE cliente_id = clientes.id
+        )
+    """)
+    con.execute("DROP TABLE nombres_cliente")
+
+
+def _agrupar_ventas(filas):
+    """Filas (venta..., línea...) ordenadas por venta -> lista de Venta con sus líneas"""
+    ventas = []
+    actual, lineas = None, []
+    for f in filas:
+        if actual is None or f[0] != actual[0]:
+            if actual is not None:
+                ventas.append(Venta(*actual, lineas))
+            actual = (f[0], datetime.datetime.fromisoformat(f[1]), f[2], f[3], f[4], f[5])
+            lineas = []
+        lineas.append(LineaVenta(f[6], f[7], f[8], f[9], f[10]))
+    if actual is not None:
+        ventas.append(Venta(*actual, lineas))
+    return ventas
+
+
+class StockInsuficiente(Exception):
+    """Se intentó vender más unidades de las que hay en existencia"""
+
+    def __init__(self, producto, disponible):
+        super().__init__(f"Solo hay {disponible} unidades disponibles de {producto}")
+        self.producto = producto
+        self.disponible = disponible
+
+
+class StockCambiado(Exception):
+    """El stock cambió (otra caja vendió) desde que se mostró el formulario de edición"""
+
+    def __init__(self, producto, actual):
+        super().__init__(f"El stock de {producto} cambió a {actual} mientras se editaba; revisa y guarda de nuevo")
+        self.producto = producto
+        self.actual = actual
+
+
+def _limites_dia(desde, hasta):
+    """Convierte un rango de fechas inclusivo en límites ISO [inicio, fin)"""
+    inicio = datetime.datetime.combine(desde, datetime.time.min)
+    fin = datetime.datetime.combine(hasta + datetime.timedelta(days=1), datetime.time.min)
+    return inicio.isoformat(sep=" "), fin.isoformat(sep=" ")
+
+
+class LibroVentas:
+    """Registro durable de ventas, líneas, movimientos e inventario compartido"""
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO, solo_lectura=False):
+        """Con `solo_lectura` abre un libro existente sin migrarlo ni crear nada (p. ej. el de otra sucursal)"""
+        self.ruta = ruta
+        self.solo_lectura = solo_lectura
+        if ruta != ":memory:" and not solo_lectura:
+            os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        self._local = threading.local()
+        self._catalogo = None
+        self._version_en_cache = None
+        self._lock_catalogo = threading.Lock()
+        self._lock_escritura = threading.Lock()
+        self._oyentes = []
+        if not solo_lectura:
+            self._migrar()
+
+    # --- CONEXIONES ---
+    def _conexion(self):
+        """Devuelve la conexión del hilo actual (SQLite no comparte conexiones entre hilos)"""
+        con = getattr(self._local, "con", None)
+        if con is None:
+            if self.solo_lectura:
+                uri = f"file:{urllib.request.pathname2url(os.path.abspath(self.ruta))}?mode=ro"
+                con = sqlite3.connect(uri, uri=True, timeout=5.0, isolation_level=None)
+            else:
+                con = sqlite3.connect(self.ruta, timeout=5.0, isolation_level=None)
+                con.execute("PRAGMA journal_mode=WAL")
+                con.execute("PRAGMA synchronous=NORMAL")
+                con.execute("PRAGMA foreign_keys=ON")
+            con.row_factory = sqlite3.Row
+            self._local.con = con
+        return con
+
+    @contextmanager
+    def _transaccion(self):
+        """Transacción de escritura; toma el bloqueo al inicio para evitar interbloqueos"""
+        con = self._conexion()
+        # Los hilos de este proceso hacen fila en el lock; SQLite solo arbitra entre procesos
+        # (su espera por bloqueo duerme en intervalos de varios milisegundos)
+        with self._lock_escritura:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+            con.execute("COMMIT")
+
+    def suscribir(self, oyente):
+        """Registra una función que se llama (sin argumentos) tras cada escritura confirmada"""
+        self._oyentes.append(oyente)
+
+    def _notificar(self):
+        for oyente in self._oyentes:
+            oyente()
+
+    def _migrar(self):
+        """Aplica las migraciones pendientes del esquema"""
+        with self._transaccion() as con:
+            version = con.execute("PRAGMA user_version").fetchone()[0]
+            for numero, script in enumerate(_MIGRACIONES[version:], start=version + 1):
+                if callable(script):
+                    script(con)
+                    con.execute(f"PRAGMA user_version = {numero}")
+                    continue
+                for sentencia in script.split(";"):
+                    if sentencia.strip():
+                        con.execute(sentencia)
+                con.execute(f"PRAGMA user_version = {numero}")
+
+    # --- SALIDA PARA SINCRONIZACIÓN ---
+    # Los cambios a replicar se escriben en la misma transacción que los produce;
+    # la tabla sirve de búfer en disco mientras no haya red.
+    def _encolar_sync(self, con, coleccion, documento, datos):
+        con.execute(
+            "INSERT INTO pendientes_sync (coleccion, documento, datos, creado) VALUES (?, ?, ?, ?)",
+            (coleccion, str(documento), json.dumps(datos), datetime.datetime.now().isoformat(sep=" "))
+        )
+
+    def _encolar_producto(self, con, sku):
+        fila = con.execute(
+            "SELECT id, categoria, nombre, precio, costo, stock, codigo_barras FROM productos WHERE id = ?", (sku,)
+        ).fetchone()
+        if fila:
+            self._encolar_sync(con, "productos", fila["id"], dict(fila))
+
+    def _encolar_productos(self, con, claves):
+        """Encola varios productos a la vez, identificados por (categoría, nombre)"""
+        claves = set(claves)
+        con.executemany(
+            "INSERT INTO pendientes_sync (coleccion, documento, datos, creado) VALUES ('productos', ?, ?, ?)",
+            [(str(f["id"]), json.dumps(dict(f)), datetime.datetime.now().isoformat(sep=" "))
+             for f in con.execute("SELECT id, categoria, nombre, precio, costo, stock, codigo_barras FROM productos")
+             if (f["categoria"], f["nombre"]) in claves]
+        )
+
+    def pendientes_sync(self, limite=500):
+        """Cambios aún no replicados, en orden de confirmación"""
+        return [
+            (f["id"], f["coleccion"], f["documento"], json.loads(f["datos"]))
+            for f in self._conexion().execute(
+                "SELECT id, coleccion, documento, datos FROM pendientes_sync ORDER BY id LIMIT ?", (limite,)
+            )
+        ]
+
+    def confirmar_sync(self, ids):
+        """Elimina del búfer los cambios ya replicados"""
+        with self._transaccion() as con:
+            con.executemany("DELETE FROM pendientes_sync WHERE id = ?", [(i,) for i in ids])
+
+    def contar_pendientes_sync(self):
+        return self._conexion().execute("SELECT COUNT(*) FROM pendientes_sync").fetchone()[0]
+
+    # --- INVENTARIO ---
+    @property
+    def version_catalogo(self):
+        """Sube con cada alta o edición de productos; invalida índices derivados del catálogo
+
+        Vive en la base y se sube en la misma transacción que el cambio: así la ven también
+        los otros procesos que usan el archivo (el servicio de la caja, otra instancia).
+        """
+        return self._conexion().execute("SELECT version FROM version_catalogo").fetchone()[0]
+
+    @staticmethod
+    def _subir_version_catalogo(con):
+        con.execute("UPDATE version_catalogo SET version = version + 1")
+
+    def sembrar_productos(self, inventario):
+        """Carga el catálogo inicial si la tabla de productos está vacía"""
+        with self._transaccion() as con:
+            if con.execute("SELECT 1 FROM productos LIMIT 1").fetchone():
+                return
+            con.executemany(
+                "INSERT INTO productos (categoria, nombre, precio, costo, stock) VALUES (?, ?, ?, ?, ?)",
+                [(categoria, nombre, datos["precio"], datos["costo"], datos["stock"])
+                 for categoria, productos in inventario.items()
+                 for nombre, datos in productos.items()]
+            )
+            self._subir_version_catalogo(con)
+
+    def catalogo(self):
+        """Catálogo columnar con el stock vigente
+
+        Las columnas fijas (nombres, categorías, precios) se releen solo cuando cambia
+        version_catalogo; en cada llamada se consulta únicamente la columna de stock.
+        """
+        con = self._conexion()
+        version = self.version_catalogo
+        with self._lock_catalogo:
+            if self._catalogo is None or self._version_en_cache != version:
+                self._version_en_cache = version
+                self._catalogo = Catalogo.desde_filas(con.execute(
+                    "SELECT id, categoria, nombre, precio, costo, stock, codigo_barras FROM productos ORDER BY id"
+                ).fetchall())
+                return self._catalogo
+            base = self._catalogo
+        stock = np.fromiter(
+            (f[0] for f in con.execute("SELECT stock FROM productos ORDER BY id")),
+            dtype=np.int64, count=len(base)
+        )
+        return base.con_stock(stock)
+
+    def sku_por_codigo(self, codigo):
+        """SKU de un código de barras (o de un SKU tecleado), o None
+
+        Se resuelve en el diccionario del catálogo en caché, sin consultar la base.
+        """
+        catalogo = self._catalogo
+        if catalogo is None or self._version_en_cache != self.version_catalogo:
+            catalogo = self.catalogo()
+        return catalogo.sku_de_codigo(codigo)
+
+    def producto(self, sku):
+        """Un producto con su stock vigente (consulta por clave primaria), o None si no existe"""
+        fila = self._conexion().execute(
+            "SELECT id, categoria, nombre, precio, costo, stock FROM productos WHERE id = ?", (sku,)
+        ).fetchone()
+        if fila is None:
+            return None
+        return {"sku": fila["id"], "nombre": fila["nombre"], "categoria": fila["categoria"],
+                "precio": fila["precio"], "costo": fila["costo"], "stock": fila["stock"]}
+
+    def stock_de(self, sku):
+        """Existencia actual de un producto (consulta por clave primaria)"""
+        fila = self._conexion().execute("SELECT stock FROM productos WHERE id = ?", (sku,)).fetchone()
+        return fila["stock"] if fila else 0
+
+    def actualizar_producto(self, sku, precio, costo, stock=None, stock_anterior=None):
+        """Actualiza precio y costo y, si se indica, el stock; la diferencia de stock queda como ajuste
+
+        El stock se escribe solo si sigue siendo `stock_anterior` (el que vio quien lo edita):
+        si otra caja vendió entretanto se lanza StockCambiado y no se guarda nada.
+        """
+        with self._transaccion() as con:
+            anterior = con.execute(
+                "SELECT categoria, nombre, stock FROM productos WHERE id = ?", (sku,)
+            ).fetchone()
+            con.execute("UPDATE productos SET precio = ?, costo = ? WHERE id = ?", (precio, costo, sku))
+            if anterior and stock is not None and stock != stock_anterior:
+                if anterior["stock"] != stock_anterior:
+                    raise StockCambiado(anterior["nombre"], anterior["stock"])
+                con.execute("UPDATE productos SET stock = ? WHERE id = ? AND stock = ?", (stock, sku, stock_anterior))
+                con.execute(
+                    "INSERT INTO movimientos_stock (fecha, producto, categoria, cantidad, motivo) "
+                    "VALUES (?, ?, ?, ?, 'ajuste')",
+                    (datetime.datetime.now().isoformat(sep=" "), anterior["nombre"], anterior["categoria"],
+                     stock - stock_anterior)
+                )
+            self._encolar_producto(con, sku)
+            self._subir_version_catalogo(con)
+        self._notificar()
+
+    def asignar_codigo_barras(self, sku, codigo):
+        """Asigna (o quita, con un código vacío) el código de barras de un producto
+
+        Lanza ValueError si el código ya pertenece a otro producto.
+        """
+        codigo = (codigo or "").strip() or None
+        try:
+            with self._transaccion() as con:
+                con.execute("UPDATE productos SET codigo_barras = ? WHERE id = ?", (codigo, sku))
+                self._encolar_producto(con, sku)
+                self._subir_version_catalogo(con)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"El código {codigo} ya está asignado a otro producto")
+        self._notificar()
+
+    def registrar_demanda_insatisfecha(self, sku, cantidad):
+        """Anota unidades pedidas que no se pudieron vender por falta de stock"""
+        with self._transaccion() as con:
+            con.execute(
+                "INSERT INTO demanda_insatisfecha (fecha, producto_id, cantidad) VALUES (?, ?, ?)",
+                (datetime.datetime.now().isoformat(sep=" "), sku, cantidad)
+            )
+
+    def _registrar_ajustes(self, con, ajustes, motivo):
+        """Movimientos de stock por diferencia; `ajustes` son (categoría, nombre, diferencia)"""
+        fecha = datetime.datetime.now().isoformat(sep=" ")
+        con.executemany(
+            "INSERT INTO movimientos_stock (fecha, producto, categoria, cantidad, motivo) VALUES (?, ?, ?, ?, ?)",
+            [(fecha, nombre, categoria, diferencia, motivo) for categoria, nombre, diferencia in ajustes if diferencia]
+        )
+
+    def importar_productos(self, filas):
+        """Alta o actualización masiva del catálogo en una sola transacción
+
+        `filas` son tuplas (categoría, nombre, precio, costo, stock) ya validadas. Los
+        productos que no existen se crean; las diferencias de stock quedan como
+        movimientos de 'importación'. Devuelve (creados, actualizados).
+        """
+        filas = list(filas)
+        with self._transaccion() as con:
+            anteriores = {(f[0], f[1]): f[2] for f in con.execute("SELECT categoria, nombre, stock FROM productos")}
+            con.executemany(
+                "INSERT INTO productos (categoria, nombre, precio, costo, stock) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (categoria, nombre) DO UPDATE SET "
+                "precio = excluded.precio, costo = excluded.costo, stock = excluded.stock",
+                filas
+            )
+            self._registrar_ajustes(
+                con, [(c, n, stock - anteriores.get((c, n), 0)) for c, n, _, _, stock in filas], "importación"
+            )
+            self._encolar_productos(con, ((c, n) for c, n, *_ in filas))
+            self._subir_version_catalogo(con)
+        self._notificar()
+        creados = sum((c, n) not in anteriores for c, n, *_ in filas)
+        return creados, len(filas) - creados
+
+    def contar_stock(self, filas):
+        """Aplica un conteo físico: `filas` son (categoría, nombre, stock contado) de productos existentes
+
+        Todo el conteo entra en una transacción; cada diferencia queda como movimiento de 'conteo'.
+        Devuelve cuántos productos cambiaron.
+        """
+        filas = list(filas)
+        with self._transaccion() as con:
+            anteriores = {(f[0], f[1]): f[2] for f in con.execute("SELECT categoria, nombre, stock FROM productos")}
+            con.executemany(
+                "UPDATE productos SET stock = ? WHERE categoria = ? AND nombre = ?",
+                [(stock, c, n) for c, n, stock in filas]
+            )
+            ajustes = [(c, n, stock - anteriores[(c, n)]) for c, n, stock in filas]
+            self._registrar_ajustes(con, ajustes, "conteo")
+            self._encolar_productos(con, ((c, n) for c, n, diferencia in ajustes if diferencia))
+        # Solo cambia el stock, que catalogo() relee siempre: no hace falta subir version_catalogo
+        self._notificar()
+        return sum(1 for *_, diferencia in ajustes if diferencia)
+
+    def reconstruir_acumulados(self):
+        """Recalcula desde cero los resúmenes diarios y el cubo (tras una carga masiva de ventas)"""
+        with self._transaccion() as con:
+            for tabla in ("resumen_metodo_dia", "resumen_producto_dia", "rollup_ventas"):
+                con.execute(f"DELETE FROM {tabla}")
+            for sentencia in (_ACUMULAR_RESUMENES + _ACUMULAR_ROLLUP).split(";"):
+                if sentencia.strip():
+                    con.execute(sentencia)
+
+    # --- ESCRITURA ---
+    def registrar_venta(self, cliente, metodo_pago, lineas, fecha=None):
+        """Registra la venta y descuenta el stock en una sola transacción
+
+        `lineas` son diccionarios con sku, cantidad y precio; nombre, categoría y
+        costo se toman del producto dentro de la transacción.
+
+        Cada descuento es condicional (stock >= cantidad), así dos cajas que venden
+        el mismo producto a la vez nunca dejan el stock en negativo: la segunda
+        recibe StockInsuficiente y su transacción se revierte completa.
+        """
+        fecha = fecha or datetime.datetime.now()
+        fecha_iso = fecha.isoformat(sep=" ")
+        lineas = [dict(l) for l in lineas]
+
+        with self._transaccion() as con:
+            for l in lineas:
+                producto = con.execute(
+                    "SELECT categoria, nombre, costo, stock FROM productos WHERE id = ?", (l["sku"],)
+                ).fetchone()
+                if producto is None or producto["stock"] < l["cantidad"]:
+                    raise StockInsuficiente(producto["nombre"] if producto else l["sku"],
+                                            producto["stock"] if producto else 0)
+                con.execute(
+                    "UPDATE productos SET stock = stock - ? WHERE id = ? AND stock >= ?",
+                    (l["cantidad"], l["sku"], l["cantidad"])
+                )
+                l["producto"], l["categoria"], l["costo"] = producto["nombre"], producto["categoria"], producto["costo"]
+
+            total = sum(l["cantidad"] * l["precio"] for l in lineas)
+            costo_total = sum(l["cantidad"] * l["costo"] for l in lineas)
+            cliente_id = self._acumular_cliente(con, cliente, fecha_iso, total)
+            venta_id = con.execute(
+                "INSERT INTO ventas (fecha, cliente, metodo_pago, total, costo, ganancia, cliente_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (fecha_iso, cliente, metodo_pago, total, costo_total, total - costo_total, cliente_id)
+            ).lastrowid
+            con.executemany(
+                "INSERT INTO venta_lineas (venta_id, producto_id, producto, categoria, cantidad, precio, costo, subtotal) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(venta_id, l["sku"], l["producto"], l["categoria"], l["cantidad"], l["precio"], l["costo"],
+                  l["cantidad"] * l["precio"]) for l in lineas]
+            )
+            con.executemany(
+                "INSERT INTO movimientos_stock (fecha, producto, categoria, cantidad, motivo, venta_id) "
+                "VALUES (?, ?, ?, ?, 'venta', ?)",
+                [(fecha_iso, l["producto"], l["categoria"], -l["cantidad"], venta_id) for l in lineas]
+            )
+
+            # Acumulados del día: los reportes los leen sin recorrer las ventas
+            dia = fecha_iso[:10]
+            con.execute(
+                "INSERT INTO resumen_metodo_dia (dia, metodo_pago, total, transacciones) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (dia, metodo_pago) DO UPDATE SET "
+                "total = total + excluded.total, transacciones = transacciones + 1",
+                (dia, metodo_pago, total)
+            )
+            con.executemany(
+                "INSERT INTO resumen_producto_dia (dia, categoria, producto, cantidad, total) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (dia, categoria, producto) DO UPDATE SET "
+                "cantidad = cantidad + excluded.cantidad, total = total + excluded.total",
+                [(dia, l["categoria"], l["producto"], l["cantidad"], l["cantidad"] * l["precio"]) for l in lineas]
+            )
+            con.executemany(
+                "INSERT INTO rollup_ventas (granularidad, dimension, periodo, valor, total, ganancia, "
+                "unidades, transacciones) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (granularidad, dimension, periodo, valor) DO UPDATE SET "
+                "total = total + excluded.total, ganancia = ganancia + excluded.ganancia, "
+                "unidades = unidades + excluded.unidades, transacciones = transacciones + 1",
+                _filas_rollup(fecha, metodo_pago, lineas)
+            )
+
+            self._encolar_sync(con, "ventas", venta_id, {
+                "fecha": fecha_iso,
+                "cliente": cliente,
+                "cliente_id": cliente_id,
+                "metodo_pago": metodo_pago,
+                "total": total,
+                "costo": costo_total,
+                "ganancia": total - costo_total,
+                "lineas": [{k: l[k] for k in ("sku", "producto", "categoria", "cantidad", "precio", "costo")}
+                           for l in lineas]
+            })
+            for l in lineas:
+                self._encolar_producto(con, l["sku"])
+
+        self._notificar()
+        return Venta(venta_id, fecha, cliente, metodo_pago, total, costo_total, [
+            LineaVenta(l["sku"], l["producto"], l["categoria"], l["cantidad"], l["precio"]) for l in lineas
+        ])
+
+    def _acumular_cliente(self, con, nombre, fecha_iso, total):
+        """Da de alta al cliente si es nuevo y suma la compra a sus contadores; None si es anónimo"""
+        clave = clave_cliente(nombre)
+        if clave is None:
+            return None
+        fila = con.execute(
+            "INSERT INTO clientes (nombre, clave, creado, compras, total_comprado, puntos, ultima_compra) "
+            "VALUES (?, ?, ?, 1, ?, ?, ?) "
+            "ON CONFLICT (clave) DO UPDATE SET compras = compras + 1, "
+            "total_comprado = total_comprado + excluded.total_comprado, puntos = puntos + excluded.puntos, "
+            "ultima_compra = excluded.ultima_compra "
+            "RETURNING id, nombre, compras, total_comprado, puntos, ultima_compra",
+            (nombre.strip(), clave, fecha_iso, total, int(total * PUNTOS_POR_DOLAR), fecha_iso)
+        ).fetchone()
+        self._encolar_sync(con, "clientes", fila["id"], dict(fila))
+        return fila["id"]
+
+    # --- CONSULTAS ---
+    def obtener_venta(self, venta_id):
+        """Una venta con sus productos, o None si no existe"""
+        con = self._conexion()
+        fila = con.execute(
+            "SELECT id, fecha, cliente, metodo_pago, total, costo FROM ventas WHERE id = ?", (venta_id,)
+        ).fetchone()
+        if fila is None:
+            return None
+        lineas = con.execute(
+            "SELECT producto_id, producto, categoria, cantidad, precio FROM venta_lineas WHERE venta_id = ?",
+            (venta_id,)
+        )
+        return Venta(fila["id"], datetime.datetime.fromisoformat(fila["fecha"]), fila["cliente"],
+                     fila["metodo_pago"], fila["total"], fila["costo"], [LineaVenta(*l) for l in lineas])
+
+    def hay_ventas(self):
+        """Indica si existe al menos una venta registrada"""
+        return self._conexion().execute("SELECT 1 FROM ventas LIMIT 1").fetchone() is not None
+
+    def _filtro_lineas(self, desde, hasta, categoria, metodo_pago):
+        """FROM/WHERE común al historial y a la exportación, con sus parámetros"""
+        inicio, fin = _limites_dia(desde, hasta)
+        sql = (
+            "FROM ventas v JOIN venta_lineas l ON l.venta_id = v.id "
+            "WHERE v.fecha >= ? AND v.fecha < ?"
+        )
+        parametros = [inicio, fin]
+        if metodo_pago:
+            sql += " AND v.metodo_pago = ?"
+            parametros.append(metodo_pago)
+        if categoria:
+            sql += " AND l.categoria = ?"
+            parametros.append(categoria)
+        return sql, parametros
+
+    def ventas_entre(self, desde, hasta, categoria=None, metodo_pago=None):
+        """Ventas entre dos fechas (inclusive), de la más reciente a la más antigua
+
+        Con `categoria`, cada venta trae solo sus líneas de esa categoría y se omiten
+        las ventas que no tienen ninguna. El rango se resuelve con el índice por fecha
+        (o por método de pago y fecha), así un día cuesta lo mismo con un año de historial.
+        """
+        filtro, parametros = self._filtro_lineas(desde, hasta, categoria, metodo_pago)
+        sql = (
+            "SELECT v.id, v.fecha, v.cliente, v.metodo_pago, v.total, v.costo, "
+            "l.producto_id, l.producto, l.categoria, l.cantidad, l.precio "
+            f"{filtro} ORDER BY v.fecha DESC, v.id DESC"
+        )
+
+        return _agrupar_ventas(self._conexion().execute(sql, parametros))
+
+    # --- CLIENTES ---
+    def clientes_desde(self, ultimo_id=0):
+        """(id, nombre) de los clientes dados de alta después de `ultimo_id`, en orden de alta"""
+        return self._conexion().execute(
+            "SELECT id, nombre FROM clientes WHERE id > ? ORDER BY id", (ultimo_id,)
+        ).fetchall()
+
+    def cliente(self, nombre):
+        """Ficha del cliente con ese nombre (sin importar mayúsculas ni acentos), o None"""
+        clave = clave_cliente(nombre)
+        if clave is None:
+            return None
+        fila = self._conexion().execute(
+            "SELECT id, nombre, creado, compras, total_comprado, puntos, ultima_compra FROM clientes WHERE clave = ?",
+            (clave,)
+        ).fetchone()
+        return dict(fila) if fila else None
+
+    def compras_de_cliente(self, cliente_id, limite=50):
+        """Últimas ventas de un cliente, de la más reciente a la más antigua
+
+        Recorre solo las ventas del cliente con el índice (cliente_id, fecha).
+        """
+        return _agrupar_ventas(self._conexion().execute(
+            "SELECT v.id, v.fecha, v.cliente, v.metodo_pago, v.total, v.costo, "
+            "l.producto_id, l.producto, l.categoria, l.cantidad, l.precio "
+            "FROM (SELECT * FROM ventas WHERE cliente_id = ? ORDER BY fecha DESC, id DESC LIMIT ?) v "
+            "JOIN venta_lineas l ON l.venta_id = v.id ORDER BY v.fecha DESC, v.id DESC",
+            (cliente_id, limite)
+        ))
+
+    def mejores_clientes(self, limite=10):
+        """Clientes con más compras en dinero, leídos en orden del índice por total"""
+        return [
+            {"Cliente": f["nombre"], "Compras": f["compras"], "Total Comprado": f["total_comprado"],
+             "Puntos": f["puntos"], "Última Compra": f["ultima_compra"]}
+            for f in self._conexion().execute(
+                "SELECT nombre, compras, total_comprado, puntos, ultima_compra FROM clientes "
+                "ORDER BY total_comprado DESC LIMIT ?", (limite,)
+            )
+        ]
+
+    def ultima_venta_id(self):
+        """Id de la última venta confirmada; sirve de versión del libro (sube con cada venta)"""
+        return self._conexion().execute("SELECT COALESCE(MAX(id), 0) FROM ventas").fetchone()[0]
+
+    def lotes_lineas(self, desde, hasta, categoria=None, metodo_pago=None, tamano_lote=5000):
+        """Líneas de venta del rango como tuplas planas, en lotes de `tamano_lote`
+
+        Columnas: fecha, cliente, producto, categoría, cantidad, precio, subtotal,
+        método de pago, total de la venta y ganancia. El cursor se recorre con
+        fetchmany, así nunca hay más de un lote en memoria.
+        """
+        filtro, parametros = self._filtro_lineas(desde, hasta, categoria, metodo_pago)
+        cursor = self._conexion().cursor()
+        cursor.row_factory = None   # tuplas simples: sin sqlite3.Row por fila
+        cursor.execute(
+            "SELECT v.fecha, v.cliente, l.producto, l.categoria, l.cantidad, l.precio, l.subtotal, "
+            f"v.metodo_pago, v.total, v.ganancia {filtro} ORDER BY v.fecha DESC, v.id DESC",
+            parametros
+        )
+        try:
+            while True:
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    return
+                yield lote
+        finally:
+            cursor.close()
+
+    def totales_por_dia(self, desde_id=0, hasta_id=None):
+        """Total vendido y ganancia por día de las ventas con id en (desde_id, hasta_id]"""
+        hasta_id = self.ultima_venta_id() if hasta_id is None else hasta_id
+        return [
+            {"dia": datetime.date.fromisoformat(f["dia"]), "total": f["total"], "ganancia": f["ganancia"]}
+            for f in self._conexion().execute(
+                "SELECT substr(fecha, 1, 10) AS dia, SUM(total) AS total, SUM(ganancia) AS ganancia "
+                "FROM ventas WHERE id > ? AND id <= ? GROUP BY dia ORDER BY dia",
+                (desde_id, hasta_id)
+            )
+        ]
+
+    def cantidades_por_producto(self, desde_id=0, hasta_id=None):
+        """Unidades vendidas por producto en las ventas con id en (desde_id, hasta_id]"""
+        hasta_id = self.ultima_venta_id() if hasta_id is None else hasta_id
+        return [
+            {"Producto": f["producto"], "Cantidad": f["cantidad"]}
+            for f in self._conexion().execute(
+                "SELECT producto, SUM(cantidad) AS cantidad FROM venta_lineas "
+                "WHERE venta_id > ? AND venta_id <= ? GROUP BY producto",
+                (desde_id, hasta_id)
+            )
+        ]
+
+    def unidades_por_dia(self, desde, hasta):
+        """Filas (día, sku, unidades vendidas) del rango de fechas inclusivo"""
+        return self._conexion().execute(
+            "SELECT substr(v.fecha, 1, 10), l.producto_id, SUM(l.cantidad) "
+            "FROM ventas v JOIN venta_lineas l ON l.venta_id = v.id "
+            "WHERE v.fecha >= ? AND v.fecha < ? GROUP BY 1, 2",
+            _limites_dia(desde, hasta)
+        ).fetchall()
+
+    def demanda_insatisfecha_por_dia(self, desde, hasta):
+        """Filas (día, sku, unidades pedidas sin stock) del rango de fechas inclusivo"""
+        return self._conexion().execute(
+            "SELECT substr(fecha, 1, 10), producto_id, SUM(cantidad) FROM demanda_insatisfecha "
+            "WHERE fecha >= ? AND fecha < ? GROUP BY 1, 2",
+            _limites_dia(desde, hasta)
+        ).fetchall()
+
+    def resumen_metodos(self, dia):
+        """Total vendido y número de transacciones por método de pago en un día (acumulado)"""
+        return [
+            {"Método de Pago": f["metodo_pago"], "Total Vendido": f["total"], "N° Transacciones": f["transacciones"]}
+            for f in self._conexion().execute(
+                "SELECT metodo_pago, total, transacciones FROM resumen_metodo_dia "
+                "WHERE dia = ? ORDER BY metodo_pago",
+                (dia.isoformat(),)
+            )
+        ]
+
+    def resumen_productos(self, dia):
+        """Cantidad y total vendido por producto en un día (acumulado)"""
+        return [
+            {"Producto": f["producto"], "Categoría": f["categoria"], "Cantidad": f["cantidad"], "Total": f["total"]}
+            for f in self._conexion().execute(
+                "SELECT producto, categoria, cantidad, total FROM resumen_producto_dia "
+                "WHERE dia = ? ORDER BY producto",
+                (dia.isoformat(),)
+            )
+        ]
+
+    def resumen_metodos_entre(self, desde, hasta):
+        """Total y transacciones por método de pago entre dos fechas (inclusive), desde los acumulados"""
+        return [
+            {"Método de Pago": f["metodo_pago"], "Total Vendido": f["total"], "N° Transacciones": f["transacciones"]}
+            for f in self._conexion().execute(
+                "SELECT metodo_pago, SUM(total) AS total, SUM(transacciones) AS transacciones "
+                "FROM resumen_metodo_dia WHERE dia >= ? AND dia <= ? GROUP BY metodo_pago ORDER BY metodo_pago",
+                (desde.isoformat(), hasta.isoformat())
+            )
+        ]
+
+    def totales_dia_entre(self, desde, hasta):
+        """Total y transacciones por día entre dos fechas (inclusive), desde los acumulados"""
+        return [
+            {"Día": f["dia"], "Total Vendido": f["total"], "N° Transacciones": f["transacciones"]}
+            for f in self._conexion().execute(
+                "SELECT dia, SUM(total) AS total, SUM(transacciones) AS transacciones "
+                "FROM resumen_metodo_dia WHERE dia >= ? AND dia <= ? GROUP BY dia ORDER BY dia",
+                (desde.isoformat(), hasta.isoformat())
+            )
+        ]
+
+    def lotes_resumen_productos(self, desde, hasta, tamano_lote=500):
+        """Filas (día, producto, categoría, cantidad, total) del rango en lotes, en orden de la clave"""
+        cursor = self._conexion().cursor()
+        cursor.row_factory = None
+        cursor.execute(
+            "SELECT dia, producto, categoria, cantidad, total FROM resumen_producto_dia "
+            "WHERE dia >= ? AND dia <= ? ORDER BY dia, categoria, producto",
+            (desde.isoformat(), hasta.isoformat())
+        )
+        try:
+            while True:
+                lote = cursor.fetchmany(tamano_lote)
+                if not lote:
+                    return
+                yield lote
+        finally:
+            cursor.close()
+
+    def acumulado_por(self, dimension, desde, hasta):
+        """Medidas del cubo diario sumadas por valor entre dos fechas (inclusive)
+
+        Devuelve {valor: (total, ganancia, unidades, transacciones)}; para "total" el valor es "".
+        """
+        if dimension not in DIMENSIONES:
+            raise ValueError(f"Dimensión desconocida: {dimension}")
+        cursor = self._conexion().cursor()
+        cursor.row_factory = None
+        return {
+            valor: tuple(medidas)
+            for valor, *medidas in cursor.execute(
+                "SELECT valor, SUM(total), SUM(ganancia), SUM(unidades), SUM(transacciones) FROM rollup_ventas "
+                "WHERE granularidad = 'dia' AND dimension = ? AND periodo >= ? AND periodo <= ? GROUP BY valor",
+                (dimension, desde.isoformat(), hasta.isoformat())
+            )
+        }
+
+    def rollup(self, granularidad, dimension, desde, hasta):
+        """Celdas del cubo entre dos fechas (inclusive), ordenadas por periodo y valor
+
+        Lee solo la tabla de agregados: un año por mes o por semana son pocas decenas
+        de filas por valor, sin recorrer las ventas.
+        """
+        if granularidad not in GRANULARIDADES or dimension not in DIMENSIONES:
+            raise ValueError(f"Granularidad o dimensión desconocida: {granularidad}, {dimension}")
+        inicio = _periodo(granularidad, datetime.datetime.combine(desde, datetime.time.min))
+        fin = _periodo(granularidad, datetime.datetime.combine(hasta, datetime.time.max))
+        return [
+            {"periodo": f["periodo"], "valor": f["valor"], "total": f["total"], "ganancia": f["ganancia"],
+             "unidades": f["unidades"], "transacciones": f["transacciones"]}
+            for f in self._conexion().execute(
+                "SELECT periodo, valor, total, ganancia, unidades, transacciones FROM rollup_ventas "
+                "WHERE granularidad = ? AND dimension = ? AND periodo >= ? AND periodo <= ? "
+                "ORDER BY periodo, valor",
+                (granularidad, dimension, inicio, fin)
+            )
+        ]
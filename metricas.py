@@ -0,0 +1,161 @@
+"""Tiempos de ejecución por función o página, con p50/p95 y salida en formato Prometheus
+
+Apagado (lo normal) cada función instrumentada solo consulta una bandera antes de llamar
+a la original. Se enciende con VENTAS_METRICAS=1 o desde el panel de administración.
+Con VENTAS_MEDIR_ARRANQUE=1 se informa además el tiempo de importación y de la primera ejecución.
+"""
+import functools
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+MUESTRAS_POR_NOMBRE = 1000   # ventana para los percentiles
+
+
+class RegistroTiempos:
+    """Últimas muestras por nombre, más totales acumulados para Prometheus"""
+
+    def __init__(self, activo=False, muestras=MUESTRAS_POR_NOMBRE):
+        self.activo = activo
+        self._muestras = muestras
+        self._series = {}      # nombre -> deque de segundos
+        self._totales = {}     # nombre -> [cantidad, suma de segundos]
+        self._lock = threading.Lock()
+
+    def anotar(self, nombre, segundos):
+        with self._lock:
+            serie = self._series.get(nombre)
+            if serie is None:
+                serie = self._series[nombre] = deque(maxlen=self._muestras)
+                self._totales[nombre] = [0, 0.0]
+            serie.append(segundos)
+            totales = self._totales[nombre]
+            totales[0] += 1
+            totales[1] += segundos
+
+    def reiniciar(self):
+        with self._lock:
+            self._series.clear()
+            self._totales.clear()
+
+    def resumen(self):
+        """Filas por nombre con llamadas, p50, p95 y máximo en milisegundos (de la más lenta en p95)"""
+        with self._lock:
+            series = {nombre: np.fromiter(serie, dtype=np.float64) for nombre, serie in self._series.items()}
+            totales = {nombre: tuple(t) for nombre, t in self._totales.items()}
+        filas = []
+        for nombre, s in series.items():
+            p50, p95 = np.percentile(s, [50, 95]) * 1000
+            filas.append({
+                "Nombre": nombre,
+                "Llamadas": totales[nombre][0],
+                "p50 (ms)": round(float(p50), 2),
+                "p95 (ms)": round(float(p95), 2),
+                "Máx (ms)": round(float(s.max()) * 1000, 2)
+            })
+        return sorted(filas, key=lambda f: f["p95 (ms)"], reverse=True)
+
+    def como_prometheus(self):
+        """Texto en formato de exposición de Prometheus (un summary con cuantiles 0.5 y 0.95)"""
+        lineas = [
+            "# HELP ventas_duracion_segundos Duración de funciones y páginas del punto de venta",
+            "# TYPE ventas_duracion_segundos summary",
+        ]
+        with self._lock:
+            series = {nombre: np.fromiter(serie, dtype=np.float64) for nombre, serie in self._series.items()}
+            totales = {nombre: tuple(t) for nombre, t in self._totales.items()}
+        for nombre in sorted(series):
+            etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+            p50, p95 = np.percentile(series[nombre], [50, 95])
+            lineas.append(f'ventas_duracion_segundos{{nombre="{etiqueta}",quantile="0.5"}} {p50:.6f}')
+            lineas.append(f'ventas_duracion_segundos{{nombre="{etiqueta}",quantile="0.95"}} {p95:.6f}')
+            lineas.append(f'ventas_duracion_segundos_sum{{nombre="{etiqueta}"}} {totales[nombre][1]:.6f}')
+            lineas.append(f'ventas_duracion_segundos_count{{nombre="{etiqueta}"}} {totales[nombre][0]}')
+        return "\n".join(lineas) + "\n"
+
+    def escribir_prometheus(self, ruta):
+        """Escribe el archivo de forma atómica (para el textfile collector de node_exporter)"""
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(directorio, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=directorio, suffix=".tmp", delete=False,
+                                         encoding="utf-8") as archivo:
+            archivo.write(self.como_prometheus())
+        os.replace(archivo.name, ruta)
+
+
+REGISTRO = RegistroTiempos(activo=os.environ.get("VENTAS_METRICAS") == "1")
+
+# Si se define, el archivo .prom se reescribe como máximo una vez por INTERVALO_PROMETHEUS segundos
+RUTA_PROMETHEUS = os.environ.get("VENTAS_METRICAS_PROMETHEUS")
+INTERVALO_PROMETHEUS = 15.0
+_ultima_escritura = 0.0
+
+
+def cronometrar(funcion):
+    """Decorador: anota la duración de cada llamada con el nombre de la función"""
+    nombre = funcion.__name__
+
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if not REGISTRO.activo:
+            return funcion(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            REGISTRO.anotar(nombre, time.perf_counter() - inicio)
+    return envoltura
+
+
+@contextmanager
+def medir(nombre):
+    """Anota la duración del bloque con `nombre`"""
+    if not REGISTRO.activo:
+        yield
+        return
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRO.anotar(nombre, time.perf_counter() - inicio)
+
+
+def exportar_si_corresponde():
+    """Reescribe el archivo Prometheus configurado si pasó el intervalo desde la última vez"""
+    global _ultima_escritura
+    if not REGISTRO.activo or not RUTA_PROMETHEUS:
+        return
+    ahora = time.monotonic()
+    if ahora - _ultima_escritura >= INTERVALO_PROMETHEUS:
+        _ultima_escritura = ahora
+        REGISTRO.escribir_prometheus(RUTA_PROMETHEUS)
+
+
+MEDIR_ARRANQUE = os.environ.get("VENTAS_MEDIR_ARRANQUE") == "1"
+# plotly.graph_objects lo importa el propio streamlit; aquí solo lo que carga la app
+MODULOS_PESADOS = ("pandas", "plotly.express", "reportlab.pdfgen", "reportlab.platypus", "pyarrow", "openpyxl")
+_arranque_reportado = False
+
+
+def reportar_arranque(inicio, fin_importaciones):
+    """Una vez por proceso: importaciones y primera ejecución del script, y qué módulos pesados se cargaron
+
+    Va a stderr y al registro (así aparece en el panel aunque las métricas estén apagadas).
+    """
+    global _arranque_reportado
+    if not MEDIR_ARRANQUE or _arranque_reportado:
+        return
+    _arranque_reportado = True
+    fin = time.perf_counter()
+    REGISTRO.anotar("arranque: importaciones", fin_importaciones - inicio)
+    REGISTRO.anotar("arranque: primera ejecución", fin - inicio)
+    cargados = [m for m in MODULOS_PESADOS if m in sys.modules]
+    print(f"Arranque: importaciones {(fin_importaciones - inicio) * 1000:.0f} ms, "
+          f"primera ejecución {(fin - inicio) * 1000:.0f} ms; "
+          f"módulos pesados cargados: {', '.join(cargados) or 'ninguno'}", file=sys.stderr, flush=True)
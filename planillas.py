@@ -0,0 +1,80 @@
+"""Importación y exportación masiva del catálogo en CSV/XLSX, con validación por columnas"""
+from io import BytesIO
+
+import pandas as pd
+
+from busqueda import normalizar
+
+COLUMNAS_CATALOGO = ("Categoría", "Producto", "Precio", "Costo", "Stock")
+COLUMNAS_CONTEO = ("Categoría", "Producto", "Stock")
+
+# Encabezado normalizado -> nombre de columna ('categoria', 'PRECIO ', 'Nombre'...)
+_ENCABEZADOS = {normalizar(c): c for c in ("SKU",) + COLUMNAS_CATALOGO}
+_ENCABEZADOS["nombre"] = "Producto"
+
+
+def leer_planilla(archivo, nombre):
+    """Lee un CSV o XLSX subido y normaliza sus encabezados"""
+    if nombre.lower().endswith((".xlsx", ".xls")):
+        df = pd.read_excel(archivo, dtype=object)
+    else:
+        df = pd.read_csv(archivo, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    return df.rename(columns=lambda c: _ENCABEZADOS.get(normalizar(str(c)), c))
+
+
+def validar(df, catalogo, conteo=False):
+    """Valida la planilla completa de una vez; devuelve (filas válidas, errores)
+
+    Las filas válidas son tuplas listas para el libro: (categoría, nombre, precio, costo,
+    stock) o, en un conteo, (categoría, nombre, stock). Los errores son un DataFrame con
+    la fila de la planilla (la primera fila de datos es la 2) y el problema encontrado.
+    """
+    requeridas = COLUMNAS_CONTEO if conteo else COLUMNAS_CATALOGO
+    faltan = [c for c in requeridas if c not in df.columns]
+    if faltan:
+        return [], pd.DataFrame({"Fila": [1], "Error": [f"Faltan columnas: {', '.join(faltan)}"]})
+
+    df = df.reset_index(drop=True)
+    categoria = df["Categoría"].astype("string").str.strip().fillna("")
+    producto = df["Producto"].astype("string").str.strip().fillna("")
+    numeros = {c: pd.to_numeric(df[c], errors="coerce") for c in requeridas[2:]}
+
+    problemas = {
+        "Categoría vacía": categoria == "",
+        "Producto vacío": producto == "",
+    }
+    for columna, valores in numeros.items():
+        problemas[f"{columna} no es un número"] = valores.isna()
+        problemas[f"{columna} negativo"] = valores < 0
+    problemas["Stock no es entero"] = numeros["Stock"].notna() & (numeros["Stock"] % 1 != 0)
+    if not conteo:
+        problemas["Costo mayor que el precio"] = numeros["Costo"] > numeros["Precio"]
+    claves = pd.MultiIndex.from_arrays([categoria, producto])
+    problemas["Producto repetido en la planilla"] = claves.duplicated(keep=False) & (producto != "")
+    if conteo:
+        existentes = pd.MultiIndex.from_arrays([
+            pd.Categorical.from_codes(catalogo.codigo_categoria, catalogo.categorias), catalogo.nombre
+        ])
+        problemas["Producto no existe en el catálogo"] = ~claves.isin(existentes) & (producto != "")
+
+    por_problema = [pd.DataFrame({"Fila": mascara.index[mascara] + 2, "Error": mensaje})
+                    for mensaje, mascara in problemas.items() if mascara.any()]
+    errores = (pd.concat(por_problema, ignore_index=True).sort_values("Fila", kind="stable", ignore_index=True)
+               if por_problema else pd.DataFrame(columns=["Fila", "Error"]))
+
+    validas = ~pd.concat(problemas, axis=1).any(axis=1)
+    columnas = [categoria[validas], producto[validas]] + [
+        numeros[c][validas].astype("int64" if c == "Stock" else "float64") for c in requeridas[2:]
+    ]
+    return list(zip(*(c.tolist() for c in columnas))), errores
+
+
+def exportar_catalogo(catalogo, formato="csv", conteo=False):
+    """Catálogo (o planilla de conteo) como bytes CSV o XLSX, con las columnas que acepta la importación"""
+    columnas = ["SKU", *(COLUMNAS_CONTEO if conteo else COLUMNAS_CATALOGO)]
+    df = catalogo.como_dataframe()[columnas]
+    if formato == "xlsx":
+        buffer = BytesIO()
+        df.to_excel(buffer, index=False, sheet_name="Conteo" if conteo else "Catálogo")
+        return buffer.getvalue()
+    return df.to_csv(index=False).encode("utf-8-sig")
@@ -0,0 +1,181 @@
+"""Pronóstico de venta por producto y sugerencias de reposición para la horneada de mañana
+
+Todo el catálogo se calcula de una vez con NumPy: una matriz productos × días con las
+unidades vendidas más la demanda que no se pudo atender, y un suavizado exponencial
+simple escrito como un producto matriz-vector. El pronóstico se guarda por día y versión
+del catálogo y se recalcula en un hilo aparte: el cobro nunca lo espera, y revisar una venta
+cuesta una consulta de stock por línea contra el último pronóstico disponible.
+"""
+import datetime
+import logging
+import sqlite3
+import threading
+
+import numpy as np
+
+DIAS_HISTORIA = 28
+ALFA = 0.3             # peso del último día en el suavizado
+DIAS_COBERTURA = 1.0   # la horneada de mañana cubre un día de venta
+Z_SERVICIO = 1.65      # stock de seguridad: ~95 % de los días sin quiebre
+
+log = logging.getLogger(__name__)
+
+
+def _matriz_diaria(filas, catalogo, desde, dias):
+    """Filas (día, sku, unidades) -> matriz productos × días en el orden del catálogo"""
+    matriz = np.zeros((len(catalogo), dias))
+    if not filas:
+        return matriz
+    dia, sku, unidades = zip(*filas)
+    columna = (np.array(dia, dtype="datetime64[D]") - np.datetime64(desde, "D")).astype(np.int64)
+    fila = np.fromiter((catalogo.posicion(s) if s in catalogo else -1 for s in sku),
+                       dtype=np.int64, count=len(sku))
+    validas = fila >= 0   # productos borrados del catálogo
+    np.add.at(matriz, (fila[validas], columna[validas]), np.asarray(unidades, dtype=np.float64)[validas])
+    return matriz
+
+
+def pesos_suavizado(dias, alfa=ALFA):
+    """Pesos w tales que matriz @ w es el suavizado exponencial al último día
+
+    s_t = alfa * x_t + (1 - alfa) * s_{t-1}, arrancando en s_0 = x_0.
+    """
+    pesos = alfa * (1 - alfa) ** np.arange(dias - 1, -1, -1, dtype=np.float64)
+    pesos[0] = (1 - alfa) ** (dias - 1)
+    return pesos
+
+
+class Pronostico:
+    """Columnas por producto (posición del catálogo): velocidades, pronóstico y punto de reorden"""
+
+    def __init__(self, catalogo, vendidas, insatisfecha, alfa=ALFA, cobertura=DIAS_COBERTURA, z=Z_SERVICIO):
+        self.catalogo = catalogo
+        demanda = vendidas + insatisfecha
+        dias = demanda.shape[1]
+        self.velocidad_7 = demanda[:, -7:].mean(axis=1)
+        self.velocidad = demanda.mean(axis=1)
+        self.insatisfecha_7 = insatisfecha[:, -7:].sum(axis=1)
+        self.pronostico = demanda @ pesos_suavizado(dias, alfa) if dias else np.zeros(len(catalogo))
+        desviacion = demanda.std(axis=1, ddof=1) if dias > 1 else np.zeros(len(catalogo))
+        # Por debajo de este stock la venta esperada de mañana (más la seguridad) no queda cubierta
+        self.punto_reorden = np.ceil(
+            self.pronostico * cobertura + z * desviacion * np.sqrt(cobertura) - 1e-9
+        ).clip(min=0).astype(np.int64)
+
+    def punto_reorden_de(self, sku):
+        return int(self.punto_reorden[self.catalogo.posicion(sku)]) if sku in self.catalogo else 0
+
+    def sugerido(self, stock):
+        """Unidades a hornear para volver al punto de reorden con el stock dado (vector)"""
+        return np.maximum(self.punto_reorden - stock, 0)
+
+
+class Reabastecimiento:
+    """Pronóstico del catálogo guardado por (día, versión del catálogo) y alertas por venta"""
+
+    def __init__(self, libro, dias_historia=DIAS_HISTORIA, alfa=ALFA, cobertura=DIAS_COBERTURA, z=Z_SERVICIO):
+        self._libro = libro
+        self._dias = dias_historia
+        self._parametros = (alfa, cobertura, z)
+        self._clave = None
+        self._pronostico = None
+        self._lock = threading.Lock()
+        self._calculando = False
+        self._lock_calculo = threading.Lock()
+        self.ultimo_error = None
+
+    def _clave_vigente(self):
+        return datetime.date.today(), self._libro.version_catalogo
+
+    def pronostico(self):
+        """Pronóstico vigente; se calcula una vez por día con los días completos hasta ayer"""
+        clave = self._clave_vigente()
+        hoy, _ = clave
+        with self._lock:
+            if self._clave == clave:
+                return self._pronostico
+            desde = hoy - datetime.timedelta(days=self._dias)
+            hasta = hoy - datetime.timedelta(days=1)
+            catalogo = self._libro.catalogo()
+            vendidas = self._libro.unidades_por_dia(desde, hasta)
+            insatisfecha = self._libro.demanda_insatisfecha_por_dia(desde, hasta)
+            pronostico = Pronostico(
+                catalogo,
+                _matriz_diaria(vendidas, catalogo, desde, self._dias),
+                _matriz_diaria(insatisfecha, catalogo, desde, self._dias),
+                *self._parametros
+            )
+            self._clave, self._pronostico = clave, pronostico
+            self.ultimo_error = None
+            return pronostico
+
+    def calentar(self):
+        """Si el pronóstico guardado quedó viejo, lo recalcula en un hilo aparte; no espera"""
+        if self._clave == self._clave_vigente():
+            return
+        with self._lock_calculo:
+            if self._calculando:
+                return
+            self._calculando = True
+        threading.Thread(target=self._calcular, name="pronostico-reposicion", daemon=True).start()
+
+    def _registrar_error(self, error, que):
+        """Deja el fallo en el log y en `ultimo_error` (la app lo muestra); llamar desde el except"""
+        log.exception("Reposición: no se pudo %s", que)
+        self.ultimo_error = error
+
+    def _calcular(self):
+        try:
+            self.pronostico()
+        except Exception as e:   # se reintenta con la siguiente venta
+            self._registrar_error(e, "calcular el pronóstico")
+        finally:
+            with self._lock_calculo:
+                self._calculando = False
+
+    def alertas(self, venta):
+        """Productos de la venta que con ella bajaron de su punto de reorden
+
+        Se llama con la venta ya registrada, así que nunca calcula el pronóstico ni falla:
+        usa el último disponible (aunque sea de ayer) y pide el nuevo en segundo plano.
+        Solo cruza el umbral de cada línea contra el stock que quedó: una consulta por línea.
+        """
+        try:
+            self.calentar()
+        except sqlite3.Error as e:   # sin la versión del catálogo se sigue con el último pronóstico
+            self._registrar_error(e, "revisar la versión del catálogo")
+        pronostico = self._pronostico
+        if pronostico is None:
+            return []
+        alertas = []
+        for linea in venta.lineas:
+            punto = pronostico.punto_reorden_de(linea.sku)
+            if not punto:
+                continue
+            try:
+                stock = self._libro.stock_de(linea.sku)
+            except sqlite3.Error as e:   # la venta ya quedó registrada: esa línea se queda sin alerta
+                self._registrar_error(e, f"leer el stock de {linea.producto}")
+                continue
+            if stock < punto <= stock + linea.cantidad:
+                alertas.append({"sku": linea.sku, "producto": linea.producto, "stock": stock,
+                                "punto_reorden": punto, "sugerido": punto - stock})
+        return alertas
+
+    def sugerencias(self):
+        """Filas para la horneada de mañana con el stock actual, de mayor a menor sugerido"""
+        pronostico = self.pronostico()
+        catalogo = self._libro.catalogo()
+        sugerido = pronostico.sugerido(catalogo.stock)
+        orden = np.flatnonzero(sugerido)[np.argsort(-sugerido[sugerido > 0], kind="stable")]
+        return [{
+            "SKU": int(catalogo.sku[i]),
+            "Producto": catalogo.nombre[i],
+            "Categoría": catalogo.categorias[catalogo.codigo_categoria[i]],
+            "Stock": int(catalogo.stock[i]),
+            "Venta diaria (7 días)": round(float(pronostico.velocidad_7[i]), 1),
+            "Pronóstico mañana": round(float(pronostico.pronostico[i]), 1),
+            "Punto de reorden": int(pronostico.punto_reorden[i]),
+            "Pedidos sin stock (7 días)": int(pronostico.insatisfecha_7[i]),
+            "Hornear": int(sugerido[i])
+        } for i in orden]
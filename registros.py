@@ -0,0 +1,79 @@
+"""Registros compactos de ventas: __slots__, SKUs enteros y textos repetidos como códigos"""
+import threading
+
+
+class TablaCodigos:
+    """Asigna un entero pequeño a cada texto repetido (categorías, métodos de pago, nombres)"""
+
+    __slots__ = ("_codigos", "_textos", "_lock")
+
+    def __init__(self):
+        self._codigos = {}
+        self._textos = []
+        self._lock = threading.Lock()
+
+    def codigo(self, texto):
+        codigo = self._codigos.get(texto)
+        if codigo is None:
+            with self._lock:
+                codigo = self._codigos.setdefault(texto, len(self._textos))
+                if codigo == len(self._textos):
+                    self._textos.append(texto)
+        return codigo
+
+    def texto(self, codigo):
+        return self._textos[codigo]
+
+
+# Tablas compartidas por todo el proceso
+CATEGORIAS = TablaCodigos()
+METODOS_PAGO = TablaCodigos()
+PRODUCTOS = TablaCodigos()
+
+
+class LineaVenta:
+    """Una línea de venta: SKU, cantidad, precio unitario y nombre/categoría codificados"""
+
+    __slots__ = ("sku", "cantidad", "precio", "_producto", "_categoria")
+
+    def __init__(self, sku, producto, categoria, cantidad, precio):
+        self.sku = sku
+        self.cantidad = cantidad
+        self.precio = precio
+        self._producto = PRODUCTOS.codigo(producto)
+        self._categoria = CATEGORIAS.codigo(categoria)
+
+    @property
+    def producto(self):
+        return PRODUCTOS.texto(self._producto)
+
+    @property
+    def categoria(self):
+        return CATEGORIAS.texto(self._categoria)
+
+    @property
+    def subtotal(self):
+        return self.cantidad * self.precio
+
+
+class Venta:
+    """Cabecera de venta con sus líneas en una tupla"""
+
+    __slots__ = ("id", "fecha", "cliente", "_metodo_pago", "total", "costo", "lineas")
+
+    def __init__(self, id, fecha, cliente, metodo_pago, total, costo, lineas):
+        self.id = id
+        self.fecha = fecha
+        self.cliente = cliente
+        self._metodo_pago = METODOS_PAGO.codigo(metodo_pago)
+        self.total = total
+        self.costo = costo
+        self.lineas = tuple(lineas)
+
+    @property
+    def metodo_pago(self):
+        return METODOS_PAGO.texto(self._metodo_pago)
+
+    @property
+    def ganancia(self):
+        return self.total - self.costo
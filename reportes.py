@@ -0,0 +1,208 @@
+"""Reportes PDF de un período, armados a medida que se paginan y sin cargar el detalle completo"""
+import datetime
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from libro_ventas import LibroVentas
+from metricas import cronometrar
+
+ESTILO_TABLA = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+COLUMNAS_DETALLE = ["Día", "Producto", "Categoría", "Cantidad", "Total"]
+ANCHOS_DETALLE = [70, 190, 100, 60, 70]   # fijos: todos los tramos del detalle quedan alineados
+FILAS_POR_TRAMO = 500
+
+
+class FlujoFlowables:
+    """Secuencia perezosa para doc.build: pide flowables al generador solo cuando se van a paginar
+
+    Implementa lo que usa reportlab sobre la lista (len, [i], [:i], del, [0:0] = ... e insert),
+    con un deque que retiene apenas los elementos por colocar. Índices y tramos se resuelven
+    como en una lista; los abiertos, negativos o hacia atrás (p. ej. [i:]) traen el resto del generador.
+    """
+
+    def __init__(self, flowables):
+        self._generador = iter(flowables)
+        self._pendientes = deque()
+
+    def _llenar(self, n=None):
+        """Trae del generador hasta tener `n` pendientes (todos si n es None)"""
+        while n is None or len(self._pendientes) < n:
+            siguiente = next(self._generador, None)
+            if siguiente is None:
+                return
+            self._pendientes.append(siguiente)
+
+    @staticmethod
+    def _necesarios(i):
+        """Pendientes que hacen falta para resolver el índice o tramo `i` (None: todos)"""
+        if isinstance(i, slice):
+            if i.stop is None or i.stop < 0 or (i.start or 0) < 0 or (i.step or 1) < 0:
+                return None
+            return i.stop
+        return None if i < 0 else i + 1
+
+    def __len__(self):
+        # Uno de anticipo: keepWithNext mira el flowable que sigue
+        self._llenar(len(self._pendientes) + 1)
+        return len(self._pendientes)
+
+    def __getitem__(self, i):
+        self._llenar(self._necesarios(i))
+        if isinstance(i, slice):
+            inicio, fin, paso = i.indices(len(self._pendientes))
+            if paso == 1:
+                return list(islice(self._pendientes, inicio, max(inicio, fin)))
+            return [self._pendientes[j] for j in range(inicio, fin, paso)]
+        return self._pendientes[i]
+
+    def __delitem__(self, i):
+        self._llenar(self._necesarios(i))
+        if isinstance(i, slice):
+            inicio, fin, paso = i.indices(len(self._pendientes))
+        else:
+            inicio = i if i >= 0 else len(self._pendientes) + i
+            fin, paso = inicio + 1, 1
+            if not 0 <= inicio < len(self._pendientes):
+                raise IndexError("índice fuera de rango")
+        if fin <= inicio:
+            return
+        if inicio != 0 or paso != 1:
+            raise IndexError("Solo se pueden quitar elementos del frente")
+        for _ in range(fin):
+            self._pendientes.popleft()
+
+    def __setitem__(self, i, valores):
+        if not isinstance(i, slice) or i.start not in (0, None) or i.stop != 0:
+            raise IndexError("Solo se pueden reinsertar elementos al frente")
+        self._pendientes.extendleft(reversed(list(valores)))
+
+    def insert(self, i, valor):
+        if i != 0:
+            raise IndexError("Solo se pueden reinsertar elementos al frente")
+        self._pendientes.appendleft(valor)
+
+
+def _tabla(filas):
+    tabla = Table(filas)
+    tabla.setStyle(ESTILO_TABLA)
+    return tabla
+
+
+def _flowables_periodo(libro, desde, hasta, metodos):
+    """Genera el contenido del reporte; el detalle sale del cursor en tramos de FILAS_POR_TRAMO"""
+    estilos = getSampleStyleSheet()
+    if desde == hasta:
+        titulo = f"Reporte Diario - {desde.strftime('%d/%m/%Y')}"
+    else:
+        titulo = f"Reporte de Ventas - {desde.strftime('%d/%m/%Y')} al {hasta.strftime('%d/%m/%Y')}"
+    yield Paragraph(titulo, estilos['Title'])
+    yield Spacer(1, 12)
+
+    # 1. Reporte por Método de Pago
+    yield Paragraph("1. Resumen por Método de Pago", estilos['Heading2'])
+    yield _tabla([list(metodos[0])] + [[f"{v:.2f}" if isinstance(v, float) else v for v in m.values()]
+                                       for m in metodos])
+    yield Spacer(1, 24)
+
+    # 2. Totales por día (solo si el período tiene más de un día)
+    seccion = 2
+    if desde != hasta:
+        dias = libro.totales_dia_entre(desde, hasta)
+        yield Paragraph(f"{seccion}. Totales por Día", estilos['Heading2'])
+        yield _tabla([list(dias[0])] + [[d["Día"], f"{d['Total Vendido']:.2f}", d["N° Transacciones"]]
+                                         for d in dias])
+        yield Spacer(1, 24)
+        seccion += 1
+
+    # 3. Detalle por día y producto: tablas de hasta FILAS_POR_TRAMO filas que repiten el
+    # encabezado en cada página; nunca hay más de un tramo en memoria
+    yield Paragraph(f"{seccion}. Ventas por Producto", estilos['Heading2'])
+    for lote in libro.lotes_resumen_productos(desde, hasta, FILAS_POR_TRAMO):
+        tabla = LongTable(
+            [COLUMNAS_DETALLE] + [[dia, producto, categoria, cantidad, f"{total:.2f}"]
+                                  for dia, producto, categoria, cantidad, total in lote],
+            colWidths=ANCHOS_DETALLE, repeatRows=1
+        )
+        tabla.setStyle(ESTILO_TABLA)
+        yield tabla
+    yield Spacer(1, 24)
+
+    total = sum(m["Total Vendido"] for m in metodos)
+    yield Paragraph(
+        f"Total General del {'Día' if desde == hasta else 'Período'}: ${total:.2f}", estilos['Heading2']
+    )
+
+
+@cronometrar
+def generar_reporte_periodo(libro, desde, hasta, destino=None):
+    """Escribe el reporte del período en `destino` (archivo temporal si no se indica)
+
+    Devuelve el archivo posicionado al inicio, o None si no hubo ventas en el período.
+    """
+    metodos = libro.resumen_metodos_entre(desde, hasta)
+    if not metodos:
+        return None
+    destino = destino or tempfile.TemporaryFile()
+    doc = SimpleDocTemplate(destino, pagesize=letter, pageCompression=1)
+    doc.build(FlujoFlowables(_flowables_periodo(libro, desde, hasta, metodos)))
+    destino.seek(0)
+    return destino
+
+
+def _reporte_de_dia(ruta, dia):
+    """Tarea de un proceso: abre el libro por su ruta y devuelve (día, bytes del PDF o None)
+
+    El libro se abre en solo lectura: un reporte nunca migra ni toma el bloqueo de escritura
+    del libro en el que están cobrando las cajas.
+    """
+    pdf = generar_reporte_periodo(LibroVentas(ruta, solo_lectura=True), dia, dia)
+    if not pdf:
+        return dia, None
+    with pdf:
+        return dia, pdf.read()
+
+
+def _guardar_en_zip(archivo_zip, reportes):
+    for dia, pdf in reportes:
+        if pdf:
+            archivo_zip.writestr(f"reporte_diario_{dia.strftime('%Y%m%d')}.pdf", pdf)
+
+
+def generar_reportes_por_dia(ruta, desde, hasta, procesos=None, destino=None):
+    """Un PDF por día con ventas, reunidos en un ZIP
+
+    Con más de un día y de un núcleo cada día se renderiza en un proceso ('spawn': no heredan
+    los hilos ni las conexiones de la app); si no, en este mismo, que arrancar el pool cuesta
+    más que un reporte.
+    """
+    dias = [desde + datetime.timedelta(days=i) for i in range((hasta - desde).days + 1)]
+    procesos = min(procesos or os.cpu_count() or 1, len(dias))
+    destino = destino or tempfile.TemporaryFile()
+    with zipfile.ZipFile(destino, "w") as archivo_zip:
+        if procesos <= 1:
+            _guardar_en_zip(archivo_zip, map(_reporte_de_dia, [ruta] * len(dias), dias))
+        else:
+            contexto = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=procesos, mp_context=contexto) as pool:
+                _guardar_en_zip(archivo_zip, pool.map(_reporte_de_dia, [ruta] * len(dias), dias))
+    destino.seek(0)
+    return destino
@@ -0,0 +1,323 @@
+"""Servicio HTTP/JSON local de la caja, para terminales con lector de códigos
+
+    python -m servicio_caja --puerto 8502
+
+Atiende cada conexión en un hilo (con keep-alive) y cobra contra el mismo libro SQLite
+que la app; no pasa por las reejecuciones de Streamlit.
+
+    GET    /salud
+    GET    /productos/<sku>
+    POST   /ventas                         {"cliente", "metodo_pago", "lineas": [{"sku", "cantidad"}]}
+    GET    /ventas/<id>
+    GET    /ventas/<id>/factura            PDF
+    POST   /carritos                       -> {"carrito": "<id>"}
+    GET    /carritos/<id>
+    DELETE /carritos/<id>
+    POST   /carritos/<id>/lineas           {"sku", "cantidad"}
+    POST   /carritos/<id>/escanear         {"codigo": "7591234" o "3*7591234"}
+    DELETE /carritos/<id>/lineas/<sku>
+    POST   /carritos/<id>/cobrar           {"cliente", "metodo_pago"}
+
+Los errores responden {"error": "..."}: 400 si la petición o una regla de la caja la
+rechaza, 404 si no existe el recurso, 408 si el cuerpo no llega a tiempo, 409 si otra caja
+vendió el stock primero y 413 si el cuerpo pasa de CUERPO_MAXIMO. Las respuestas de un
+cobro traen "alertas": los productos que con él bajaron de su punto de reorden.
+"""
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from caja import Caja, ErrorCaja
+from facturas import ServicioFacturas
+from libro_ventas import LibroVentas, StockInsuficiente, RUTA_POR_DEFECTO
+from reabastecimiento import Reabastecimiento
+
+PUERTO_POR_DEFECTO = 8502
+MINUTOS_CARRITO_INACTIVO = 120   # los carritos abandonados se descartan
+CUERPO_MAXIMO = 1024 * 1024       # bytes; un carrito de caja es de unos pocos KB
+SEGUNDOS_SIN_RESPUESTA = 30       # espera máxima de cada lectura o escritura en el socket
+
+
+class NoEncontrado(Exception):
+    pass
+
+
+class CuerpoDemasiadoGrande(Exception):
+    pass
+
+
+class Carritos:
+    """Carritos abiertos por las terminales, cada uno con su propio lock"""
+
+    def __init__(self, minutos_inactivo=MINUTOS_CARRITO_INACTIVO):
+        self._vida = minutos_inactivo * 60
+        self._carritos = {}   # id -> [carrito, lock, último uso]
+        self._lock = threading.Lock()
+
+    def abrir(self):
+        carrito_id = uuid.uuid4().hex
+        ahora = time.monotonic()
+        with self._lock:
+            # Aprovecha cada alta para descartar los carritos abandonados
+            for viejo in [i for i, (_, _, uso) in self._carritos.items() if ahora - uso > self._vida]:
+                del self._carritos[viejo]
+            self._carritos[carrito_id] = [{}, threading.Lock(), ahora]
+        return carrito_id
+
+    def cerrar(self, carrito_id):
+        with self._lock:
+            if self._carritos.pop(carrito_id, None) is None:
+                raise NoEncontrado(f"No existe el carrito {carrito_id}")
+
+    def usar(self, carrito_id):
+        """(carrito, lock) de un carrito abierto; las operaciones sobre él se hacen con el lock tomado"""
+        with self._lock:
+            entrada = self._carritos.get(carrito_id)
+            if entrada is None:
+                raise NoEncontrado(f"No existe el carrito {carrito_id}")
+            entrada[2] = time.monotonic()
+            return entrada[0], entrada[1]
+
+
+def _venta_json(venta, alertas=None):
+    """Venta como JSON; `alertas` son los productos que con ella bajaron de su punto de reorden"""
+    return {
+        "id": venta.id,
+        "fecha": venta.fecha.isoformat(sep=" "),
+        "cliente": venta.cliente,
+        "metodo_pago": venta.metodo_pago,
+        "total": venta.total,
+        "lineas": [{"sku": l.sku, "producto": l.producto, "categoria": l.categoria,
+                    "cantidad": l.cantidad, "precio": l.precio, "subtotal": l.subtotal}
+                   for l in venta.lineas],
+        **({"alertas": alertas} if alertas is not None else {})
+    }
+
+
+def _carrito_json(carrito_id, carrito):
+    return {
+        "carrito": carrito_id,
+        "lineas": [{"sku": sku, **item} for sku, item in carrito.items()],
+        "total": Caja.total(carrito)
+    }
+
+
+def _entero(valor, campo):
+    if not isinstance(valor, int) or isinstance(valor, bool):
+        raise ErrorCaja(f"'{campo}' debe ser un entero")
+    return valor
+
+
+def _texto_opcional(valor, campo):
+    if valor is not None and not isinstance(valor, str):
+        raise ErrorCaja(f"'{campo}' debe ser un texto o null")
+    return valor
+
+
+class ManejadorCaja(BaseHTTPRequestHandler):
+    """Traduce las rutas a operaciones de la Caja; `server` lleva la caja y los carritos"""
+
+    protocol_version = "HTTP/1.1"   # keep-alive: una terminal reutiliza su conexión
+    # Encabezados y cuerpo salen en dos escrituras; con Nagle la segunda esperaría el ACK
+    # retardado del cliente (~40 ms por respuesta)
+    disable_nagle_algorithm = True
+    # Un cliente lento o que anuncia un cuerpo que nunca envía no retiene el hilo para siempre;
+    # una conexión keep-alive ociosa también se cierra pasado este tiempo
+    timeout = SEGUNDOS_SIN_RESPUESTA
+
+    # --- RESPUESTAS ---
+    def _responder(self, estado, cuerpo, tipo="application/json; charset=utf-8"):
+        datos = cuerpo if isinstance(cuerpo, bytes) else json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(datos)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _cuerpo(self):
+        if not self._datos:
+            return {}
+        try:
+            cuerpo = json.loads(self._datos)
+        except ValueError:
+            raise ErrorCaja("El cuerpo no es JSON válido")
+        if not isinstance(cuerpo, dict):
+            raise ErrorCaja("El cuerpo debe ser un objeto JSON")
+        return cuerpo
+
+    def _largo_cuerpo(self):
+        try:
+            largo = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            largo = -1
+        if largo < 0:
+            # Sin saber dónde termina el cuerpo la conexión no se puede reutilizar
+            self.close_connection = True
+            raise ErrorCaja("Content-Length inválido")
+        if largo > CUERPO_MAXIMO:
+            # Tampoco se lee: se responde y se cierra la conexión
+            self.close_connection = True
+            raise CuerpoDemasiadoGrande(f"El cuerpo supera el máximo de {CUERPO_MAXIMO} bytes")
+        return largo
+
+    def _atender(self, metodo):
+        partes = [p for p in self.path.split("?", 1)[0].split("/") if p]
+        try:
+            # El cuerpo se consume siempre: si quedara sin leer, rompería la siguiente petición de la conexión
+            self._datos = self.rfile.read(self._largo_cuerpo())
+            estado, cuerpo, *tipo = self._enrutar(metodo, partes)
+        except ErrorCaja as e:
+            estado, cuerpo, tipo = 400, {"error": str(e)}, []
+        except NoEncontrado as e:
+            estado, cuerpo, tipo = 404, {"error": str(e)}, []
+        except StockInsuficiente as e:
+            estado, cuerpo, tipo = 409, {"error": str(e)}, []
+        except CuerpoDemasiadoGrande as e:
+            estado, cuerpo, tipo = 413, {"error": str(e)}, []
+        except TimeoutError:
+            # El cuerpo quedó a medio leer: la conexión ya no se puede reutilizar
+            self.close_connection = True
+            estado, cuerpo, tipo = 408, {"error": "El cuerpo de la petición no llegó a tiempo"}, []
+        except Exception as e:
+            self.log_error("Error atendiendo %s %s: %r", metodo, self.path, e)
+            estado, cuerpo, tipo = 500, {"error": "Error interno"}, []
+        self._responder(estado, cuerpo, *tipo)
+
+    def do_GET(self):
+        self._atender("GET")
+
+    def do_POST(self):
+        self._atender("POST")
+
+    def do_DELETE(self):
+        self._atender("DELETE")
+
+    def log_message(self, formato, *args):
+        if self.server.registrar_peticiones:
+            super().log_message(formato, *args)
+
+    # --- RUTAS ---
+    def _enrutar(self, metodo, partes):
+        caja, carritos = self.server.caja, self.server.carritos
+        ruta = (metodo, *partes[:1], len(partes))
+
+        if ruta == ("GET", "salud", 1):
+            return 200, {"estado": "ok"}
+
+        if ruta == ("GET", "productos", 2):
+            producto = caja.libro.producto(_sku(partes[1]))
+            if producto is None:
+                raise NoEncontrado(f"No existe el producto {partes[1]}")
+            return 200, producto
+
+        if ruta == ("POST", "ventas", 1):
+            cuerpo = self._cuerpo()
+            lineas = cuerpo.get("lineas")
+            if not isinstance(lineas, list) or not all(isinstance(l, dict) for l in lineas):
+                raise ErrorCaja("'lineas' debe ser una lista de objetos con sku y cantidad")
+            venta = caja.vender(_texto_opcional(cuerpo.get("cliente"), "cliente"), cuerpo.get("metodo_pago"),
+                                [(_entero(l.get("sku"), "sku"), _entero(l.get("cantidad", 1), "cantidad"))
+                                 for l in lineas])
+            return 201, _venta_json(venta, self.server.reabastecimiento.alertas(venta))
+
+        if metodo == "GET" and partes[:1] == ["ventas"] and len(partes) in (2, 3):
+            venta = caja.libro.obtener_venta(_sku(partes[1]))
+            if venta is None:
+                raise NoEncontrado(f"No existe la venta {partes[1]}")
+            if len(partes) == 2:
+                return 200, _venta_json(venta)
+            if partes[2] == "factura":
+                # Misma caché por venta que la app: una reimpresión no vuelve a dibujar el PDF
+                return 200, self.server.facturas.reintentar(venta).result(), "application/pdf"
+
+        if ruta == ("POST", "carritos", 1):
+            return 201, {"carrito": carritos.abrir()}
+
+        if partes[:1] == ["carritos"] and len(partes) >= 2:
+            if metodo == "DELETE" and len(partes) == 2:
+                carritos.cerrar(partes[1])
+                return 200, {"carrito": partes[1]}
+            carrito, lock = carritos.usar(partes[1])
+            with lock:
+                if metodo == "GET" and len(partes) == 2:
+                    return 200, _carrito_json(partes[1], carrito)
+                if metodo == "POST" and partes[2:] == ["lineas"]:
+                    cuerpo = self._cuerpo()
+                    caja.agregar(carrito, _entero(cuerpo.get("sku"), "sku"),
+                                 _entero(cuerpo.get("cantidad", 1), "cantidad"))
+                    return 200, _carrito_json(partes[1], carrito)
+                if metodo == "POST" and partes[2:] == ["escanear"]:
+                    codigo = self._cuerpo().get("codigo")
+                    if not isinstance(codigo, str):
+                        raise ErrorCaja("'codigo' debe ser un texto")
+                    caja.escanear(carrito, codigo)
+                    return 200, _carrito_json(partes[1], carrito)
+                if metodo == "DELETE" and len(partes) == 4 and partes[2] == "lineas":
+                    caja.quitar(carrito, _sku(partes[3]))
+                    return 200, _carrito_json(partes[1], carrito)
+                if metodo == "POST" and partes[2:] == ["cobrar"]:
+                    cuerpo = self._cuerpo()
+                    venta = caja.cobrar(carrito, _texto_opcional(cuerpo.get("cliente"), "cliente"),
+                                        cuerpo.get("metodo_pago"))
+                    carritos.cerrar(partes[1])
+                    return 201, _venta_json(venta, self.server.reabastecimiento.alertas(venta))
+
+        raise NoEncontrado(f"Ruta desconocida: {metodo} {self.path}")
+
+
+def _sku(texto):
+    try:
+        return int(texto)
+    except ValueError:
+        raise NoEncontrado(f"Identificador inválido: {texto}")
+
+
+def crear_servidor(libro, host="127.0.0.1", puerto=PUERTO_POR_DEFECTO, registrar_peticiones=False,
+                   facturas=None):
+    """Servidor listo para serve_forever(); con puerto 0 el sistema elige uno libre
+
+    `facturas` es el ServicioFacturas a usar (el de la app, si lo aloja); si no, uno propio.
+    """
+    servidor = ThreadingHTTPServer((host, puerto), ManejadorCaja)
+    servidor.daemon_threads = True
+    servidor.caja = Caja(libro)
+    servidor.carritos = Carritos()
+    servidor.facturas = facturas or ServicioFacturas()
+    servidor.reabastecimiento = Reabastecimiento(libro)
+    servidor.reabastecimiento.calentar()
+    servidor.registrar_peticiones = registrar_peticiones
+    return servidor
+
+
+def iniciar_en_hilo(libro, host="127.0.0.1", puerto=PUERTO_POR_DEFECTO, facturas=None):
+    """Arranca el servicio en un hilo demonio (para alojarlo dentro de la app) y devuelve el servidor"""
+    servidor = crear_servidor(libro, host, puerto, facturas=facturas)
+    threading.Thread(target=servidor.serve_forever, name="servicio-caja", daemon=True).start()
+    return servidor
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de la caja")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+    parser.add_argument("--db", default=RUTA_POR_DEFECTO, help="ruta del libro SQLite (por defecto VENTAS_DB)")
+    parser.add_argument("--registrar", action="store_true", help="registra cada petición en stderr")
+    args = parser.parse_args(argumentos)
+
+    servidor = crear_servidor(LibroVentas(args.db), args.host, args.puerto, args.registrar)
+    print(f"Caja escuchando en http://{args.host}:{servidor.server_address[1]}", flush=True)
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
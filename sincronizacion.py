@@ -0,0 +1,119 @@
+"""Réplica en segundo plano del libro de ventas hacia Firebase Firestore
+
+El cobro nunca espera a la red: las ventas y cambios de inventario quedan en la
+tabla pendientes_sync del libro (en la misma transacción que la venta) y un hilo
+los envía a Firestore en lotes, reintentando con espera exponencial.
+"""
+import os
+import random
+import threading
+
+# Firestore admite como máximo 500 escrituras por lote
+TAMANO_LOTE = 400
+
+
+def crear_cliente_firestore(credenciales=None):
+    """Cliente de Firestore; None si firebase-admin no está instalado o no hay credenciales
+
+    `credenciales` puede ser la ruta al JSON de la cuenta de servicio o su contenido como dict.
+    Si existe FIRESTORE_EMULATOR_HOST, el cliente se conecta al emulador local.
+    """
+    try:
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+    except ImportError:
+        return None
+
+    credenciales = credenciales or os.environ.get("FIREBASE_CREDENCIALES")
+    if not credenciales and not os.environ.get("FIRESTORE_EMULATOR_HOST"):
+        return None
+
+    if not firebase_admin._apps:
+        if credenciales:
+            firebase_admin.initialize_app(credentials.Certificate(credenciales))
+        else:
+            # El emulador no valida credenciales, solo necesita un proyecto
+            firebase_admin.initialize_app(options={"projectId": os.environ.get("GCLOUD_PROJECT", "demo-ventas")})
+    return firestore.client()
+
+
+class SincronizadorFirestore:
+    """Vacía el búfer pendientes_sync del libro hacia Firestore desde un hilo propio"""
+
+    def __init__(self, libro, cliente, tamano_lote=TAMANO_LOTE, espera_base=1.0, espera_maxima=60.0,
+                 intervalo=5.0, sucursal=None):
+        self.libro = libro
+        self.cliente = cliente
+        # Con sucursal, sus documentos van bajo sucursales/<id>/: los ids de venta se repiten entre libros
+        self.prefijo = f"sucursales/{sucursal}/" if sucursal else ""
+        self.tamano_lote = tamano_lote
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.intervalo = intervalo
+        self.fallos_seguidos = 0
+        self.ultimo_error = None
+        self._aviso = threading.Event()
+        self._detener = threading.Event()
+        self._hilo = None
+        libro.suscribir(self.avisar)
+
+    def iniciar(self):
+        """Arranca el hilo de envío (idempotente)"""
+        if self._hilo is None or not self._hilo.is_alive():
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ciclo, name="sync-firestore", daemon=True)
+            self._hilo.start()
+        return self
+
+    def detener(self, timeout=None):
+        self._detener.set()
+        self._aviso.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+
+    def avisar(self):
+        """Despierta al hilo: hay cambios nuevos en el búfer"""
+        self._aviso.set()
+
+    def enviar_lote(self):
+        """Envía un lote pendiente; devuelve cuántos cambios se confirmaron"""
+        pendientes = self.libro.pendientes_sync(self.tamano_lote)
+        if not pendientes:
+            return 0
+
+        # Dentro de un lote basta con la última versión de cada documento
+        ultimos = {}
+        for _, coleccion, documento, datos in pendientes:
+            ultimos[(coleccion, documento)] = datos
+
+        lote = self.cliente.batch()
+        for (coleccion, documento), datos in ultimos.items():
+            lote.set(self.cliente.collection(self.prefijo + coleccion).document(documento), datos)
+        lote.commit()
+
+        self.libro.confirmar_sync([p[0] for p in pendientes])
+        return len(pendientes)
+
+    def _espera(self):
+        """Espera exponencial con variación aleatoria para no reintentar todos a la vez"""
+        espera = min(self.espera_maxima, self.espera_base * 2 ** (self.fallos_seguidos - 1))
+        return espera * random.uniform(0.5, 1.0)
+
+    def _ciclo(self):
+        while not self._detener.is_set():
+            try:
+                enviados = self.enviar_lote()
+                self.fallos_seguidos = 0
+                self.ultimo_error = None
+            except Exception as e:  # Sin red, cuota agotada, etc.: se reintenta luego
+                enviados = 0
+                self.fallos_seguidos += 1
+                self.ultimo_error = e
+                self._detener.wait(self._espera())
+                continue
+
+            if enviados < self.tamano_lote:
+                # Búfer vacío (o casi): esperar una venta nueva o el siguiente sondeo
+                self._aviso.wait(self.intervalo)
+                self._aviso.clear()
+
@@ -0,0 +1,79 @@
+"""Reportes PDF: la secuencia perezosa que recibe doc.build y el armado de reportes de varias páginas"""
+import datetime
+import os
+import re
+import zipfile
+
+import pytest
+
+from benchmarks.generador import catalogo_sintetico, historial_sintetico
+from libro_ventas import LibroVentas
+from reportes import FlujoFlowables, generar_reporte_periodo, generar_reportes_por_dia
+
+HOY = datetime.date.today()
+
+
+@pytest.fixture
+def libro(tmp_path):
+    libro = LibroVentas(str(tmp_path / "ventas.db"))
+    libro.sembrar_productos(catalogo_sintetico(60))
+    historial_sintetico(libro, 3_000, dias=3)
+    return libro
+
+
+def _paginas(pdf):
+    return len(re.findall(rb"/Type /Page\b", pdf))
+
+
+@pytest.mark.parametrize("indice", [
+    0, 3, -1, slice(None, 4), slice(2, 5), slice(3, None), slice(None), slice(-3, None),
+    slice(1, -2), slice(None, None, 2), slice(8, 2, -1), slice(4, 2), slice(0, 50)
+])
+def test_flujo_se_indexa_como_una_lista(indice):
+    flujo = FlujoFlowables(iter(range(10)))
+    assert flujo[indice] == list(range(10))[indice]
+
+
+@pytest.mark.parametrize("indice", [0, slice(0, 3), slice(None, 3), slice(0, None), slice(0, 0)])
+def test_flujo_quita_del_frente_como_una_lista(indice):
+    flujo, lista = FlujoFlowables(iter(range(10))), list(range(10))
+    del flujo[indice]
+    del lista[indice]
+    assert flujo[:] == lista
+
+
+def test_flujo_reinserta_al_frente_y_pide_de_a_poco():
+    pedidos = []
+
+    def generador():
+        for i in range(100):
+            pedidos.append(i)
+            yield i
+
+    flujo = FlujoFlowables(generador())
+    assert flujo[:2] == [0, 1]
+    del flujo[:2]
+    flujo[0:0] = ["a", "b"]
+    flujo.insert(0, "c")
+    assert flujo[:4] == ["c", "a", "b", 2]
+    assert len(pedidos) < 10
+    with pytest.raises(IndexError):
+        del flujo[1]
+
+
+def test_reporte_de_varias_paginas_con_simpledoctemplate(libro):
+    pdf = generar_reporte_periodo(libro, HOY - datetime.timedelta(days=2), HOY)
+    contenido = pdf.read()
+    assert contenido.startswith(b"%PDF")
+    assert _paginas(contenido) > 2
+
+
+def test_reportes_por_dia_en_solo_lectura(libro):
+    antes = os.path.getmtime(libro.ruta)
+    for procesos in (1, 2):
+        with generar_reportes_por_dia(libro.ruta, HOY - datetime.timedelta(days=2), HOY, procesos) as destino:
+            with zipfile.ZipFile(destino) as archivo_zip:
+                nombres = archivo_zip.namelist()
+                assert len(nombres) == 3
+                assert all(archivo_zip.read(n).startswith(b"%PDF") for n in nombres)
+    assert os.path.getmtime(libro.ruta) == antes
@@ -0,0 +1,131 @@
+"""Réplica a Firestore: lotes, espera exponencial, reintentos y confirmar-y-luego-borrar del búfer"""
+import time
+
+import pytest
+
+from benchmarks.generador import catalogo_sintetico
+from libro_ventas import CONSUMIDOR_FINAL, LibroVentas
+from sincronizacion import SincronizadorFirestore
+
+
+# --- DOBLE EN MEMORIA DEL CLIENTE DE FIRESTORE ---
+class ClienteFirestoreFalso:
+    """Imita la parte del cliente de Firestore que usa el sincronizador"""
+
+    def __init__(self, fallar=0):
+        self.documentos = {}      # (coleccion, documento) -> datos
+        self.escrituras = []      # (coleccion, documento) de cada escritura confirmada
+        self.lotes = 0
+        self.fallar = fallar      # Número de commits que fallarán antes de funcionar
+
+    def collection(self, coleccion):
+        return _ColeccionFalsa(coleccion)
+
+    def batch(self):
+        return _LoteFalso(self)
+
+
+class _ColeccionFalsa:
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def document(self, documento):
+        return (self.nombre, documento)
+
+
+class _LoteFalso:
+    def __init__(self, cliente):
+        self.cliente = cliente
+        self.escrituras = []
+
+    def set(self, referencia, datos):
+        self.escrituras.append((referencia, datos))
+
+    def commit(self):
+        # Como en Firestore, el lote es atómico: si falla no se escribe nada
+        if self.cliente.fallar:
+            self.cliente.fallar -= 1
+            raise ConnectionError("Sin conexión (simulada)")
+        for referencia, datos in self.escrituras:
+            self.cliente.documentos[referencia] = datos
+            self.cliente.escrituras.append(referencia)
+        self.cliente.lotes += 1
+
+
+# --- PRUEBAS ---
+@pytest.fixture
+def libro(tmp_path):
+    libro = LibroVentas(str(tmp_path / "ventas.db"))
+    libro.sembrar_productos(catalogo_sintetico(20))
+    libro.confirmar_sync([p[0] for p in libro.pendientes_sync(10_000)])
+    return libro
+
+
+def _vender(libro, ventas):
+    """Una venta de una unidad por SKU; cada una deja en el búfer la venta y su producto"""
+    for sku in range(1, ventas + 1):
+        libro.registrar_venta(CONSUMIDOR_FINAL, "Efectivo", [{"sku": sku, "cantidad": 1, "precio": 1.0}])
+
+
+def test_enviar_lote_tras_fallos_no_pierde_ni_duplica(libro):
+    _vender(libro, 12)
+    esperados = {(coleccion, documento): datos for _, coleccion, documento, datos in libro.pendientes_sync(10_000)}
+    cliente = ClienteFirestoreFalso(fallar=3)
+    sincronizador = SincronizadorFirestore(libro, cliente, tamano_lote=10)
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            sincronizador.enviar_lote()
+        # Sin confirmación de Firestore nada se borra del búfer
+        assert libro.contar_pendientes_sync() == 2 * 12
+
+    while sincronizador.enviar_lote():
+        pass
+
+    assert libro.contar_pendientes_sync() == 0
+    assert cliente.documentos == esperados
+    assert sorted(cliente.escrituras) == sorted(esperados)   # cada documento, una sola vez
+
+
+def test_enviar_lote_respeta_el_tamano_y_deja_la_ultima_version(libro):
+    _vender(libro, 12)
+    libro.registrar_venta(CONSUMIDOR_FINAL, "Efectivo", [{"sku": 1, "cantidad": 2, "precio": 1.0}])
+    cliente = ClienteFirestoreFalso()
+    sincronizador = SincronizadorFirestore(libro, cliente, tamano_lote=10, sucursal="norte")
+
+    enviados = []
+    while (n := sincronizador.enviar_lote()):
+        enviados.append(n)
+
+    assert enviados == [10, 10, 6]
+    assert cliente.lotes == 3
+    assert cliente.documentos[("sucursales/norte/productos", "1")]["stock"] == libro.stock_de(1)
+
+
+def test_espera_exponencial_con_tope(libro):
+    sincronizador = SincronizadorFirestore(libro, ClienteFirestoreFalso(), espera_base=1.0, espera_maxima=8.0)
+    for fallos, tope in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 8.0), (10, 8.0)]:
+        sincronizador.fallos_seguidos = fallos
+        assert tope / 2 <= sincronizador._espera() <= tope
+
+
+def test_el_hilo_reintenta_hasta_vaciar_el_bufer(libro):
+    _vender(libro, 5)
+    cliente = ClienteFirestoreFalso(fallar=2)
+    sincronizador = SincronizadorFirestore(libro, cliente, espera_base=0.01, intervalo=0.05).iniciar()
+    try:
+        limite = time.monotonic() + 10
+        while libro.contar_pendientes_sync() and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert libro.contar_pendientes_sync() == 0
+        assert sincronizador.ultimo_error is None
+        assert len(cliente.escrituras) == 2 * 5
+
+        # Una venta nueva despierta al hilo sin esperar el sondeo
+        _vender(libro, 1)
+        limite = time.monotonic() + 10
+        while libro.contar_pendientes_sync() and time.monotonic() < limite:
+            time.sleep(0.01)
+        assert libro.contar_pendientes_sync() == 0
+    finally:
+        sincronizador.detener(timeout=5)
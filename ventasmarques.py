@@ -1,13 +1,23 @@
+import time
+INICIO_SCRIPT = time.perf_counter()   # para el modo de medición de arranque (VENTAS_MEDIR_ARRANQUE=1)
+
 import streamlit as st
-import pandas as pd
 import datetime
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-from reportlab.pdfgen import canvas  # Importación faltante
-import plotly.express as px  # Importación faltante
+import os
+from libro_ventas import (
+    LibroVentas, StockInsuficiente, StockCambiado, RUTA_POR_DEFECTO, SUCURSAL, CONSUMIDOR_FINAL,
+    clave_cliente, sucursales
+)
+from datos_iniciales import INVENTARIO_INICIAL
+from busqueda import IndiceBusqueda
+from sincronizacion import SincronizadorFirestore, crear_cliente_firestore
+from exportacion import FORMATOS as FORMATOS_EXPORTACION, exportar
+from facturas import ServicioFacturas
+from caja import Caja, ErrorCaja, METODOS_PAGO
+from metricas import REGISTRO as METRICAS, cronometrar, exportar_si_corresponde, medir, reportar_arranque
+# pandas, plotly y reportlab se importan dentro de las páginas y funciones que los usan:
+# el punto de venta arranca y se vuelve a ejecutar sin cargarlos
+FIN_IMPORTACIONES = time.perf_counter()
 
 # Configuración inicial de la página
 st.set_page_config(
@@ -18,90 +28,83 @@ st.set_page_config(
 )
 
 # --- BASE DE DATOS ---
+@st.cache_resource
+def obtener_libro():
+    """Libro de ventas e inventario, compartido por todas las sesiones del proceso"""
+    libro = LibroVentas(RUTA_POR_DEFECTO)
+    libro.sembrar_productos(INVENTARIO_INICIAL)
+    return libro
+
+@st.cache_resource
+def obtener_sincronizador():
+    """Réplica en segundo plano hacia Firestore; None si firebase no está configurado"""
+    try:
+        credenciales = dict(st.secrets["firebase"])
+    except Exception:
+        credenciales = None
+    cliente = crear_cliente_firestore(credenciales)
+    if cliente is None:
+        return None
+    return SincronizadorFirestore(obtener_libro(), cliente, sucursal=SUCURSAL).iniciar()
+
+@st.cache_resource
+def obtener_facturas():
+    """Generador de facturas en segundo plano compartido por todas las cajas"""
+    return ServicioFacturas()
+
+@st.cache_resource
+def obtener_estadisticas():
+    """Tablas de estadísticas por versión del libro, compartidas por todas las sesiones"""
+    from estadisticas import CacheEstadisticas
+    return CacheEstadisticas(obtener_libro())
+
+@st.cache_resource
+def obtener_reabastecimiento():
+    """Pronóstico de reposición del catálogo, calculado una vez por día para todas las cajas"""
+    from reabastecimiento import Reabastecimiento
+    reabastecimiento = Reabastecimiento(obtener_libro())
+    reabastecimiento.calentar()   # en segundo plano: el primer cobro no lo espera
+    return reabastecimiento
+
+@st.cache_resource
+def obtener_clientes():
+    """Autocompletado de clientes compartido; se pone al día con los clientes nuevos"""
+    from clientes import IndiceClientes
+    return IndiceClientes(obtener_libro())
+
+@st.cache_resource
+def obtener_caja():
+    """Reglas de carrito y cobro; las mismas que usa el servicio HTTP de las terminales"""
+    return Caja(obtener_libro())
+
+@st.cache_resource
+def obtener_servicio_caja():
+    """Servicio HTTP de la caja dentro de este proceso, si VENTAS_API_PUERTO lo pide; si no, None"""
+    puerto = os.environ.get("VENTAS_API_PUERTO")
+    if not puerto:
+        return None
+    from servicio_caja import iniciar_en_hilo
+    return iniciar_en_hilo(obtener_libro(), os.environ.get("VENTAS_API_HOST", "127.0.0.1"), int(puerto),
+                           obtener_facturas())
+
+def obtener_catalogo():
+    """Catálogo columnar vigente; se lee del almacén compartido, no de la sesión"""
+    return obtener_libro().catalogo()
+
+@st.cache_resource(max_entries=2)
+def _indice_para_version(version_catalogo):
+    """Índice de búsqueda construido una sola vez por versión del catálogo"""
+    catalogo = obtener_catalogo()
+    return IndiceBusqueda(zip(catalogo.sku.tolist(), catalogo.nombre))
+
+def obtener_indice():
+    """Índice de búsqueda vigente; se reconstruye cuando se edita el inventario"""
+    return _indice_para_version(obtener_libro().version_catalogo)
+
 def inicializar_datos():
     """Inicializa los datos en session_state si no existen"""
-    if "inventario" not in st.session_state:
-        st.session_state.inventario = {
-            "Pastelería": {
-                "Dulce Tres Leche (porción)": {"precio": 4.30, "stock": 0, "costo": 2.15},
-                "Milhojas Arequipe (porción)": {"precio": 4.30, "stock": 0, "costo": 2.15},
-                "Mousse de Chocolate (porción)": {"precio": 4.80, "stock": 0, "costo": 2.40},
-                "Mousse de Parchita (porción)": {"precio": 3.70, "stock": 1, "costo": 1.85},
-                "Ópera (porción)": {"precio": 3.70, "stock": 2 , "costo": 1.85},
-                "Petit Fours (Mini Dulce)": {"precio": 0.80, "stock": 10, "costo": 0.40},
-                "Profiterol (porción)": {"precio": 4.20, "stock": 0, "costo": 2.10},
-                "Sacher (porción)": {"precio": 3, "stock": 0, "costo": 1.5},
-                "Cheesecake Arequipe (porción)": {"precio": 5.40, "stock": 0, "costo": 2.70},
-                "Cheesecake Fresa (porción)": {"precio": 5.40, "stock": 2, "costo": 2.70},
-                "Cheesecake Chocolate (porción)": {"precio": 5.40, "stock": 2, "costo": 2.70},
-                "Cheesecake Pistacho (porción)": {"precio": 5.40, "stock": 0, "costo": 2.70},
-                "Selva Negra (porción)": {"precio": 4.30, "stock": 2, "costo": 2.65},
-                "Tartaleta Limón (porción)": {"precio": 4.30, "stock": 0, "costo": 2.65},
-                "Tartaleta Parchita (porción)": {"precio": 4.30, "stock": 2, "costo": 2.65},
-                "Torta Imposible (porción)": {"precio": 2.50, "stock": 0, "costo": 1.25},
-                "Torta Pan (porción)": {"precio": 2.80, "stock": 0, "costo": 1.40},
-                "Brazo Gitano Limón (porción)": {"precio": 2.20, "stock": 0, "costo": 1.10},
-                "Brazo Gitano Arequipe (porción)": {"precio": 2.20, "stock": 3, "costo": 1.10},
-                "Brazo Gitano Chocolate (porción)": {"precio": 2.20, "stock": 2, "costo": 1.10}
-            },
-            "Hojaldre": {
-                "Hojaldre de Pollo": {"precio": 3.50, "stock": 2, "costo": 1.75},
-                "Hojaldre de Carne": {"precio": 3.00, "stock": 2, "costo": 1.50},
-                "Hojaldre de Queso": {"precio": 3.00, "stock": 1, "costo": 1.50},
-                "Hojaldre de Jamón": {"precio": 3.00, "stock": 1, "costo": 1.50},
-                "Croissant de Pavo/ Queso Crema": {"precio": 3.50, "stock": 0, "costo": 1.75},
-                "Cachito de Queso": {"precio": 3.00, "stock": 2, "costo": 1.50},
-                "Cachito de Jamón": {"precio": 3.00, "stock": 2, "costo": 1.50},
-                "Cachito de Pavo/Queso Crema": {"precio": 3.20, "stock": 1, "costo": 1.60},
-                "Croissant": {"precio": 2.60, "stock": 2, "costo": 1.30}
-                                
-            },
-            "Bebidas": {
-                "Café Pequeño": {"precio": 1.30, "stock": 200, "costo": 0.65},
-                "Café Grande": {"precio": 2.60, "stock": 200, "costo": 1.30},
-                "Mocchaccino": {"precio": 3.00, "stock": 200, "costo": 1.50},
-                "Cappuccino": {"precio": 3.00, "stock": 200, "costo": 1.50},
-                "Chocolate Caliente": {"precio": 3.00, "stock": 200, "costo": 1.50},
-                "Café Arte París": {"precio": 3.50, "stock": 200, "costo": 1.75},
-                "Jugo Naranja": {"precio": 2.50, "stock": 200, "costo": 1.25},
-                "Jugo Fresa": {"precio": 3, "stock": 200, "costo": 1.50},
-                "Jugo Melocoton": {"precio": 3, "stock": 200, "costo": 1.50},
-                "Jugo Guayaba": {"precio": 2.50, "stock": 200, "costo": 1.25},
-                "Jugo Piña": {"precio": 2.50, "stock": 200, "costo": 1.25},
-                "Jugo Lechoza": {"precio": 2.50, "stock": 200, "costo": 1.25},
-                "Jugo Mora": {"precio": 3, "stock": 200, "costo": 1.50},
-                "Agua Mineral": {"precio": 2, "stock": 8, "costo": 1},
-                "Té caliente": {"precio": 2.00, "stock": 200, "costo": 1.00},
-                "Malta Retornable": {"precio": 1.00, "stock": 11, "costo": 0.50},
-                "Nestea": {"precio": 3.00, "stock": 200, "costo": 1.50},
-                "Refresco Bomba": {"precio": 1.50, "stock": 200, "costo": 0.75},
-                "Flor de Jamaica Frío": {"precio": 2.50, "stock": 200, "costo": 1.25},
-                "Papelón con Limón": {"precio": 2.50, "stock": 200, "costo": 1.25}
-            },
-            "Dulces Secos": {
-                "Mini Dulce Manzana": {"precio": 1.25, "stock": 8, "costo": 0.625},
-                "Mini Croissant Chocolate": {"precio": 0.80, "stock": 2, "costo": 0.40},
-                "Trio Mini Dulces": {"precio": 3.40, "stock": 0, "costo": 1.70},
-                "Trio Mini Croissant": {"precio": 2.20, "stock": 0, "costo": 1.10},
-                "Palmeras": {"precio": 3.20, "stock": 2, "costo": 1.60},
-                "Panque Marmoleado": {"precio": 2.50, "stock": 0, "costo": 1.25},
-                "Hojaldre de Manzana": {"precio": 4, "stock": 2, "costo": 2},
-                "Galletas Arte París Chocolate": {"precio": 2.50, "stock": 5, "costo": 1.25},
-                "Galletas Arte París Avena/Pasas": {"precio": 2.50, "stock": 5, "costo": 1.25},
-                "Ambrosia Chocolate": {"precio": 1.40, "stock": 0, "costo": 0.70},
-                "Ambrosia Frutas Confitadas": {"precio": 1.40, "stock": 0, "costo": 0.70},
-                "Pasta Seca (100 grs)": {"precio": 2.50, "stock": 0, "costo": 1.25}
-            }   
-        }
-    
-    if "ventas" not in st.session_state:
-        st.session_state.ventas = []
-    
     if "carrito" not in st.session_state:
         st.session_state.carrito = {}
-    
-    if "clientes" not in st.session_state:
-        st.session_state.clientes = {}
 
 # Asegurarse de que los datos se inicialicen AL INICIO
 if 'inicializado' not in st.session_state:
@@ -109,177 +112,193 @@ if 'inicializado' not in st.session_state:
     st.session_state.inicializado = True
 
 # --- FUNCIONES PRINCIPALES ---
+@cronometrar
 def buscar_productos(termino):
-    """Busca productos en todas las categorías"""
-    resultados = {}
-    for categoria, items in st.session_state.inventario.items():
-        for producto, datos in items.items():
-            if termino.lower() in producto.lower():
-                if categoria not in resultados:
-                    resultados[categoria] = {}
-                resultados[categoria][producto] = datos
-    return resultados
-
-def agregar_al_carrito(producto, cantidad, categoria):
-    """Función mejorada para agregar productos al carrito con validación de stock"""
-    stock_disponible = st.session_state.inventario[categoria][producto]["stock"]
-    
-    if stock_disponible <= 0:
-        st.error(f"⚠️ No hay stock disponible de {producto}")
-        return False
-    
-    if cantidad > stock_disponible:
-        st.error(f"⚠️ Solo hay {stock_disponible} unidades disponibles de {producto}")
+    """Busca productos en todas las categorías (sin acentos, por prefijo y con errores de tipeo)"""
+    catalogo = obtener_catalogo()
+    return [catalogo.producto(sku) for sku in obtener_indice().buscar(termino)]
+
+@cronometrar
+def agregar_al_carrito(sku, cantidad):
+    """Agrega un producto (por SKU) al carrito validando contra el stock compartido"""
+    try:
+        obtener_caja().agregar(st.session_state.carrito, sku, cantidad)
+    except ErrorCaja as e:
+        st.error(f"⚠️ {e}")
         return False
-    
-    if producto in st.session_state.carrito:
-        nueva_cantidad = st.session_state.carrito[producto]["cantidad"] + cantidad
-        if nueva_cantidad > stock_disponible:
-            st.error(f"⚠️ No puedes agregar {cantidad} más. Máximo disponible: {stock_disponible - st.session_state.carrito[producto]['cantidad']}")
-            return False
-        
-        st.session_state.carrito[producto]["cantidad"] = nueva_cantidad
-        st.session_state.carrito[producto]["subtotal"] = nueva_cantidad * st.session_state.carrito[producto]["precio"]
-    else:
-        st.session_state.carrito[producto] = {
-            "cantidad": cantidad,
-            "precio": st.session_state.inventario[categoria][producto]["precio"],
-            "categoria": categoria,
-            "subtotal": cantidad * st.session_state.inventario[categoria][producto]["precio"]
-        }
-    
+    _olvidar_cantidad(sku)
     return True
 
+def _olvidar_cantidad(sku):
+    """Descarta el estado del selector de cantidad del carrito para que tome la cantidad nueva"""
+    st.session_state.pop(f"side_cant_{sku}", None)
+
+@cronometrar
 def finalizar_venta(cliente, metodo_pago):
     """Registra la venta y actualiza el inventario"""
-    if not st.session_state.carrito:
-        st.error("El carrito está vacío")
-        return
-    
-    fecha = datetime.datetime.now()
-    total = sum(item["subtotal"] for item in st.session_state.carrito.values())
-    costo_total = sum(
-        item["cantidad"] * st.session_state.inventario[item["categoria"]][producto]["costo"]
-        for producto, item in st.session_state.carrito.items()
-    )
-    
-    # Registrar venta
-    venta = {
-        "fecha": fecha,
-        "cliente": cliente,
-        "metodo_pago": metodo_pago,
-        "productos": st.session_state.carrito.copy(),
-        "total": total,
-        "costo": costo_total,
-        "ganancia": total - costo_total
-    }
-    
-    st.session_state.ventas.append(venta)
-    
-    # Actualizar inventario
-    for producto, item in st.session_state.carrito.items():
-        st.session_state.inventario[item["categoria"]][producto]["stock"] -= item["cantidad"]
-    
-    # Limpiar carrito
-    st.session_state.carrito = {}
+    try:
+        venta = obtener_caja().cobrar(st.session_state.carrito, cliente, metodo_pago)
+    except (ErrorCaja, StockInsuficiente) as e:
+        # StockInsuficiente: otra caja vendió el producto primero; no se registra nada
+        st.error(f"⚠️ {e}")
+        return None
     st.success("Venta registrada exitosamente!")
+    # Productos que con esta venta quedaron bajo su punto de reorden (se muestran en el carrito)
+    st.session_state.alertas_stock = obtener_reabastecimiento().alertas(venta)
     return venta
 
-def generar_factura(venta):
-    """Genera un PDF con la factura de la venta"""
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-    
-    # Encabezado
-    c.setFont("Helvetica-Bold", 18)
-    c.drawCentredString(width/2, height-50, "SweetBakery �")
-    c.setFont("Helvetica", 10)
-    c.drawCentredString(width/2, height-70, "Av. Principal 123 - Tel: 555-1234")
-    c.drawCentredString(width/2, height-85, f"Factura #{len(st.session_state.ventas)}")
-    c.drawCentredString(width/2, height-100, f"Fecha: {venta['fecha'].strftime('%Y-%m-%d %H:%M')}")
-    
-    # Información del cliente
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(100, height-130, "Cliente:")
-    c.setFont("Helvetica", 12)
-    c.drawString(170, height-130, venta['cliente'])
-    
-    # Tabla de productos
-    c.setFont("Helvetica-Bold", 12)
-    c.drawString(100, height-160, "Producto")
-    c.drawString(300, height-160, "Cant.")
-    c.drawString(350, height-160, "P.Unit")
-    c.drawString(450, height-160, "Subtotal")
-    
-    y_position = height-180
-    c.setFont("Helvetica", 10)
-    for producto, item in venta['productos'].items():
-        c.drawString(100, y_position, producto)
-        c.drawString(300, y_position, str(item['cantidad']))
-        c.drawString(350, y_position, f"${item['precio']}")
-        c.drawString(450, y_position, f"${item['subtotal']}")
-        y_position -= 20
-    
-    # Totales
-    c.line(100, y_position-20, width-100, y_position-20)
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(350, y_position-40, "TOTAL:")
-    c.drawString(450, y_position-40, f"${venta['total']}")
-    
-    # Método de pago
-    c.setFont("Helvetica", 10)
-    c.drawString(100, y_position-70, f"Método de pago: {venta['metodo_pago']}")
-    
-    # Pie de página
-    c.setFont("Helvetica-Oblique", 8)
-    c.drawCentredString(width/2, 50, "¡Gracias por su compra! Vuelva pronto")
-    
-    c.save()
-    buffer.seek(0)
-    return buffer
-
+@cronometrar
 def mostrar_estadisticas():
     """Muestra gráficos y estadísticas de ventas"""
-    if not st.session_state.ventas:
+    import pandas as pd
+    import plotly.express as px
+
+    libro = obtener_libro()
+    if not libro.hay_ventas():
         st.warning("No hay datos de ventas para mostrar")
         return
     
-    df_ventas = pd.DataFrame(st.session_state.ventas)
-    df_ventas['fecha'] = pd.to_datetime(df_ventas['fecha'])
-    df_ventas['dia'] = df_ventas['fecha'].dt.date
+    ventas_diarias, cantidades = obtener_estadisticas().obtener()
     
     # Gráfico de ventas por día
     st.subheader("📈 Ventas Diarias")
-    ventas_diarias = df_ventas.groupby('dia').agg({'total':'sum', 'ganancia':'sum'}).reset_index()
-    fig1 = px.line(ventas_diarias, x='dia', y=['total', 'ganancia'], 
+    fig1 = px.line(ventas_diarias.reset_index(), x='dia', y=['total', 'ganancia'], 
                   title="Ventas y Ganancias por Día",
                   labels={'value': 'Monto ($)', 'variable': 'Tipo'})
     st.plotly_chart(fig1, use_container_width=True)
     
     # Productos más vendidos
     st.subheader("🏆 Productos Más Vendidos")
-    productos_vendidos = []
-    for venta in st.session_state.ventas:
-        for producto, datos in venta['productos'].items():
-            productos_vendidos.append({
-                'Producto': producto,
-                'Cantidad': datos['cantidad'],
-                'Categoría': datos['categoria']
-            })
-    
-    if productos_vendidos:
-        df_productos = pd.DataFrame(productos_vendidos)
-        top_productos = df_productos.groupby('Producto').sum().nlargest(5, 'Cantidad')
+    
+    if not cantidades.empty:
+        top_productos = cantidades.nlargest(5).to_frame()
         fig2 = px.bar(top_productos, x=top_productos.index, y='Cantidad',
                      title="Top 5 Productos por Cantidad Vendida")
         st.plotly_chart(fig2, use_container_width=True)
+    
+    # Análisis por período: se lee del cubo de agregados, no de las ventas
+    st.subheader("🗓️ Análisis por Período")
+    hoy = datetime.date.today()
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        rango = st.date_input("Rango", (hoy - datetime.timedelta(days=30), hoy), key="rango_rollup")
+    with col2:
+        granularidad = st.selectbox("Agrupar por", list(GRANULARIDADES_UI), key="granularidad_rollup")
+    with col3:
+        dimension = st.selectbox("Desglosar por", list(DIMENSIONES_UI), key="dimension_rollup")
+    if len(rango) != 2:
+        return
+    
+    celdas = pd.DataFrame(libro.rollup(GRANULARIDADES_UI[granularidad], DIMENSIONES_UI[dimension], *rango))
+    if celdas.empty:
+        st.info("No hay ventas en el rango seleccionado")
+        return
+    if DIMENSIONES_UI[dimension] == "total":
+        fig3 = px.bar(celdas, x='periodo', y='total', title=f"Ventas por {granularidad.lower()}",
+                      labels={'periodo': granularidad, 'total': 'Monto ($)'})
+    else:
+        fig3 = px.bar(celdas, x='periodo', y='total', color='valor',
+                      title=f"Ventas por {granularidad.lower()} y {dimension.lower()}",
+                      labels={'periodo': granularidad, 'total': 'Monto ($)', 'valor': dimension})
+    st.plotly_chart(fig3, use_container_width=True)
+    
+    # Ventas por hora del día en el rango (buckets horarios del cubo)
+    por_hora = pd.DataFrame(libro.rollup("hora", "total", *rango))
+    por_hora = por_hora.groupby(por_hora['periodo'].str[11:13].astype(int))['total'].sum()
+    fig4 = px.bar(por_hora, x=por_hora.index, y='total', title="Ventas por Hora del Día",
+                  labels={'periodo': 'Hora', 'total': 'Monto ($)'})
+    st.plotly_chart(fig4, use_container_width=True)
 
 # --- INTERFAZ DE USUARIO ---
 
+GRANULARIDADES_UI = {"Hora": "hora", "Día": "dia", "Semana": "semana", "Mes": "mes"}
+DIMENSIONES_UI = {"Total": "total", "Método de pago": "metodo_pago", "Categoría": "categoria", "Producto": "producto"}
+
+TAMANO_PAGINA = 12  # Tarjetas por página (3 filas de 4)
+
+def _icono_categoria(categoria):
+    """Emoji que identifica cada categoría en las tarjetas"""
+    return ('🎂' if categoria == 'Pastelería' else '🥐' if categoria == 'Hojaldre' else
+            '☕' if categoria == 'Bebidas' else '🍪')
+
+def _cambiar_pagina(clave, delta):
+    """Callback de los botones de paginación"""
+    st.session_state.paginas[clave] = st.session_state.paginas.get(clave, 0) + delta
+
+def _paginar(clave, total):
+    """Dibuja los controles de paginación y devuelve el rango visible (inicio, fin)"""
+    if "paginas" not in st.session_state:
+        st.session_state.paginas = {}
+    
+    n_paginas = max(1, -(-total // TAMANO_PAGINA))
+    pagina = min(st.session_state.paginas.get(clave, 0), n_paginas - 1)
+    st.session_state.paginas[clave] = pagina
+    
+    if n_paginas > 1:
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col1:
+            st.button("◀ Anterior", key=f"prev_{clave}", disabled=pagina == 0,
+                      on_click=_cambiar_pagina, args=(clave, -1), use_container_width=True)
+        with col2:
+            st.caption(f"Página {pagina + 1} de {n_paginas} · {total} productos")
+        with col3:
+            st.button("Siguiente ▶", key=f"next_{clave}", disabled=pagina >= n_paginas - 1,
+                      on_click=_cambiar_pagina, args=(clave, 1), use_container_width=True)
+    
+    inicio = pagina * TAMANO_PAGINA
+    return inicio, min(inicio + TAMANO_PAGINA, total)
+
+@cronometrar
+def _mostrar_tarjetas(skus, catalogo):
+    """Tarjetas de producto en 4 columnas; recibe solo los SKUs de la página visible"""
+    cols = st.columns(4)
+    for idx, sku in enumerate(skus):
+        if idx and idx % 4 == 0:
+            cols = st.columns(4)
+        datos = catalogo.producto(sku)
+        
+        with cols[idx % 4]:
+            with st.container(border=True):
+                # Cambiar color del borde si stock es cero
+                border_color = "#FF4B4B" if datos['stock'] == 0 else "#E0E0E0"
+                st.markdown(
+                    f"""<div style='border: 2px solid {border_color}; border-radius: 5px; padding: 10px;'>
+                    <p style='margin-bottom: 5px;'><strong>{_icono_categoria(datos['categoria'])} {datos['nombre']}</strong></p>
+                    <p style='margin-bottom: 5px;'>💵 <strong>Precio:</strong> ${datos['precio']:.2f}</p>
+                    <p style='margin-bottom: 10px;'>📦 <strong>Stock:</strong> {datos['stock']}</p>
+                    </div>""", 
+                    unsafe_allow_html=True
+                )
+                
+                # Mostrar mensaje si no hay stock
+                if datos['stock'] == 0:
+                    st.error("Agotado", icon="⛔")
+                    # El pedido que no se pudo atender cuenta como demanda para la reposición
+                    if st.button("🙋 Lo pidieron", key=f"pedido_{sku}", use_container_width=True):
+                        obtener_libro().registrar_demanda_insatisfecha(sku, 1)
+                        st.toast(f"Anotado: {datos['nombre']} pedido sin stock")
+                else:
+                    # Botón para agregar con cantidad
+                    cantidad = st.number_input(
+                        "Cantidad:",
+                        min_value=1,
+                        max_value=datos['stock'],
+                        value=1,
+                        key=f"cant_{sku}",
+                        label_visibility="collapsed"
+                    )
+                    
+                    if st.button("➕ Agregar", 
+                               key=f"add_{sku}",
+                               use_container_width=True):
+                        if agregar_al_carrito(sku, cantidad):
+                            st.toast(f"✅ {cantidad} x {datos['nombre']} agregado!")
+
+@cronometrar
 def mostrar_interfaz_ventas():
-    """Interfaz mejorada para el proceso de ventas con manejo de stock cero"""
+    """Interfaz de ventas: solo se dibujan los widgets de la página visible de cada categoría"""
     st.header("🛒 Punto de Venta - SweetBakery")
+    catalogo = obtener_catalogo()
     
     # Barra de búsqueda mejorada
     with st.container():
@@ -290,176 +309,161 @@ def mostrar_interfaz_ventas():
                                    help="Busca por nombre de producto")
         with col2:
             categoria_filtro = st.selectbox("🗂️ Filtrar por categoría", 
-                                          ["Todas"] + list(st.session_state.inventario.keys()))
+                                          ["Todas"] + catalogo.categorias)
     
     # Mostrar productos según búsqueda/filtro
     if busqueda or categoria_filtro != "Todas":
-        resultados = []
-        for categoria, productos in st.session_state.inventario.items():
-            if categoria_filtro != "Todas" and categoria != categoria_filtro:
-                continue
-                
-            for producto, datos in productos.items():
-                if not busqueda or busqueda.lower() in producto.lower():
-                    resultados.append({
-                        "Producto": producto,
-                        "Categoría": categoria,
-                        "Precio": datos['precio'],
-                        "Stock": datos['stock'],
-                        "Imagen": "🎂" if categoria == "Pastelería" else 
-                                 "🥐" if categoria == "Hojaldre" else
-                                 "☕" if categoria == "Bebidas" else
-                                 "🍪"
-                    })
+        # Con búsqueda se usa el índice (ordenado por relevancia); sin ella, la categoría completa
+        if busqueda:
+            encontrados = [
+                sku for sku in obtener_indice().buscar(busqueda)
+                if categoria_filtro == "Todas" or catalogo.categoria_de(sku) == categoria_filtro
+            ]
+        else:
+            encontrados = catalogo.skus_de_categoria(categoria_filtro).tolist()
         
-        if resultados:
-            st.subheader(f"📦 Productos Disponibles ({len(resultados)} encontrados)")
-            
-            # Mostrar productos en tarjetas
-            cols = st.columns(4)
-            col_index = 0
-            
-            for idx, item in enumerate(resultados):
-                with cols[col_index]:
-                    with st.container(border=True):
-                        # Cambiar color del borde si stock es cero
-                        border_color = "#FF4B4B" if item['Stock'] == 0 else "#E0E0E0"
-                        st.markdown(
-                            f"""<div style='border: 2px solid {border_color}; border-radius: 5px; padding: 10px;'>
-                            <p style='margin-bottom: 5px;'><strong>{item['Imagen']} {item['Producto']}</strong></p>
-                            <p style='margin-bottom: 5px;'>💵 <strong>Precio:</strong> ${item['Precio']:.2f}</p>
-                            <p style='margin-bottom: 10px;'>📦 <strong>Stock:</strong> {item['Stock']}</p>
-                            </div>""", 
-                            unsafe_allow_html=True
-                        )
-                        
-                        # Mostrar mensaje si no hay stock
-                        if item['Stock'] == 0:
-                            st.error("Agotado", icon="⛔")
-                        else:
-                            # Botón para agregar con cantidad
-                            cantidad = st.number_input(
-                                "Cantidad:",
-                                min_value=1,
-                                max_value=item['Stock'],
-                                value=1,
-                                key=f"cant_{item['Producto']}",
-                                label_visibility="collapsed"
-                            )
-                            
-                            if st.button("➕ Agregar", 
-                                       key=f"add_{item['Producto']}",
-                                       use_container_width=True,
-                                       disabled=(item['Stock'] == 0)):
-                                agregar_al_carrito(item['Producto'], cantidad, item['Categoría'])
-                                st.toast(f"✅ {cantidad} x {item['Producto']} agregado!")
-                
-                col_index = (col_index + 1) % 4
-                if col_index == 0 and idx < len(resultados) - 1:
-                    cols = st.columns(4)
+        if encontrados:
+            st.subheader(f"📦 Productos Disponibles ({len(encontrados)} encontrados)")
+            inicio, fin = _paginar(f"busqueda_{busqueda}_{categoria_filtro}", len(encontrados))
+            _mostrar_tarjetas(encontrados[inicio:fin], catalogo)
         else:
             st.warning("No se encontraron productos con esos criterios")
             if st.button("Mostrar todos los productos"):
                 st.session_state.busqueda_venta = ""
                 st.rerun()
     else:
-        # Mostrar todas las categorías con expansores si no hay búsqueda
-        for categoria, productos in st.session_state.inventario.items():
-            with st.expander(f"📂 {categoria} ({len(productos)} productos)", expanded=True):
-                cols = st.columns(4)
-                col_index = 0
-                
-                for idx, (producto, datos) in enumerate(productos.items()):
-                    with cols[col_index]:
-                        # Cambiar color del borde si stock es cero
-                        border_color = "#FF4B4B" if datos['stock'] == 0 else "#E0E0E0"
-                        st.markdown(
-                            f"""<div style='border: 2px solid {border_color}; border-radius: 5px; padding: 10px;'>
-                            <p style='margin-bottom: 5px;'><strong>{'🎂' if categoria == 'Pastelería' else '🥐' if categoria == 'Hojaldre' else '☕' if categoria == 'Bebidas' else '🍪'} {producto}</strong></p>
-                            <p style='margin-bottom: 5px;'>💵 <strong>Precio:</strong> ${datos['precio']:.2f}</p>
-                            <p style='margin-bottom: 10px;'>📦 <strong>Stock:</strong> {datos['stock']}</p>
-                            </div>""", 
-                            unsafe_allow_html=True
-                        )
-                        
-                        # Mostrar mensaje si no hay stock
-                        if datos['stock'] == 0:
-                            st.error("Agotado", icon="⛔")
-                        else:
-                            # Botón para agregar con cantidad
-                            cantidad = st.number_input(
-                                "Cantidad:",
-                                min_value=1,
-                                max_value=datos['stock'],
-                                value=1,
-                                key=f"cant_{categoria}_{producto}",
-                                label_visibility="collapsed"
-                            )
-                            
-                            if st.button("➕ Agregar", 
-                                       key=f"add_{categoria}_{producto}",
-                                       use_container_width=True):
-                                agregar_al_carrito(producto, cantidad, categoria)
-                                st.toast(f"✅ {cantidad} x {producto} agregado!")
-                    
-                    col_index = (col_index + 1) % 4
-                    if col_index == 0 and idx < len(productos) - 1:
-                        cols = st.columns(4)
+        # Sin búsqueda: cada categoría se abre a demanda (los expansores dibujan su contenido
+        # aunque estén cerrados, por eso se usa un interruptor y solo se pinta lo abierto)
+        for categoria in catalogo.categorias:
+            skus = catalogo.skus_de_categoria(categoria)
+            abierta = st.toggle(f"📂 {categoria} ({len(skus)} productos)",
+                                key=f"abrir_{categoria}")
+            if abierta:
+                inicio, fin = _paginar(f"categoria_{categoria}", len(skus))
+                _mostrar_tarjetas(skus[inicio:fin].tolist(), catalogo)
+                st.divider()
+
+
+def _quitar_del_carrito(sku):
+    """Callback del botón eliminar de cada línea del carrito"""
+    Caja.quitar(st.session_state.carrito, sku)
+
+def _elegir_cliente(nombre):
+    """Callback de una sugerencia de cliente"""
+    st.session_state.cliente_pago = nombre
 
+def _vaciar_carrito():
+    """Callback del botón vaciar carrito"""
+    st.session_state.carrito = {}
+    st.toast("Carrito vaciado")
+
+@st.fragment
+@cronometrar
 def mostrar_carrito():
-    """Carrito de compras mejorado"""
-    st.sidebar.header("📋 Factura Actual")
+    """Carrito de compras; se vuelve a ejecutar solo, sin redibujar el catálogo
+
+    Debe llamarse dentro de `with st.sidebar:` (los fragmentos no pueden usar st.sidebar).
+    """
+    st.header("📋 Factura Actual")
+    
+    # Factura de la última venta finalizada en esta sesión (se genera en segundo plano)
+    if "ultima_venta" in st.session_state:
+        venta = st.session_state.ultima_venta
+        st.success(f"Venta #{venta.id} registrada correctamente!")
+        # solicitar() devuelve la que ya está en curso o guardada, o la vuelve a generar si salió de la caché
+        factura = obtener_facturas().solicitar(venta)
+        if not factura.done():
+            st.caption("⏳ Preparando factura...")
+            st.button("Actualizar", key="actualizar_factura", use_container_width=True)
+        elif factura.exception():
+            st.error(f"⚠️ No se pudo generar la factura: {factura.exception()}")
+            st.button("🔁 Reintentar factura", key="reintentar_factura", use_container_width=True,
+                      on_click=obtener_facturas().reintentar, args=(venta,))
+        else:
+            st.download_button(
+                label="📄 Descargar Factura",
+                data=factura.result(),
+                file_name=f"factura_{venta.id}.pdf",
+                mime="application/pdf",
+                use_container_width=True
+            )
+        for alerta in st.session_state.get("alertas_stock", []):
+            st.warning(f"📉 {alerta['producto']}: quedan {alerta['stock']} (punto de reorden "
+                       f"{alerta['punto_reorden']}); hornear {alerta['sugerido']} para mañana")
+    
+    # Lectura por escáner (teclado): el Enter del lector envía el formulario y solo se
+    # vuelve a ejecutar este fragmento, sin redibujar la grilla del catálogo
+    with st.form("form_escaneo", clear_on_submit=True, border=False):
+        col1, col2 = st.columns([3, 1], vertical_alignment="bottom")
+        codigo = col1.text_input("🔎 Escanear código o SKU", placeholder="7591234 o 3*7591234")
+        escaneado = col2.form_submit_button("➕", use_container_width=True)
+    if escaneado and codigo.strip():
+        try:
+            producto, cantidad = obtener_caja().escanear(st.session_state.carrito, codigo)
+            _olvidar_cantidad(producto["sku"])
+            st.toast(f"✅ {cantidad} × {producto['nombre']}")
+        except ErrorCaja as e:
+            st.error(f"⚠️ {e}")
     
     if not st.session_state.carrito:
-        st.sidebar.info("🛒 El carrito está vacío")
-        st.sidebar.image("https://cdn-icons-png.flaticon.com/512/2038/2038854.png", 
-                        width=150, caption="Agrega productos para comenzar")
+        st.info("🛒 El carrito está vacío")
+        st.image("https://cdn-icons-png.flaticon.com/512/2038/2038854.png", 
+                 width=150, caption="Agrega productos para comenzar")
         return
     
+    catalogo = obtener_catalogo()
+    
     # Mostrar resumen compacto
     total_items = sum(item['cantidad'] for item in st.session_state.carrito.values())
-    st.sidebar.subheader(f"🛍️ {total_items} {'producto' if total_items == 1 else 'productos'}")
+    st.subheader(f"🛍️ {total_items} {'producto' if total_items == 1 else 'productos'}")
     
-    # Lista de productos con opciones de edición
-    for producto, item in st.session_state.carrito.items():
-        with st.sidebar.container(border=True):
+    # Lista de productos con opciones de edición (los totales se calculan después,
+    # así que un cambio de cantidad se refleja en esta misma ejecución)
+    for sku, item in st.session_state.carrito.items():
+        with st.container(border=True):
             col1, col2 = st.columns([3, 1])
             with col1:
-                st.markdown(f"**{producto}**")
+                st.markdown(f"**{catalogo.nombre[catalogo.posicion(sku)]}**")
                 st.caption(f"${item['precio']:.2f} c/u")
             with col2:
                 nueva_cantidad = st.number_input(
                     "Cantidad",
                     min_value=1,
-                    max_value=st.session_state.inventario[item['categoria']][producto]['stock'] + item['cantidad'],
+                    max_value=max(int(catalogo.stock[catalogo.posicion(sku)]), item['cantidad']),
                     value=item['cantidad'],
-                    key=f"side_cant_{producto}",
+                    key=f"side_cant_{sku}",
                     label_visibility="collapsed"
                 )
                 
                 if nueva_cantidad != item['cantidad']:
                     item['cantidad'] = nueva_cantidad
                     item['subtotal'] = nueva_cantidad * item['precio']
-                    st.rerun()
             
-            if st.button("❌ Eliminar", key=f"side_del_{producto}", use_container_width=True):
-                del st.session_state.carrito[producto]
-                st.rerun()
+            st.button("❌ Eliminar", key=f"side_del_{sku}", use_container_width=True,
+                      on_click=_quitar_del_carrito, args=(sku,))
     
     # Resumen de compra
-    st.sidebar.divider()
-    subtotal = sum(item['subtotal'] for item in st.session_state.carrito.values())
-    st.sidebar.markdown(f"**Subtotal:** ${subtotal:.2f}")
+    st.divider()
+    subtotal = Caja.total(st.session_state.carrito)
+    st.markdown(f"**Subtotal:** ${subtotal:.2f}")
     
     # Opciones de pago mejoradas
-    with st.sidebar.expander("💳 Información de Pago", expanded=True):
-        cliente = st.text_input("👤 Nombre del cliente:", "Consumidor Final")
+    with st.expander("💳 Información de Pago", expanded=True):
+        # El estado del campo se pierde al cambiar de página: se repone antes de dibujarlo
+        st.session_state.setdefault("cliente_pago", CONSUMIDOR_FINAL)
+        cliente = st.text_input("👤 Nombre del cliente:", key="cliente_pago")
+        ficha = obtener_libro().cliente(cliente)
+        if ficha:
+            st.caption(f"⭐ {ficha['nombre']}: {ficha['compras']} compras · {ficha['puntos']} puntos")
+        elif clave_cliente(cliente):
+            sugerencias = obtener_clientes().sugerir(cliente)
+            for i, nombre in enumerate(sugerencias):
+                st.button(f"👤 {nombre}", key=f"sugerencia_cliente_{i}", use_container_width=True,
+                          on_click=_elegir_cliente, args=(nombre,))
+            if not sugerencias:
+                st.caption("Cliente nuevo: se registrará al cobrar")
         
-        metodo_pago = st.selectbox(
-            "Método de pago:", 
-            ["Efectivo Bs", "Efectivo $", "Tarjeta Débito", "Tarjeta Crédito", "Pago Móvil", "Zelle"],
-            index=0
-        )
+        metodo_pago = st.selectbox("Método de pago:", METODOS_PAGO, index=0)
         
         if metodo_pago.startswith("Efectivo"):
             monto_recibido = st.number_input("Monto recibido:", min_value=0.0, value=subtotal, step=1.0)
@@ -470,165 +474,216 @@ def mostrar_carrito():
                 st.error("El monto recibido es insuficiente")
     
     # Botones de acción
-    st.sidebar.divider()
-    col1, col2 = st.sidebar.columns(2)
+    st.divider()
+    col1, col2 = st.columns(2)
     with col1:
-        if st.button("🔄 Vaciar Carrito", use_container_width=True, type="secondary"):
-            st.session_state.carrito = {}
-            st.toast("Carrito vaciado")
-            st.rerun()
+        st.button("🔄 Vaciar Carrito", use_container_width=True, type="secondary",
+                  on_click=_vaciar_carrito)
     with col2:
         if st.button("✅ Finalizar Compra", use_container_width=True, type="primary"):
             venta = finalizar_venta(cliente, metodo_pago)
             if venta:
-                st.sidebar.success("Venta registrada correctamente!")
+                st.session_state.ultima_venta = venta
+                obtener_facturas().solicitar(venta)
                 st.balloons()
-                
-                # Generar y ofrecer descarga de factura
-                pdf_buffer = generar_factura(venta)
-                st.sidebar.download_button(
-                    label="📄 Descargar Factura",
-                    data=pdf_buffer,
-                    file_name=f"factura_{venta['fecha'].strftime('%Y%m%d_%H%M')}.pdf",
-                    mime="application/pdf",
-                    use_container_width=True
-                )
-                
-                st.session_state.carrito = {}
-                st.rerun()
-def mostrar_carrito():
-    """Muestra el carrito de compras actual con opciones de edición"""
-    st.sidebar.header("📋 Factura Actual")
-    
-    if not st.session_state.carrito:
-        st.sidebar.info("El carrito está vacío")
-        return
-    
-    # Mostrar items con opción de eliminar
-    productos_a_eliminar = []
-    for producto, item in st.session_state.carrito.items():
-        col1, col2, col3 = st.sidebar.columns([6, 3, 1])
-        with col1:
-            st.write(f"**{producto}**")
-        with col2:
-            nueva_cantidad = st.number_input(
-                f"Cantidad {producto}",
-                min_value=1,
-                max_value=st.session_state.inventario[item['categoria']][producto]['stock'],
-                value=item['cantidad'],
-                key=f"cant_{producto}",
-                label_visibility="collapsed"
-            )
-            if nueva_cantidad != item['cantidad']:
-                item['cantidad'] = nueva_cantidad
-                item['subtotal'] = nueva_cantidad * item['precio']
-        with col3:
-            if st.button("❌", key=f"del_{producto}"):
-                productos_a_eliminar.append(producto)
-    
-    # Eliminar productos marcados
-    for producto in productos_a_eliminar:
-        del st.session_state.carrito[producto]
-    
-    if productos_a_eliminar:
-        st.rerun()
-    
-    # Resumen y total
-    st.sidebar.markdown("---")
-    total = sum(item['subtotal'] for item in st.session_state.carrito.values())
-    st.sidebar.markdown(f"### Total: ${total:.2f}")
-    
-    # Datos del cliente y pago
-    cliente = st.sidebar.text_input("👤 Nombre del cliente:", "Consumidor Final", key="nombre_cliente")
-    metodo_pago = st.sidebar.selectbox(
-        "💳 Método de pago:", 
-        ["Efectivo Bs", "Efectivo $", "Tarjeta Débito", "Tarjeta Crédito", "Pago Móvil", "Zelle"],
-        key="metodo_pago"
-    )
-    
-    # Botones de acción
-    col1, col2 = st.sidebar.columns(2)
-    with col1:
-        if st.button("🔄 Limpiar", use_container_width=True):
-            st.session_state.carrito = {}
-            st.rerun()
-    with col2:
-        if st.button("✅ Finalizar", type="primary", use_container_width=True):
-            if finalizar_venta(cliente, metodo_pago):
-                st.sidebar.success("Venta registrada correctamente!")
-                st.session_state.carrito = {}
+                # El stock cambió: se redibuja toda la página, no solo el carrito
                 st.rerun()
                 
                 
+@cronometrar
 def mostrar_inventario():
     """Muestra y permite gestionar el inventario"""
+    import pandas as pd
+    from planillas import exportar_catalogo, leer_planilla, validar
+
     st.header("📦 Gestión de Inventario")
     
-    # Mostrar todo el inventario
-    inventario_df = []
-    for categoria, productos in st.session_state.inventario.items():
-        for producto, datos in productos.items():
-            inventario_df.append({
-                "Categoría": categoria,
-                "Producto": producto,
-                "Precio": datos["precio"],
-                "Costo": datos["costo"],
-                "Stock": datos["stock"],
-                "Margen": f"{((datos['precio']-datos['costo'])/datos['costo']*100):.1f}%"
-            })
+    # Tabla de inventario calculada por columnas (margen y valorización vectorizados)
+    libro = obtener_libro()
+    catalogo = libro.catalogo()
+    valor = catalogo.valorizacion()
+    
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Productos", len(catalogo))
+    col2.metric("Inventario a costo", f"${valor['costo']:.2f}")
+    col3.metric("Inventario a precio de venta", f"${valor['venta']:.2f}")
     
     st.dataframe(
-        pd.DataFrame(inventario_df),
+        catalogo.como_dataframe(),
         column_config={
             "Precio": st.column_config.NumberColumn(format="$%.2f"),
             "Costo": st.column_config.NumberColumn(format="$%.2f"),
             "Stock": st.column_config.ProgressColumn(
                 format="%d", 
                 min_value=0, 
-                max_value=100
+                max_value=max(int(catalogo.stock.max(initial=0)), 1)
             ),
+            "Margen": st.column_config.NumberColumn(format="%.1f%%"),
         },
         hide_index=True,
         use_container_width=True
     )
     
+    # Reposición: pronóstico vectorizado de todo el catálogo, recalculado una vez por día
+    with st.expander("🧁 Reposición para mañana"):
+        reabastecimiento = obtener_reabastecimiento()
+        if reabastecimiento.ultimo_error:
+            st.warning(f"⚠️ Las alertas de reposición al cobrar están en pausa: {reabastecimiento.ultimo_error}")
+        sugerencias = reabastecimiento.sugerencias()
+        if sugerencias:
+            st.caption("Pronóstico por suavizado exponencial de las ventas (y pedidos sin stock) "
+                       "de las últimas 4 semanas; se sugiere hornear hasta el punto de reorden.")
+            st.dataframe(pd.DataFrame(sugerencias), hide_index=True, use_container_width=True)
+        else:
+            st.success("El stock actual cubre el pronóstico de mañana")
+    
     # Editor de inventario
     with st.expander("✏️ Editar Producto"):
-        categorias = list(st.session_state.inventario.keys())
-        producto_seleccionado = st.selectbox(
+        sku = st.selectbox(
             "Seleccionar producto a editar",
-            options=[(cat, prod) for cat in categorias for prod in st.session_state.inventario[cat].keys()],
-            format_func=lambda x: f"{x[1]} ({x[0]})"
+            options=catalogo.sku.tolist(),
+            format_func=lambda s: f"{catalogo.nombre[catalogo.posicion(s)]} ({catalogo.categoria_de(s)})"
         )
         
-        if producto_seleccionado:
-            categoria, producto = producto_seleccionado
-            datos = st.session_state.inventario[categoria][producto]
+        if sku:
+            datos = catalogo.producto(sku)
             
-            with st.form(f"form_edit_{producto}"):
-                nuevo_precio = st.number_input("Precio", value=datos["precio"], min_value=0.0, step=0.1)
-                nuevo_costo = st.number_input("Costo", value=datos["costo"], min_value=0.0, step=0.1)
-                nuevo_stock = st.number_input("Stock", value=datos["stock"], min_value=0, step=1)
+            # Con clave fija los campos conservan lo que se muestra aunque otra caja venda;
+            # se anota el stock con el que se abrió el formulario para no pisar esas ventas
+            if f"edit_stock_{sku}" not in st.session_state:
+                st.session_state[f"stock_visto_{sku}"] = datos["stock"]
+            aviso = st.session_state.pop(f"aviso_edicion_{sku}", None)
+            if aviso:
+                st.error(f"⚠️ {aviso}")
+            with st.form(f"form_edit_{sku}"):
+                nuevo_precio = st.number_input("Precio", value=datos["precio"], min_value=0.0, step=0.1,
+                                               key=f"edit_precio_{sku}")
+                nuevo_costo = st.number_input("Costo", value=datos["costo"], min_value=0.0, step=0.1,
+                                              key=f"edit_costo_{sku}")
+                nuevo_stock = st.number_input("Stock", value=datos["stock"], min_value=0, step=1,
+                                              key=f"edit_stock_{sku}")
+                codigo_actual = catalogo.codigo_barras[catalogo.posicion(sku)] or ""
+                nuevo_codigo = st.text_input("Código de barras", value=codigo_actual)
                 
                 if st.form_submit_button("Guardar cambios"):
-                    st.session_state.inventario[categoria][producto] = {
-                        "precio": nuevo_precio,
-                        "costo": nuevo_costo,
-                        "stock": nuevo_stock
-                    }
-                    st.success("¡Cambios guardados!")
-                    st.rerun()
+                    try:
+                        libro.actualizar_producto(sku, nuevo_precio, nuevo_costo, nuevo_stock,
+                                                  st.session_state[f"stock_visto_{sku}"])
+                        if nuevo_codigo.strip() != codigo_actual:
+                            libro.asignar_codigo_barras(sku, nuevo_codigo)
+                    except StockCambiado as e:
+                        # El campo de stock vuelve a mostrar el vigente; el resto de lo editado se conserva
+                        del st.session_state[f"edit_stock_{sku}"]
+                        st.session_state[f"aviso_edicion_{sku}"] = str(e)
+                        st.rerun()
+                    except ValueError as e:
+                        st.error(f"⚠️ {e}")
+                    else:
+                        for campo in ("precio", "costo", "stock"):
+                            del st.session_state[f"edit_{campo}_{sku}"]
+                        st.success("¡Cambios guardados!")
+                        st.rerun()
+    
+    # Carga masiva: catálogo completo o conteo físico de stock
+    with st.expander("📥 Importar / Exportar catálogo"):
+        tipo = st.radio("Tipo de planilla", ["Catálogo completo", "Conteo de stock"], horizontal=True)
+        conteo = tipo == "Conteo de stock"
+        
+        col1, col2 = st.columns(2)
+        for col, formato in ((col1, "csv"), (col2, "xlsx")):
+            col.download_button(
+                label=f"📤 Descargar {formato.upper()}",
+                data=lambda formato=formato: exportar_catalogo(libro.catalogo(), formato, conteo),
+                file_name=f"{'conteo' if conteo else 'catalogo'}_{datetime.date.today()}.{formato}",
+                use_container_width=True
+            )
+        
+        if "carga_catalogo" not in st.session_state:
+            st.session_state.carga_catalogo = 0
+        archivo = st.file_uploader("Subir planilla (CSV o XLSX)", type=["csv", "xlsx"],
+                                   key=f"planilla_{st.session_state.carga_catalogo}")
+        if archivo is not None:
+            filas, errores = validar(leer_planilla(archivo, archivo.name), catalogo, conteo)
+            if len(errores):
+                st.error(f"La planilla tiene {len(errores)} errores; no se aplicó ningún cambio")
+                st.dataframe(errores, hide_index=True, use_container_width=True)
+            elif st.button(f"Aplicar {len(filas)} filas", type="primary"):
+                if conteo:
+                    cambios = libro.contar_stock(filas)
+                    st.success(f"Conteo aplicado: {cambios} productos con diferencia de stock")
+                else:
+                    creados, actualizados = libro.importar_productos(filas)
+                    st.success(f"Catálogo importado: {creados} productos nuevos, {actualizados} actualizados")
+                st.session_state.carga_catalogo += 1
+                st.rerun()
+
+@cronometrar
+def mostrar_clientes():
+    """Mejores clientes y compras de un cliente, desde el registro y su índice de ventas"""
+    import pandas as pd
+
+    libro = obtener_libro()
+    with st.expander("👥 Clientes"):
+        mejores = libro.mejores_clientes(10)
+        if not mejores:
+            st.caption("Todavía no hay clientes registrados: se registran al cobrar con su nombre")
+            return
+        st.subheader("Mejores clientes")
+        st.dataframe(
+            pd.DataFrame(mejores),
+            column_config={"Total Comprado": st.column_config.NumberColumn(format="$%.2f")},
+            hide_index=True,
+            use_container_width=True
+        )
+
+        texto = st.text_input("🔎 Buscar cliente", key="buscar_cliente")
+        sugerencias = obtener_clientes().sugerir(texto, limite=20) if texto.strip() else []
+        if texto.strip() and not sugerencias:
+            st.caption("Ningún cliente coincide")
+        if not sugerencias:
+            return
+        ficha = libro.cliente(st.selectbox("Cliente", sugerencias))
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Compras", ficha["compras"])
+        col2.metric("Total comprado", f"${ficha['total_comprado']:.2f}")
+        col3.metric("Puntos", ficha["puntos"])
+        compras = libro.compras_de_cliente(ficha["id"], limite=50)
+        st.caption(f"Últimas {len(compras)} compras")
+        st.dataframe(
+            pd.DataFrame.from_records(
+                [(v.id, v.fecha, v.metodo_pago, ", ".join(f"{l.cantidad} × {l.producto}" for l in v.lineas), v.total)
+                 for v in compras],
+                columns=["Venta", "Fecha", "Método Pago", "Productos", "Total"]
+            ),
+            column_config={
+                "Total": st.column_config.NumberColumn(format="$%.2f"),
+                "Fecha": st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+
+def _leer_y_cerrar(archivo):
+    """Contenido de un archivo temporal generado para descargar; lo cierra (y se borra) al leerlo"""
+    with archivo:
+        return archivo.read()
 
+@cronometrar
 def mostrar_historial_ventas():
     """Muestra el historial completo de ventas"""
+    import pandas as pd
+
     st.header("📊 Historial de Ventas")
     
-    if not st.session_state.ventas:
+    libro = obtener_libro()
+    if not libro.hay_ventas():
         st.info("No hay ventas registradas aún")
         return
     
+    mostrar_clientes()
+    
     # Filtros para el historial
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     with col1:
         fecha_inicio = st.date_input("Fecha inicio", datetime.date.today())
     with col2:
@@ -636,33 +691,29 @@ def mostrar_historial_ventas():
     with col3:
         filtro_categoria = st.selectbox(
             "Filtrar por categoría", 
-            ["Todas"] + list(st.session_state.inventario.keys())
+            ["Todas"] + obtener_catalogo().categorias
         )
+    with col4:
+        filtro_metodo = st.selectbox("Filtrar por método de pago", ["Todos"] + METODOS_PAGO)
+    
+    # Consultar solo las ventas del rango (ya vienen ordenadas por fecha)
+    ventas = libro.ventas_entre(
+        fecha_inicio, fecha_fin,
+        categoria=None if filtro_categoria == "Todas" else filtro_categoria,
+        metodo_pago=None if filtro_metodo == "Todos" else filtro_metodo
+    )
     
-    # Convertir ventas a DataFrame
-    ventas_df = []
-    for venta in st.session_state.ventas:
-        if fecha_inicio <= venta["fecha"].date() <= fecha_fin:
-            for producto, item in venta["productos"].items():
-                if filtro_categoria == "Todas" or item["categoria"] == filtro_categoria:
-                    ventas_df.append({
-                        "Fecha": venta["fecha"],
-                        "Cliente": venta["cliente"],
-                        "Producto": producto,
-                        "Categoría": item["categoria"],
-                        "Cantidad": item["cantidad"],
-                        "Precio Unitario": item["precio"],
-                        "Subtotal": item["subtotal"],
-                        "Método Pago": venta["metodo_pago"],
-                        "Total Venta": venta["total"],
-                        "Ganancia": venta["ganancia"]
-                    })
-    
-    if not ventas_df:
+    if not ventas:
         st.warning("No hay ventas que coincidan con los filtros")
         return
     
-    df = pd.DataFrame(ventas_df)
+    df = pd.DataFrame.from_records(
+        [(v.fecha, v.cliente, l.producto, l.categoria, l.cantidad, l.precio, l.subtotal,
+          v.metodo_pago, v.total, v.ganancia)
+         for v in ventas for l in v.lineas],
+        columns=["Fecha", "Cliente", "Producto", "Categoría", "Cantidad", "Precio Unitario",
+                 "Subtotal", "Método Pago", "Total Venta", "Ganancia"]
+    )
     
     # Mostrar resumen
     st.subheader("Resumen de Ventas")
@@ -674,7 +725,7 @@ def mostrar_historial_ventas():
     # Mostrar tabla detallada
     st.subheader("Detalle de Ventas")
     st.dataframe(
-        df.sort_values("Fecha", ascending=False),
+        df,
         column_config={
             "Precio Unitario": st.column_config.NumberColumn(format="$%.2f"),
             "Subtotal": st.column_config.NumberColumn(format="$%.2f"),
@@ -686,115 +737,71 @@ def mostrar_historial_ventas():
         use_container_width=True
     )
     
-    # Opción para exportar
-    csv = df.to_csv(index=False).encode('utf-8')
+    # Reimpresión: las facturas ya generadas salen de la caché del servicio
+    with st.expander("🧾 Reimprimir factura"):
+        venta_id = st.number_input("N° de factura", min_value=1, step=1)
+        venta = libro.obtener_venta(venta_id)
+        if venta is None:
+            st.caption("No existe una venta con ese número")
+        else:
+            try:
+                pdf = obtener_facturas().reintentar(venta).result()
+            except Exception as e:
+                st.error(f"⚠️ No se pudo generar la factura: {e}")
+            else:
+                st.download_button(
+                    label=f"📄 Descargar Factura #{venta_id}",
+                    data=pdf,
+                    file_name=f"factura_{venta_id}.pdf",
+                    mime="application/pdf"
+                )
+    
+    # Opción para exportar: se genera al hacer clic, por lotes directo desde el libro
+    formato = st.selectbox("Formato de exportación", list(FORMATOS_EXPORTACION))
+    _, mime, extension = FORMATOS_EXPORTACION[formato]
     st.download_button(
-        label="📤 Exportar a CSV",
-        data=csv,
-        file_name=f"ventas_{fecha_inicio}_{fecha_fin}.csv",
-        mime="text/csv"
+        label=f"📤 Exportar a {formato}",
+        data=lambda: _leer_y_cerrar(exportar(libro.lotes_lineas(
+            fecha_inicio, fecha_fin,
+            categoria=None if filtro_categoria == "Todas" else filtro_categoria,
+            metodo_pago=None if filtro_metodo == "Todos" else filtro_metodo
+        ), formato)),
+        file_name=f"ventas_{fecha_inicio}_{fecha_fin}.{extension}",
+        mime=mime
     )
 
+@cronometrar
 def generar_reporte_diario():
-    """Genera un reporte PDF con el cierre diario"""
-    # Filtrar ventas del día actual
+    """Genera un reporte PDF con el cierre diario (el reporte de un período de un solo día)"""
+    from reportes import generar_reporte_periodo
+
     hoy = datetime.date.today()
-    ventas_hoy = [v for v in st.session_state.ventas if v['fecha'].date() == hoy]
-    
-    if not ventas_hoy:
+    pdf = generar_reporte_periodo(obtener_libro(), hoy, hoy)
+    if pdf is None:
         st.warning("No hay ventas registradas hoy")
-        return None
-    
-    # Preparar datos para los reportes
-    reporte_metodos = pd.DataFrame(ventas_hoy).groupby('metodo_pago')['total'].agg(['sum', 'count']).reset_index()
-    reporte_metodos.columns = ['Método de Pago', 'Total Vendido', 'N° Transacciones']
-    
-    # Reporte por producto
-    productos_vendidos = []
-    for venta in ventas_hoy:
-        for producto, datos in venta['productos'].items():
-            productos_vendidos.append({
-                'Producto': producto,
-                'Categoría': datos['categoria'],
-                'Cantidad': datos['cantidad'],
-                'Total': datos['subtotal']
-            })
-    
-    reporte_productos = pd.DataFrame(productos_vendidos).groupby(['Producto', 'Categoría']).agg({'Cantidad': 'sum', 'Total': 'sum'}).reset_index()
-    
-    # Crear PDF
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    styles = getSampleStyleSheet()
-    story = []
-    
-    # Título
-    story.append(Paragraph(f"Reporte Diario - {hoy.strftime('%d/%m/%Y')}", styles['Title']))
-    story.append(Spacer(1, 12))
-    
-    # 1. Reporte por Método de Pago
-    story.append(Paragraph("1. Resumen por Método de Pago", styles['Heading2']))
-    
-    # Convertir DataFrame a lista para ReportLab
-    data_metodos = [reporte_metodos.columns.tolist()] + reporte_metodos.values.tolist()
-    
-    # Crear tabla
-    t_metodos = Table(data_metodos)
-    t_metodos.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t_metodos)
-    story.append(Spacer(1, 24))
-    
-    # 2. Reporte por Producto
-    story.append(Paragraph("2. Ventas por Producto", styles['Heading2']))
-    
-    data_productos = [reporte_productos.columns.tolist()] + reporte_productos.values.tolist()
-    
-    t_productos = Table(data_productos)
-    t_productos.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    story.append(t_productos)
-    story.append(Spacer(1, 24))
-    
-    # Totales
-    total_dia = reporte_metodos['Total Vendido'].sum()
-    story.append(Paragraph(f"Total General del Día: ${total_dia:.2f}", styles['Heading2']))
-    
-    # Generar PDF
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+    return pdf
 
+@cronometrar
 def mostrar_reportes_diarios():
     """Interfaz para generar y mostrar reportes diarios"""
+    import pandas as pd
+
     st.header("📊 Reportes Diarios")
     
-    # Filtrar ventas del día actual
+    # Acumulados del día mantenidos por el libro en cada venta
     hoy = datetime.date.today()
-    ventas_hoy = [v for v in st.session_state.ventas if v['fecha'].date() == hoy]
+    libro = obtener_libro()
+    metodos = libro.resumen_metodos(hoy)
+    
+    mostrar_reporte_periodo()
     
-    if not ventas_hoy:
+    if not metodos:
         st.warning("No hay ventas registradas hoy")
         return
     
     # 1. Reporte por Método de Pago
     st.subheader("1. Resumen por Método de Pago")
-    reporte_metodos = pd.DataFrame(ventas_hoy).groupby('metodo_pago')['total'].agg(['sum', 'count']).reset_index()
-    reporte_metodos.columns = ['Método de Pago', 'Total Vendido', 'N° Transacciones']
+    reporte_metodos = pd.DataFrame(metodos)
     st.dataframe(
         reporte_metodos,
         column_config={
@@ -808,17 +815,7 @@ def mostrar_reportes_diarios():
     
     # 2. Reporte por Producto
     st.subheader("2. Ventas por Producto")
-    productos_vendidos = []
-    for venta in ventas_hoy:
-        for producto, datos in venta['productos'].items():
-            productos_vendidos.append({
-                'Producto': producto,
-                'Categoría': datos['categoria'],
-                'Cantidad': datos['cantidad'],
-                'Total': datos['subtotal']
-            })
-    
-    reporte_productos = pd.DataFrame(productos_vendidos).groupby(['Producto', 'Categoría']).agg({'Cantidad': 'sum', 'Total': 'sum'}).reset_index()
+    reporte_productos = pd.DataFrame(libro.resumen_productos(hoy))
     st.dataframe(
         reporte_productos,
         column_config={
@@ -839,32 +836,184 @@ def mostrar_reportes_diarios():
             st.success("Reporte generado correctamente!")
             st.download_button(
                 label="⬇️ Descargar Reporte Completo",
-                data=pdf,
+                data=_leer_y_cerrar(pdf),
                 file_name=f"reporte_diario_{hoy.strftime('%Y%m%d')}.pdf",
                 mime="application/pdf"
             )
 
+@cronometrar
+def mostrar_reporte_periodo():
+    """Reporte PDF de una semana, un mes o un rango; opcionalmente un PDF por día en un ZIP"""
+    from reportes import generar_reporte_periodo, generar_reportes_por_dia
+
+    with st.expander("🗓️ Reporte por período"):
+        hoy = datetime.date.today()
+        periodo = st.radio("Período", ["Esta semana", "Este mes", "Personalizado"], horizontal=True)
+        if periodo == "Esta semana":
+            rango = (hoy - datetime.timedelta(days=hoy.weekday()), hoy)
+        elif periodo == "Este mes":
+            rango = (hoy.replace(day=1), hoy)
+        else:
+            rango = st.date_input("Rango", (hoy - datetime.timedelta(days=30), hoy), key="rango_reporte")
+        if len(rango) != 2:
+            return
+        desde, hasta = rango
+        por_dia = st.checkbox("Un PDF por día (ZIP, generados en paralelo)")
+        
+        libro = obtener_libro()
+        if not libro.resumen_metodos_entre(desde, hasta):
+            st.info("No hay ventas en el período seleccionado")
+        elif por_dia:
+            st.download_button(
+                label="⬇️ Descargar reportes diarios (ZIP)",
+                data=lambda: _leer_y_cerrar(generar_reportes_por_dia(libro.ruta, desde, hasta)),
+                file_name=f"reportes_{desde.strftime('%Y%m%d')}_{hasta.strftime('%Y%m%d')}.zip",
+                mime="application/zip"
+            )
+        else:
+            st.download_button(
+                label="⬇️ Descargar reporte del período",
+                data=lambda: _leer_y_cerrar(generar_reporte_periodo(libro, desde, hasta)),
+                file_name=f"reporte_{desde.strftime('%Y%m%d')}_{hasta.strftime('%Y%m%d')}.pdf",
+                mime="application/pdf"
+            )
+
+@cronometrar
+def mostrar_consolidado_sucursales():
+    """Ventas de toda la cadena sumando los libros de cada sucursal, con detalle por sucursal"""
+    import pandas as pd
+    from consolidado import comparativo, consolidar, filas, totales
+
+    st.header("🏪 Consolidado de Sucursales")
+    rutas = sucursales()
+    # El libro de esta instalación entra aunque no esté en el directorio de sucursales
+    rutas.setdefault(SUCURSAL or "principal", obtener_libro().ruta)
+    st.caption(f"{len(rutas)} sucursales: {', '.join(rutas)}")
+
+    hoy = datetime.date.today()
+    rango = st.date_input("Período", (hoy.replace(day=1), hoy), key="rango_consolidado")
+    if len(rango) != 2:
+        return
+    desde, hasta = rango
+    clave = (desde, hasta, tuple(rutas.items()))
+    # Cada consolidación lee todos los libros: se guarda hasta que se pida otra
+    if st.button("🔄 Consolidar") or st.session_state.get("consolidado", (None,))[0] != clave:
+        with st.spinner("Sumando las sucursales..."):
+            st.session_state.consolidado = (clave, consolidar(rutas, desde, hasta))
+    consolidado = st.session_state.consolidado[1]
+
+    if not totales(consolidado["cadena"])[3]:
+        st.info("No hay ventas en el período seleccionado")
+        return
+
+    st.subheader("Por sucursal")
+    st.dataframe(
+        pd.DataFrame(comparativo(consolidado)),
+        column_config={
+            "Total": st.column_config.NumberColumn(format="$%.2f"),
+            "Ganancia": st.column_config.NumberColumn(format="$%.2f"),
+            "% de la cadena": st.column_config.ProgressColumn(format="%.1f%%", min_value=0, max_value=100)
+        },
+        hide_index=True
+    )
+
+    # Detalle: toda la cadena o una sucursal
+    vista = st.selectbox("Ver detalle de", ["Toda la cadena"] + list(consolidado["sucursales"]))
+    parcial = consolidado["cadena"] if vista == "Toda la cadena" else consolidado["sucursales"][vista]
+    total, ganancia, unidades, transacciones = totales(parcial)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total vendido", f"${total:,.2f}")
+    col2.metric("Ganancia", f"${ganancia:,.2f}")
+    col3.metric("Unidades", f"{unidades:,}")
+    col4.metric("Transacciones", f"{transacciones:,}")
+
+    dias = pd.DataFrame(filas(parcial, "dia", "Día")).sort_values("Día")
+    if len(dias) > 1:
+        st.line_chart(dias.set_index("Día")["Total"])
+
+    formato_dinero = {
+        "Total": st.column_config.NumberColumn(format="$%.2f"),
+        "Ganancia": st.column_config.NumberColumn(format="$%.2f")
+    }
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Por método de pago")
+        st.dataframe(pd.DataFrame(filas(parcial, "metodo_pago", "Método de Pago")),
+                     column_config=formato_dinero, hide_index=True)
+    with col2:
+        st.subheader("Por categoría")
+        st.dataframe(pd.DataFrame(filas(parcial, "categoria", "Categoría")),
+                     column_config=formato_dinero, hide_index=True)
+    st.subheader("Por producto")
+    st.dataframe(pd.DataFrame(filas(parcial, "producto", "Producto")),
+                 column_config=formato_dinero, hide_index=True)
+
+def _alternar_metricas():
+    METRICAS.activo = st.session_state.medir_tiempos
+
+def mostrar_panel_metricas():
+    """Panel oculto de tiempos (se abre con ?admin=1 en la URL)"""
+    import pandas as pd
+
+    with st.sidebar.expander("⏱️ Rendimiento", expanded=True):
+        st.toggle("Medir tiempos", value=METRICAS.activo, key="medir_tiempos", on_change=_alternar_metricas)
+        filas = METRICAS.resumen()
+        if filas:
+            st.dataframe(pd.DataFrame(filas), hide_index=True, use_container_width=True)
+        else:
+            st.caption("Sin mediciones todavía")
+        col1, col2 = st.columns(2)
+        if col1.button("🧹 Reiniciar", use_container_width=True):
+            METRICAS.reiniciar()
+            st.rerun()
+        col2.download_button(
+            "⬇️ Prometheus",
+            data=METRICAS.como_prometheus,
+            file_name="ventas_metricas.prom",
+            mime="text/plain",
+            use_container_width=True
+        )
+
 # Actualizar la función main para incluir el nuevo menú
 def main():
     # Menú de navegación
     st.sidebar.title("SweetBakery POS")
+    if SUCURSAL:
+        st.sidebar.caption(f"🏪 Sucursal {SUCURSAL}")
+    sincronizador = obtener_sincronizador()
+    obtener_servicio_caja()
+    reabastecimiento = obtener_reabastecimiento()
+    if sincronizador and sincronizador.ultimo_error:
+        st.sidebar.caption(f"☁️ Sin conexión con la nube: {obtener_libro().contar_pendientes_sync()} cambios en espera")
+    if reabastecimiento.ultimo_error:
+        st.sidebar.caption("🧁 Sin alertas de reposición: falló el pronóstico (ver Gestión de Inventario)")
     opcion = st.sidebar.radio(
         "Menú Principal",
-        ["Punto de Venta", "Gestión de Inventario", "Historial de Ventas", "Estadísticas", "Reportes Diarios"]
+        ["Punto de Venta", "Gestión de Inventario", "Historial de Ventas", "Estadísticas", "Reportes Diarios",
+         "Consolidado Sucursales"]
     )
     
     # Mostrar sección según selección
-    if opcion == "Punto de Venta":
-        mostrar_interfaz_ventas()
-        mostrar_carrito()
-    elif opcion == "Gestión de Inventario":
-        mostrar_inventario()
-    elif opcion == "Historial de Ventas":
-        mostrar_historial_ventas()
-    elif opcion == "Estadísticas":
-        mostrar_estadisticas()
-    elif opcion == "Reportes Diarios":
-        mostrar_reportes_diarios()
+    with medir(f"página: {opcion}"):
+        if opcion == "Punto de Venta":
+            mostrar_interfaz_ventas()
+            with st.sidebar:
+                mostrar_carrito()
+        elif opcion == "Gestión de Inventario":
+            mostrar_inventario()
+        elif opcion == "Historial de Ventas":
+            mostrar_historial_ventas()
+        elif opcion == "Estadísticas":
+            mostrar_estadisticas()
+        elif opcion == "Reportes Diarios":
+            mostrar_reportes_diarios()
+        elif opcion == "Consolidado Sucursales":
+            mostrar_consolidado_sucursales()
+
+    if st.query_params.get("admin") == "1":
+        mostrar_panel_metricas()
+    exportar_si_corresponde()
+    reportar_arranque(INICIO_SCRIPT, FIN_IMPORTACIONES)
 
 if __name__ == "__main__":
     main()